@@ -0,0 +1,162 @@
+import time
+from typing import Callable, Dict, Optional
+
+
+class ParameterBinding(object):
+    """Ties a FloatSlider, its QLineEdit and a scene attribute together.
+
+    The slider and the line edit are synchronised without re-emitting each other's signals, and the setter is only
+    called when the value differs from the last one pushed to Maya. While the slider is dragged, the scene is
+    updated at most once every throttleInterval seconds, the last value is pushed on release.
+    """
+    __slots__ = ('slider', 'lineEdit', 'setter', 'throttleInterval', '_value', '_sceneValue', '_lastPushTime')
+
+    def __init__(self, slider, lineEdit, setter: Callable[[float], None], throttleInterval: float = 0.0) -> None:
+        """
+        Parameters:
+            slider: The FloatSlider driving the value.
+            lineEdit: The QLineEdit displaying the value.
+            setter: The function sending the value to the scene.
+            throttleInterval: Minimum time between two scene updates while dragging.
+        """
+        self.slider = slider
+        self.lineEdit = lineEdit
+        self.setter = setter
+        self.throttleInterval = throttleInterval
+        self._value = slider.value()
+        self._sceneValue: Optional[float] = None
+        self._lastPushTime = 0.0
+
+        self.slider.valueChanged.connect(self.onSliderValueChanged)
+        self.slider.sliderReleased.connect(self.onSliderReleased)
+        self.lineEdit.editingFinished.connect(self.onLineEditEditingFinished)
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    @property
+    def sceneValue(self) -> Optional[float]:
+        """The last value pushed to the scene, None if unknown"""
+        return self._sceneValue
+
+    @sceneValue.setter
+    def sceneValue(self, value: Optional[float]) -> None:
+        self._sceneValue = value
+
+    @property
+    def dirty(self) -> bool:
+        """True if the current value has not been pushed to the scene yet"""
+        return self._sceneValue != self._value
+
+    def setValue(self, value: float, push: bool = True) -> None:
+        """Sets the value on both widgets and sends it to the scene
+
+        Parameters:
+            value: The new value.
+            push: If False, only the widgets are updated.
+        """
+        self._value = float(value)
+        self._updateSlider()
+        self._updateLineEdit()
+
+        if push:
+            self.push()
+
+    def push(self, force: bool = False) -> bool:
+        """Sends the current value to the scene if it changed
+
+        Parameters:
+            force: Sends the value even if it is not dirty.
+
+        Returns:
+            True if the setter has been called.
+        """
+        if not force and not self.dirty:
+            return False
+
+        self.setter(self._value)
+        self._sceneValue = self._value
+        self._lastPushTime = time.perf_counter()
+        return True
+
+    def invalidate(self) -> None:
+        """Forgets the last pushed value, used when the scene node has been rebuilt or removed"""
+        self._sceneValue = None
+
+    def reset(self, value: float) -> None:
+        """Sets the widgets to a value without touching the scene"""
+        self.invalidate()
+        self.setValue(value, push=False)
+
+    def onSliderValueChanged(self) -> None:
+        self._value = self.slider.value()
+        self._updateLineEdit()
+
+        if self.slider.isSliderDown() and time.perf_counter() - self._lastPushTime < self.throttleInterval:
+            return
+
+        self.push()
+
+    def onSliderReleased(self) -> None:
+        # the last dragged value may have been throttled
+        self.push()
+
+    def onLineEditEditingFinished(self) -> None:
+        try:
+            value = float(self.lineEdit.text())
+        except ValueError:
+            self._updateLineEdit()
+            return
+
+        self.setValue(value)
+
+    def _updateSlider(self) -> None:
+        blocked = self.slider.blockSignals(True)
+        self.slider.setValue(self._value)
+        self.slider.blockSignals(blocked)
+
+    def _updateLineEdit(self) -> None:
+        self.lineEdit.setText(str(round(self._value, 4))[:6])
+
+
+class BindingGroup(object):
+    """Named collection of ParameterBinding"""
+    __slots__ = ('_bindings',)
+
+    def __init__(self) -> None:
+        self._bindings = {}
+
+    def add(self, name: str, binding: ParameterBinding) -> ParameterBinding:
+        self._bindings[name] = binding
+        return binding
+
+    def __getitem__(self, name: str) -> ParameterBinding:
+        return self._bindings[name]
+
+    def __iter__(self):
+        return iter(self._bindings.values())
+
+    def invalidate(self) -> None:
+        """Invalidates all bindings, e.g. when the render engine changes"""
+        for binding in self:
+            binding.invalidate()
+
+    def sceneValues(self) -> Dict[str, Optional[float]]:
+        """Returns the last value pushed to the scene by each binding, to be restored with setSceneValues"""
+        return {name: binding.sceneValue for name, binding in self._bindings.items()}
+
+    def setSceneValues(self, values: Dict[str, Optional[float]]) -> None:
+        """Restores the values pushed to a rig kept aside, only the bindings changed since are then dirty"""
+        for name, value in values.items():
+            self._bindings[name].sceneValue = value
+
+    def push(self, force: bool = False) -> None:
+        """Sends the current value of every dirty binding to the scene"""
+        for binding in self:
+            binding.push(force)
+
+    def reset(self, **values: float) -> None:
+        """Resets the widgets of the given bindings without touching the scene"""
+        for name, value in values.items():
+            self._bindings[name].reset(value)
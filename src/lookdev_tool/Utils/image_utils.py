@@ -0,0 +1,31 @@
+"""Image file helpers shared by the tool and its offline checks, runs without Maya."""
+import zlib
+import struct
+from typing import Sequence
+
+HDR_EXTENSIONS = ('exr', 'hdr')
+
+
+def isHdri(fileName: str) -> bool:
+    """Returns True if fileName has an HDR extension"""
+    return fileName.split('.')[-1] in HDR_EXTENSIONS
+
+
+def writePng(path: str, pixels: Sequence[bytes], width: int) -> None:
+    """Writes an RGB PNG from its rows, without any imaging library
+
+    Parameters:
+        path: The file written.
+        pixels: One bytes object per row, 3 bytes per pixel.
+        width: The image's width.
+    """
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    # each row starts with its filter type, none
+    data = zlib.compress(b''.join(b'\x00' + row for row in pixels))
+    with open(path, 'wb') as wFile:
+        wFile.write(b'\x89PNG\r\n\x1a\n')
+        wFile.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, len(pixels), 8, 2, 0, 0, 0)))
+        wFile.write(chunk(b'IDAT', data))
+        wFile.write(chunk(b'IEND', b''))
@@ -0,0 +1,23 @@
+"""Executables of the running Maya, for the tool's batch processes, runs without Maya."""
+import os
+import sys
+from typing import Dict
+
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def mayaExecutable(name: str) -> str:
+    """Returns one of the running Maya's executables
+
+    Parameters:
+        name: mayapy or Render.
+    """
+    executable = '{}.exe'.format(name) if sys.platform == 'win32' else name
+    return os.path.join(os.environ.get('MAYA_LOCATION', ''), 'bin', executable)
+
+
+def packageEnvironment() -> Dict[str, str]:
+    """Returns the environment of a mayapy process importing the tool's package from its current location"""
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.pathsep.join(filter(None, (PACKAGE_PARENT, environment.get('PYTHONPATH'))))
+    return environment
@@ -1,4 +1,4 @@
-from PySide2 import QtWidgets, QtCore
+from PySide2 import QtWidgets, QtCore, QtGui
 
 
 class QHLine(QtWidgets.QFrame):
@@ -23,33 +23,85 @@ class FloatSlider(QtWidgets.QSlider):
 
         self._min_value = 0.0
         self._max_value = 100.0
+        self._updateScale()
 
-    @property
-    def _value_range(self):
-        return self._max_value - self._min_value
+    def _updateScale(self):
+        # cached so value() and setValue() don't recompute the range on every call
+        self._value_range = self._max_value - self._min_value
+        self._to_value = self._value_range / self._max_int
+        self._to_int = self._max_int / self._value_range if self._value_range else 0.0
 
     def value(self):
-        return float(super().value()) / self._max_int * self._value_range + self._min_value
+        return super().value() * self._to_value + self._min_value
 
     def setValue(self, value):
-        super().setValue(int((value - self._min_value) / self._value_range * self._max_int))
+        super().setValue(int(round((value - self._min_value) * self._to_int)))
 
     def setMinimum(self, value):
         if value > self._max_value:
             raise ValueError("Minimum limit cannot be higher than maximum")
 
+        current = self.value()
         self._min_value = value
-        self.setValue(self.value())
+        self._updateScale()
+        self.setValue(current)
 
     def setMaximum(self, value):
         if value < self._min_value:
             raise ValueError("Maximum limit cannot be smaller than minimum")
 
+        current = self.value()
         self._max_value = value
-        self.setValue(self.value())
+        self._updateScale()
+        self.setValue(current)
 
     def minimum(self):
         return self._min_value
 
     def maximum(self):
         return self._max_value
+
+
+class ImageLabel(QtWidgets.QLabel):
+    """
+    Label showing an RGBA uint8 array
+    """
+    def __init__(self):
+        super(ImageLabel, self).__init__()
+        self.setAlignment(QtCore.Qt.AlignCenter)
+
+    def setArray(self, array):
+        if array is None:
+            self.clear()
+            return
+
+        height, width = array.shape[:2]
+        # QImage does not copy the buffer, the pixmap does
+        data = array.tobytes()
+        image = QtGui.QImage(data, width, height, width * 4, QtGui.QImage.Format_RGBA8888)
+        self.setPixmap(QtGui.QPixmap.fromImage(image))
+
+
+class ThumbnailComboBox(QtWidgets.QComboBox):
+    """
+    ComboBox whose items show an image file, the images are only read when the popup is first shown
+    """
+    THUMBNAIL_PATH_ROLE = QtCore.Qt.UserRole + 1
+
+    def setThumbnailPath(self, index, path):
+        self.setItemData(index, path, self.THUMBNAIL_PATH_ROLE)
+        self.setItemIcon(index, QtGui.QIcon())
+
+        # already visible, no need to wait for the next popup
+        if self.view().isVisible():
+            self._loadIcons()
+
+    def showPopup(self):
+        self._loadIcons()
+        super(ThumbnailComboBox, self).showPopup()
+
+    def _loadIcons(self):
+        for index in range(self.count()):
+            path = self.itemData(index, self.THUMBNAIL_PATH_ROLE)
+            if path and self.itemIcon(index).isNull():
+                self.setItemIcon(index, QtGui.QIcon(path))
@@ -1 +1,3 @@
+__version__ = '1.0.0'
+
 from lookdev_tool import resources
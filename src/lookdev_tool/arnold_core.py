@@ -1,5 +1,5 @@
-import os
 import json
+import time
 import logging
 from typing import Tuple
 
@@ -7,17 +7,28 @@ from maya import cmds
 
 from lookdev_tool import lookdev_core
 from lookdev_tool import constants
+from lookdev_tool import ground_lod
 
 ARNOLD_CORE_LOGGER = logging.getLogger(__name__)
 ARNOLD_CORE_LOGGER.setLevel(10)
 
+RENDERER = 'arnold'
+PLUGIN = 'mtoa'
+SAMPLING_LEVELS = constants.ARNOLD_SAMPLING_LEVELS
+
+
+def pluginLoaded() -> bool:
+    """True if MtoA is loaded, the rig cannot be built without it"""
+    return bool(cmds.pluginInfo(PLUGIN, query=True, loaded=True))
+
 
 class GroundClass(object):
-    def __init__(self, path1, path2, path3, colorCheckerPath) -> None:
+    def __init__(self, path1, path2, path3, colorCheckerPath, lod=ground_lod.LOD_FULL) -> None:
         self.path1 = path1
         self.path2 = path2
         self.path3 = path3
         self.colorCheckerPath = colorCheckerPath
+        self.lod = lod
 
     def setGround(self, index: int) -> None:
         """Sets ground and delete if one is already set
@@ -26,74 +37,127 @@ class GroundClass(object):
              index: Combo box current floor
         """
         ARNOLD_CORE_LOGGER.debug('self.path1: {}, self.path2: {}, self.path3: {}'.format(self.path1, self.path2, self.path3))
+        startTime = time.perf_counter()
 
         # import ground 1
         if index == 0:
             if cmds.objExists('ground_1_arnold_ALL_Grp'):
-                cmds.file(self.path1, removeReference=True)
+                lookdev_core.removeReference(self.path1)
             else:
-                cmds.file(self.path1, reference=True)
+                lookdev_core.referenceFile(self.path1, lookdev_core.groundLodPath(self.path1, self.lod, self._onProxyReady))
 
                 if cmds.objExists('ground_2_arnold_ALL_Grp'):
-                    cmds.file(self.path2, removeReference=True)
+                    lookdev_core.removeReference(self.path2)
 
                 if cmds.objExists('ground_3_arnold_ALL_Grp'):
-                    cmds.file(self.path3, removeReference=True)
+                    lookdev_core.removeReference(self.path3)
 
         # import ground 2
         if index == 1:
             if cmds.objExists('ground_2_arnold_ALL_Grp'):
-                cmds.file(self.path2, removeReference=True)
+                lookdev_core.removeReference(self.path2)
             else:
-                cmds.file(self.path2, reference=True)
+                lookdev_core.referenceFile(self.path2, lookdev_core.groundLodPath(self.path2, self.lod, self._onProxyReady))
 
                 if cmds.objExists('ground_1_arnold_ALL_Grp'):
-                    cmds.file(self.path1, removeReference=True)
+                    lookdev_core.removeReference(self.path1)
 
                 if cmds.objExists('ground_3_arnold_ALL_Grp'):
-                    cmds.file(self.path3, removeReference=True)
+                    lookdev_core.removeReference(self.path3)
 
         # import ground 3
         if index == 2:
             if cmds.objExists('ground_3_arnold_ALL_Grp'):
-                cmds.file(self.path3, removeReference=True)
+                lookdev_core.removeReference(self.path3)
             else:
-                cmds.file(self.path3, reference=True)
+                lookdev_core.referenceFile(self.path3, lookdev_core.groundLodPath(self.path3, self.lod, self._onProxyReady))
 
                 if cmds.objExists('ground_1_arnold_ALL_Grp'):
-                    cmds.file(self.path1, removeReference=True)
+                    lookdev_core.removeReference(self.path1)
 
                 if cmds.objExists('ground_2_arnold_ALL_Grp'):
-                    cmds.file(self.path2, removeReference=True)
+                    lookdev_core.removeReference(self.path2)
 
         cmds.select(clear=True)
+        elapsed = time.perf_counter() - startTime
+        ARNOLD_CORE_LOGGER.debug('ground {} set in {:.3f}s'.format(index, elapsed), extra={'operation': 'groundSwitch', 'elapsed': elapsed})
+
+    def setLod(self, lod: str) -> None:
+        """Loads the current ground at another level of detail, the proxy is used while interacting
+
+        Parameters:
+            lod: ground_lod.LOD_FULL or ground_lod.LOD_PROXY.
+        """
+        self.lod = lod
+
+        for path in (self.path1, self.path2, self.path3):
+            if lookdev_core.referencedPath(path):
+                self._loadLod(path)
+
+    def _loadLod(self, path: str) -> None:
+        lodPath = lookdev_core.groundLodPath(path, self.lod, self._onProxyReady)
+
+        startTime = time.perf_counter()
+        lookdev_core.replaceReference(path, lodPath)
+        elapsed = time.perf_counter() - startTime
+        ARNOLD_CORE_LOGGER.debug('{} loaded at {} lod in {:.3f}s'.format(path, self.lod, elapsed), extra={'operation': 'groundLod', 'elapsed': elapsed})
+
+    def _onProxyReady(self, path: str) -> None:
+        """Swaps the ground for its proxy once generated, if it is still wanted"""
+        if self.lod == ground_lod.LOD_PROXY and lookdev_core.referencedPath(path):
+            self._loadLod(path)
 
 
 class LightDome(object):
+
+    LIGHT_DOME_NAME = 'lightDome'
+
+    @staticmethod
+    def texturePath(hdriName: str) -> str:
+        """Returns the texture read by the dome for an HDRI
+
+        Parameters:
+            hdriName: HDRI's name from QlineEdit
+        """
+        return lookdev_core.hdriPath(hdriName)
+
     def setLightDome(self, hdriName: str) -> None:
         """Sets light dome and delete it if one is already set
 
         Parameters:
              hdriName: HDRI's name from QlineEdit
         """
-        if not cmds.objExists('lightDome'):
-            lightDome = cmds.createNode('aiSkyDomeLight', name='lightDome', skipSelect=True)
-            # rename lightDome transform node
-            lightDomeT = cmds.listRelatives('lightDome', parent=True)[0]
-            self.lightDomeTransform = cmds.rename(lightDomeT, 'lightDomeTransfom')
-
-            lightDomeFile = lookdev_core.createFileText('dome1')
-            cmds.setAttr('{}.{}'.format(lightDomeFile, 'fileTextureName'), '{}.exr'.format(os.path.join(constants.LIGHT_DOME_PATH, hdriName)), type='string')
-            cmds.connectAttr('{}.{}'.format(lightDomeFile, 'outColor'), '{}.{}'.format(lightDome, 'color'))
-
-            cmds.setAttr('{}.camera'.format(lightDome), 0)
-
-        else:
-            lightDelOne = cmds.listConnections('lightDome', source=True)
-            lightDelTwo = cmds.listConnections(lightDelOne[-1], source=True)
-
-            cmds.delete(lightDelTwo[1:])
-            cmds.delete(lightDelOne[-1])
+        texturePath = self.texturePath(hdriName)
+        startTime = time.perf_counter()
+        try:
+            if not cmds.objExists('lightDome'):
+                lightDome = cmds.createNode('aiSkyDomeLight', name='lightDome', skipSelect=True)
+                # rename lightDome transform node
+                lightDomeT = cmds.listRelatives('lightDome', parent=True)[0]
+                self.lightDomeTransform = cmds.rename(lightDomeT, 'lightDomeTransfom')
+
+                lightDomeFile = lookdev_core.acquireFileTexture('dome1', texturePath)
+                cmds.connectAttr('{}.{}'.format(lightDomeFile, 'outColor'), '{}.{}'.format(lightDome, 'color'))
+
+                cmds.setAttr('{}.camera'.format(lightDome), 0)
+
+                lookdev_core.registerNodes(self.lightDomeTransform)
+                return
+
+            currentFile = (cmds.listConnections('lightDome.color', source=True, destination=False) or [None])[0]
+
+            if currentFile and lookdev_core.fileTextureSource(currentFile) == texturePath:
+                # same HDRI, remove the dome, the file node stays in the pool
+                cmds.delete(cmds.listRelatives('lightDome', parent=True)[0])
+                return
+
+            # switch HDRI, only the texture path changes
+            lightDomeFile = lookdev_core.acquireFileTexture('dome1', texturePath, fileNode=currentFile)
+            if lightDomeFile != currentFile:
+                cmds.connectAttr('{}.outColor'.format(lightDomeFile), 'lightDome.color', force=True)
+        finally:
+            elapsed = time.perf_counter() - startTime
+            ARNOLD_CORE_LOGGER.debug('dome set to {} in {:.3f}s'.format(hdriName, elapsed), extra={'operation': 'domeSet', 'elapsed': elapsed})
 
     @staticmethod
     def changeDome1Intens(value: str) -> None:
@@ -103,7 +167,7 @@ class LightDome(object):
             value: The intensity value.
         """
         if cmds.objExists('lightDome'):
-            cmds.setAttr('lightDome.intensity', value)
+            lookdev_core.setAttr('lightDome.intensity', value)
 
     def rotateDome(self, value: str) -> None:
         """Changes lightDom rotation
@@ -112,7 +176,9 @@ class LightDome(object):
             value: The rotation value.
         """
         if cmds.objExists('lightDome'):
-            cmds.setAttr('{}.rotateY'.format(self.lightDomeTransform), value)
+            # the dome may have been built by another LightDome, before a render engine switch
+            lightDomeTransform = cmds.listRelatives('lightDome', parent=True)[0]
+            lookdev_core.setAttr('{}.rotateY'.format(lightDomeTransform), value)
 
 
 def createLight(name: str, intensity: int, translates: Tuple[float, float, float], rotates: Tuple[float, float, float]) -> None:
@@ -138,21 +204,10 @@ def createLight(name: str, intensity: int, translates: Tuple[float, float, float
     # place the light in front of the asset
     cmds.xform(lightTransform, translation=translates, rotation=rotates)
 
-    # add ramp to the light
-    rampText = cmds.createNode('place2dTexture', name='keyLightText', skipSelect=True)
-    rampKeyL = cmds.createNode('ramp', name='keyLightRamp', skipSelect=True)
-
-    cmds.connectAttr('{}.{}'.format(rampText, 'outUV'), '{}.uv'.format(rampKeyL))
-    cmds.connectAttr('{}.{}'.format(rampText, 'outUvFilterSize'), '{}.uvFilterSize'.format(rampKeyL))
+    # add ramp to the light, the three lights share the same ramp
+    rampKeyL = lookdev_core.acquireRamp('lightRamp', constants.LIGHT_RAMP_DEFINITION)
     cmds.connectAttr('{}.{}'.format(rampKeyL, 'outColor'), '{}.color'.format(light))
 
-    # set the ramp
-    cmds.setAttr('{}.{}'.format(rampKeyL, 'colorEntryList[0].color'),  1, 1, 1, type='double3')
-    cmds.setAttr('{}.{}'.format(rampKeyL, 'colorEntryList[1].color'), 0, 0, 0, type='double3')
-    cmds.setAttr('{}.{}'.format(rampKeyL, 'colorEntryList[1].position'), 1)
-    cmds.setAttr('{}.{}'.format(rampKeyL, 'type'), 4)
-    cmds.setAttr('{}.{}'.format(rampKeyL, 'interpolation'), 3)
-
 
 def setThreePointsLights() -> None:
     """Set Three points light in scene and delete them is they are already in scene"""
@@ -178,6 +233,7 @@ def setThreePointsLights() -> None:
         cmds.parent('fillLightTransform', lightGroup)
         cmds.parent('keyLightTransform', lightGroup)
         cmds.parent('backLightTransform', lightGroup)
+        lookdev_core.registerNodes(lightGroup)
 
         cmds.select(clear=True)
 
@@ -189,7 +245,7 @@ def rotLights(rotation: Tuple[float, float, float]) -> None:
         rotation: The light rotations.
     """
     if cmds.objExists('Lights_Grp'):
-        cmds.setAttr('Lights_Grp.rotateY', rotation)
+        lookdev_core.setAttr('Lights_Grp.rotateY', rotation)
 
 
 def changeLightIntensity(light: str, intensity: float) -> None:
@@ -200,7 +256,7 @@ def changeLightIntensity(light: str, intensity: float) -> None:
         intensity: The light intensity.
     """
     if cmds.objExists('Lights_Grp'):
-        cmds.setAttr('{}.exposure'.format(light), intensity)
+        lookdev_core.setAttr('{}.exposure'.format(light), intensity)
 
 
 def createCam(colorCheckerPath: str) -> None:
@@ -218,7 +274,7 @@ def createCam(colorCheckerPath: str) -> None:
         cmds.rename(cameraTransform, 'Main_Cam_Transform')
 
         # create color palette
-        cmds.file(colorCheckerPath, reference=True)
+        lookdev_core.referenceFile(colorCheckerPath)
 
         # group cam
         cmds.parent('ColorPalette_arnold_ALL_Grp', 'Main_Cam_Transform')
@@ -226,17 +282,37 @@ def createCam(colorCheckerPath: str) -> None:
 
         cmds.createNode('transform', name='Cam_Main_Grp', skipSelect=True)
         cmds.parent(cameraOffset, 'Cam_Main_Grp')
+        lookdev_core.registerNodes('Cam_Main_Grp')
 
         # move cam
-        cmds.xform('Main_Cam_Transform', translation=(0, 4.542, 13.729))
+        cmds.xform('Main_Cam_Transform', translation=constants.CAMERA_TRANSLATION)
+
+        setupCamera('Main_Cam')
 
     else:
-        cmds.file(colorCheckerPath, removeReference=True)
+        lookdev_core.removeReference(colorCheckerPath)
         cmds.delete('Cam_Main_Grp')
 
     cmds.select(clear=True)
 
 
+def setupCamera(camera: str) -> None:
+    """Sets the Arnold camera attributes, the exposure is the main camera's so every view matches it
+
+    Parameters:
+        camera: The camera shape's name.
+    """
+    # the attributes are added by mtoa to the camera shapes
+    if not cmds.attributeQuery('aiExposure', node=camera, exists=True):
+        return
+
+    cmds.setAttr('{}.aiTranslator'.format(camera), 'perspective', type='string')
+    exposure = 0.0
+    if camera != 'Main_Cam' and cmds.objExists('Main_Cam.aiExposure'):
+        exposure = cmds.getAttr('Main_Cam.aiExposure')
+    cmds.setAttr('{}.aiExposure'.format(camera), exposure)
+
+
 def rotateCam(rotateValue: str) -> None:
     """Rotate cam's offset group.
 
@@ -244,7 +320,7 @@ def rotateCam(rotateValue: str) -> None:
         rotateValue: The rotate value from rotateCam's Qline.
     """
     if cmds.objExists('Cam_Main_Grp'):
-        cmds.setAttr('{}.{}'.format('Cam_Main_Grp', 'rotateY'), rotateValue)
+        lookdev_core.setAttr('{}.{}'.format('Cam_Main_Grp', 'rotateY'), rotateValue)
 
 
 def disableLight(light: str, state: bool) -> None:
@@ -263,49 +339,39 @@ def disableLight(light: str, state: bool) -> None:
         cmds.disconnectAttr('{}.instObjGroups[0]'.format(light), 'defaultLightSet.dagSetMembers', nextAvailable=True)
 
 
-def clearScene(colorCheckerPath: str, ground1Path: str, ground2Path: str, ground3Path: str) -> None:
-    """
-    Clear all tool's nodes in scene
+def pauseIpr(state: bool) -> None:
+    """Pauses or resumes Arnold's IPR, used by lookdev_core.IprBatch
 
     Parameters:
-        colorCheckerPath: colorChecker's path.
-        ground1Path: ground1's path.
-        ground2Path: ground2's path.
-        ground3Path: ground3's path.
+        state: True to pause, False to resume.
     """
-    # cam
-    if cmds.objExists('Cam_Main_Grp'):
-        cmds.file(colorCheckerPath, removeReference=True)
-        cmds.delete('Cam_Main_Grp')
-
-    # ground
-    if cmds.objExists('ground_1_arnold_ALL_Grp'):
-        cmds.file(ground1Path, removeReference=True)
+    if not pluginLoaded():
+        return
 
-    if cmds.objExists('ground_2_arnold_ALL_Grp'):
-        cmds.file(ground2Path, removeReference=True)
+    try:
+        cmds.arnoldIpr(mode='pause' if state else 'unpause')
+    except RuntimeError:
+        # IPR not running
+        pass
 
-    if cmds.objExists('ground_3_arnold_ALL_Grp'):
-        cmds.file(ground3Path, removeReference=True)
 
-    # lights
-    if cmds.objExists('Lights_Grp'):
-        cmds.delete('Lights_Grp')
+def clearScene() -> None:
+    """Clear all tool's nodes in scene
 
-    # lightDome
-    if cmds.objExists('lightDomeTransfom'):
-        # del connected nodes
-        lightDelOne = cmds.listConnections('lightDome', source=True)
-        print(lightDelOne)
-        lightDelTwo = cmds.listConnections(lightDelOne[0], source=True)
-        print(lightDelTwo)
+    The nodes and references recorded at creation time are removed in one pass, see lookdev_core.clearOwnedNodes.
+    """
+    startTime = time.perf_counter()
+    lookdev_core.clearOwnedNodes()
+    elapsed = time.perf_counter() - startTime
+    ARNOLD_CORE_LOGGER.debug('clearScene: {:.3f}s'.format(elapsed), extra={'operation': 'clearScene', 'elapsed': elapsed})
 
-        cmds.delete(lightDelTwo[-1])
-        cmds.delete(lightDelOne[0])
 
+def storePrefs() -> Tuple[str, str]:
+    """Creates a json and write coordinates to replace the lights
 
-def storePrefs() -> None:
-    """Creates a json and write coordinates to replace the lights"""
+    Returns:
+        The preferences file's path and its json content, the file is left to the caller to write.
+    """
     # create dict from lights position, values, intensity and scale
 
     if not cmds.objExists('fillLightTransform'):
@@ -317,11 +383,13 @@ def storePrefs() -> None:
         constants.ARNOLD_LIGHT_VALUES[index].get(light, {})[f'{light}scaleY'] = cmds.getAttr(f'{light}Transform.scaleY')
         constants.ARNOLD_LIGHT_VALUES[index].get(light, {})[f'{light}intens'] = cmds.getAttr(f'{light}.intensity')
 
-    with open(constants.VRAY_PREFERENCE_PATH, 'w') as wFile:
-        wFile.write(json.dumps(constants.ARNOLD_LIGHT_VALUES, indent=4))
+    preferences = json.dumps(constants.ARNOLD_LIGHT_VALUES, indent=4)
+
+    # Write prefs in Maya
+    cmds.optionVar(stringValue=('lookdev_arnold_settings', preferences))
 
-        # Write prefs in Maya
-        cmds.optionVar(stringValue=('lookdev_arnold_settings', json.dumps(constants.ARNOLD_LIGHT_VALUES, indent=4)))
+    # the file is written by the caller, on a worker
+    return constants.VRAY_PREFERENCE_PATH, preferences
 
 
 def importPrefs() -> None:
@@ -333,11 +401,16 @@ def importPrefs() -> None:
         cmds.error("Settings not found")
         return
 
+    startTime = time.perf_counter()
+
     # set the position, scale and intensity
     for index, light in enumerate(['fillLight', 'keyLight', 'backLight']):
-        cmds.xform('{}Transform'.format(light), matrix=(settings[index].get(light, {}).get('{}Coords'.format(light), {})))
-        cmds.setAttr('{}Transform.scaleX'.format(light), (settings[index].get(light, {}).get('{}scaleX'.format(light), {})))
-        cmds.setAttr('{}Transform.scaleY'.format(light), (settings[index].get(light, {}).get('{}scaleY'.format(light), {})))
-        cmds.setAttr('{}.intensity'.format(light), (settings[index].get(f'{light}', {}).get('{}intens'.format(light), {})))
+        lookdev_core.batchCall(('xform', light), cmds.xform, '{}Transform'.format(light), matrix=(settings[index].get(light, {}).get('{}Coords'.format(light), {})))
+        lookdev_core.setAttr('{}Transform.scaleX'.format(light), (settings[index].get(light, {}).get('{}scaleX'.format(light), {})))
+        lookdev_core.setAttr('{}Transform.scaleY'.format(light), (settings[index].get(light, {}).get('{}scaleY'.format(light), {})))
+        lookdev_core.setAttr('{}.intensity'.format(light), (settings[index].get(f'{light}', {}).get('{}intens'.format(light), {})))
+
+    elapsed = time.perf_counter() - startTime
+    ARNOLD_CORE_LOGGER.debug('preferences applied in {:.3f}s'.format(elapsed), extra={'operation': 'presetApply', 'elapsed': elapsed})
 
     return settings
@@ -0,0 +1,265 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent import futures
+from typing import Callable, Dict, Iterable, Optional, Set
+
+ASSET_CACHE_LOGGER = logging.getLogger(__name__)
+ASSET_CACHE_LOGGER.setLevel(10)
+
+_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class AssetCache(object):
+    """Local disk cache of the HDRIs, grounds and palettes read from network storage.
+
+    Copies are content-addressed: each file is stored as <cacheDir>/<sha1>/<basename>, the basename is kept because
+    Maya derives the reference's node prefix from it (ground_1_arnold_ALL_Grp). A copy is fresh while the source
+    keeps the size and mtime recorded in the index. A source whose mtime changed is hashed before being copied again,
+    republishing the same content costs a read but no copy. The least recently used copies are evicted once the cache
+    exceeds maxSize, the pinned ones, still read by the scene, are kept.
+    """
+    def __init__(self, cacheDir: str, maxSize: int, workers: int = 2) -> None:
+        """
+        Parameters:
+            cacheDir: The local cache folder.
+            maxSize: The cache size limit in bytes.
+            workers: The number of background copies running at the same time.
+        """
+        self.cacheDir = cacheDir
+        self.maxSize = maxSize
+        self._indexPath = os.path.join(cacheDir, 'index.json')
+        self._lock = threading.RLock()
+        self._executor = futures.ThreadPoolExecutor(max_workers=workers)
+        self._pending: Dict[str, futures.Future] = {}
+        self._pinned: Set[str] = set()
+        self._index = self._readIndex()
+
+    def _readIndex(self) -> dict:
+        try:
+            with open(self._indexPath, 'r') as rFile:
+                return json.load(rFile)
+        except (IOError, ValueError):
+            return {}
+
+    def _writeIndex(self) -> None:
+        os.makedirs(self.cacheDir, exist_ok=True)
+        tmpPath = self._indexPath + '.tmp'
+        with open(tmpPath, 'w') as wFile:
+            json.dump(self._index, wFile, indent=4)
+        os.replace(tmpPath, self._indexPath)
+
+    @staticmethod
+    def _key(sourcePath: str) -> str:
+        return os.path.normcase(os.path.abspath(sourcePath))
+
+    def cachedPath(self, sourcePath: str) -> Optional[str]:
+        """Returns the local copy of sourcePath if it is fresh, None otherwise
+
+        Parameters:
+            sourcePath: The file on network storage.
+        """
+        key = self._key(sourcePath)
+
+        with self._lock:
+            entry = self._index.get(key)
+
+        if not entry:
+            return None
+
+        try:
+            sourceStat = os.stat(sourcePath)
+            localStat = os.stat(entry['local'])
+        except OSError:
+            return None
+
+        if sourceStat.st_size != entry['size'] or sourceStat.st_mtime != entry['mtime'] or localStat.st_size != entry['size']:
+            return None
+
+        with self._lock:
+            entry['lastAccess'] = time.time()
+
+        return entry['local']
+
+    def localPath(self, sourcePath: str, onReady: Optional[Callable[[str], None]] = None, wait: bool = False) -> str:
+        """Returns the path to read sourcePath from
+
+        The local copy is returned when it is fresh. Otherwise a background copy is started and sourcePath is
+        returned, onReady is called with the local path (from the worker thread) once the copy is done.
+
+        Parameters:
+            sourcePath: The file on network storage.
+            onReady: Called with the local path when the background copy ends.
+            wait: Blocks until the local copy exists.
+        """
+        cachedPath = self.cachedPath(sourcePath)
+        if cachedPath:
+            return cachedPath
+
+        future = self.prefetch(sourcePath)
+        if onReady:
+            future.add_done_callback(lambda done: done.exception() is None and onReady(done.result()))
+
+        if wait:
+            return future.result()
+
+        return sourcePath
+
+    def prefetch(self, sourcePath: str) -> futures.Future:
+        """Copies sourcePath to the cache in the background, copies already running are shared"""
+        key = self._key(sourcePath)
+
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._fetch, sourcePath)
+                future.add_done_callback(lambda done: self._pending.pop(key, None))
+                self._pending[key] = future
+
+        return future
+
+    def prefetchAll(self, sourcePaths: Iterable[str]) -> None:
+        """Starts the background copies of the sources not cached yet, the stats are read on the calling thread"""
+        for sourcePath in sourcePaths:
+            try:
+                if not self.cachedPath(sourcePath):
+                    self.prefetch(sourcePath)
+            except OSError as error:
+                ASSET_CACHE_LOGGER.warning('{} not prefetched: {}'.format(sourcePath, error))
+
+    def pin(self, *localPaths: str) -> None:
+        """Keeps copies from eviction while the scene reads them"""
+        with self._lock:
+            self._pinned.update(localPaths)
+
+    def unpin(self, *localPaths: str) -> None:
+        with self._lock:
+            self._pinned.difference_update(localPaths)
+
+    def _fetch(self, sourcePath: str) -> str:
+        """Returns the local copy of sourcePath, copied again only if its content changed"""
+        if self.verify(sourcePath):
+            with self._lock:
+                return self._index[self._key(sourcePath)]['local']
+
+        return self._copy(sourcePath)
+
+    def _copy(self, sourcePath: str) -> str:
+        """Copies sourcePath while hashing it, so the source is read once"""
+        startTime = time.perf_counter()
+        sourceStat = os.stat(sourcePath)
+        os.makedirs(self.cacheDir, exist_ok=True)
+
+        sha1 = hashlib.sha1()
+        fileDescriptor, tmpPath = tempfile.mkstemp(dir=self.cacheDir, suffix='.part')
+        try:
+            with open(sourcePath, 'rb') as rFile, os.fdopen(fileDescriptor, 'wb') as wFile:
+                for chunk in iter(lambda: rFile.read(_CHUNK_SIZE), b''):
+                    sha1.update(chunk)
+                    wFile.write(chunk)
+
+            contentHash = sha1.hexdigest()
+            localDir = os.path.join(self.cacheDir, contentHash)
+            localPath = os.path.join(localDir, os.path.basename(sourcePath))
+            os.makedirs(localDir, exist_ok=True)
+
+            if os.path.exists(localPath):
+                # same content already cached from another source
+                os.remove(tmpPath)
+            else:
+                os.replace(tmpPath, localPath)
+        except BaseException:
+            if os.path.exists(tmpPath):
+                os.remove(tmpPath)
+            raise
+
+        with self._lock:
+            self._index[self._key(sourcePath)] = {
+                'local': localPath,
+                'hash': contentHash,
+                'size': sourceStat.st_size,
+                'mtime': sourceStat.st_mtime,
+                'lastAccess': time.time(),
+            }
+            self._evict(keep=localPath)
+            self._writeIndex()
+
+        ASSET_CACHE_LOGGER.debug('cached {} in {:.3f}s'.format(sourcePath, time.perf_counter() - startTime))
+        return localPath
+
+    def verify(self, sourcePath: str) -> bool:
+        """Checks the local copy against the source's content hash, the index is updated if the source only got a new
+        mtime
+
+        Returns:
+            True if the local copy holds the source's content.
+        """
+        key = self._key(sourcePath)
+        with self._lock:
+            entry = dict(self._index.get(key) or {})
+
+        try:
+            sourceStat = os.stat(sourcePath)
+            if not entry or sourceStat.st_size != entry['size'] or os.stat(entry['local']).st_size != entry['size']:
+                return False
+        except OSError:
+            return False
+
+        sha1 = hashlib.sha1()
+        with open(sourcePath, 'rb') as rFile:
+            for chunk in iter(lambda: rFile.read(_CHUNK_SIZE), b''):
+                sha1.update(chunk)
+
+        if sha1.hexdigest() != entry['hash']:
+            return False
+
+        with self._lock:
+            if key in self._index:
+                self._index[key].update(mtime=sourceStat.st_mtime, lastAccess=time.time())
+                self._writeIndex()
+
+        return True
+
+    def _evict(self, keep: str) -> None:
+        """Removes the least recently used copies until the cache fits in maxSize"""
+        # several sources can share a copy, sizes are counted once per local file
+        localFiles = {}
+        for entry in self._index.values():
+            lastAccess = max(entry['lastAccess'], localFiles.get(entry['local'], (0, 0))[0])
+            localFiles[entry['local']] = (lastAccess, entry['size'])
+
+        totalSize = sum(size for _, size in localFiles.values())
+        for localPath, (_, size) in sorted(localFiles.items(), key=lambda item: item[1][0]):
+            if totalSize <= self.maxSize:
+                break
+
+            if localPath == keep or localPath in self._pinned:
+                continue
+
+            shutil.rmtree(os.path.dirname(localPath), ignore_errors=True)
+            totalSize -= size
+
+            for key in [key for key, entry in self._index.items() if entry['local'] == localPath]:
+                del self._index[key]
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_ASSET_CACHE = None
+
+
+def getAssetCache() -> AssetCache:
+    """Returns the tool's AssetCache"""
+    global _ASSET_CACHE
+
+    if _ASSET_CACHE is None:
+        from lookdev_tool import constants
+        _ASSET_CACHE = AssetCache(constants.ASSET_CACHE_PATH, constants.ASSET_CACHE_MAX_SIZE)
+
+    return _ASSET_CACHE
@@ -0,0 +1,193 @@
+import math
+import time
+import ctypes
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from maya import cmds
+import maya.OpenMaya as om
+
+from lookdev_tool import constants
+from lookdev_tool import lookdev_core
+
+AUTO_FRAMING_LOGGER = logging.getLogger(__name__)
+AUTO_FRAMING_LOGGER.setLevel(10)
+
+# points used to compute the principal axes, the covariance of a regular subsample is accurate enough
+PRINCIPAL_AXES_SAMPLES = 200000
+
+
+def _requireNumpy() -> None:
+    if np is None:
+        raise RuntimeError('NumPy is required to frame the asset')
+
+
+def _meshDagPaths(nodes: Sequence[str]) -> List[om.MDagPath]:
+    """Returns the dag path of every visible mesh under nodes, each instance once"""
+    meshes = cmds.listRelatives(nodes, allDescendents=True, type='mesh', fullPath=True) or []
+    meshes += cmds.ls(nodes, type='mesh', long=True) or []
+
+    selection = om.MSelectionList()
+    for mesh in set(cmds.ls(meshes, noIntermediate=True, long=True) or []):
+        selection.add(mesh)
+
+    dagPaths = []
+    for index in range(selection.length()):
+        dagPath = om.MDagPath()
+        selection.getDagPath(index, dagPath)
+        # hidden shapes, hidden parents and shapes on hidden layers don't count in the framing
+        if dagPath.isVisible():
+            dagPaths.append(dagPath)
+
+    return dagPaths
+
+
+def _localPoints(dagPath: om.MDagPath):
+    """Returns the mesh's object space points as a (count, 3) float32 array
+
+    The points are read from the mesh's own buffer without a per point Python object, the array is a copy so it
+    stays valid whatever happens to the mesh.
+    """
+    meshFn = om.MFnMesh(dagPath)
+    count = meshFn.numVertices()
+    if not count:
+        return np.empty((0, 3), dtype=np.float32)
+
+    try:
+        address = int(meshFn.getRawPoints())
+        buffer = (ctypes.c_float * (count * 3)).from_address(address)
+        return np.ctypeslib.as_array(buffer).reshape(count, 3).copy()
+    except (TypeError, ValueError, RuntimeError):
+        # no raw access, bulk query of the vertices
+        return np.array(cmds.xform('{}.vtx[*]'.format(dagPath.fullPathName()), query=True, translation=True,
+                                   objectSpace=True), dtype=np.float32).reshape(-1, 3)
+
+
+def worldPoints(nodes: Sequence[str]):
+    """Returns the world space points of every mesh under nodes as a (count, 3) float64 array
+
+    Parameters:
+        nodes: The asset's transforms or meshes.
+    """
+    _requireNumpy()
+
+    points = []
+    for dagPath in _meshDagPaths(nodes):
+        # the dag path's matrix is the right one for each instance
+        inclusiveMatrix = dagPath.inclusiveMatrix()
+        matrix = np.array([[inclusiveMatrix(row, column) for column in range(4)] for row in range(4)])
+
+        # Maya matrices apply to row vectors
+        points.append(_localPoints(dagPath).astype(np.float64) @ matrix[:3, :3] + matrix[3, :3])
+
+    if not points:
+        raise RuntimeError('No mesh to frame under {}'.format(', '.join(nodes)))
+
+    return np.concatenate(points)
+
+
+def principalAngle(points) -> float:
+    """Returns the rotation around Y in degrees bringing the asset's longest horizontal axis along X"""
+    _requireNumpy()
+
+    stride = max(1, len(points) // PRINCIPAL_AXES_SAMPLES)
+    horizontal = points[::stride][:, (0, 2)]
+    eigenValues, eigenVectors = np.linalg.eigh(np.cov(horizontal, rowvar=False))
+    axisX, axisZ = eigenVectors[:, np.argmax(eigenValues)]
+
+    # rotateY by theta brings X on (cos theta, 0, -sin theta)
+    return math.degrees(math.atan2(-axisZ, axisX))
+
+
+def framingDistance(halfWidth: float, halfHeight: float, halfDepth: float, camera: str = 'Main_Cam') -> float:
+    """Returns the camera distance from the asset's center fitting its extents in the camera's frame
+
+    Parameters:
+        halfWidth: The asset's half extent across the view.
+        halfHeight: The asset's half extent along Y.
+        halfDepth: The asset's half extent along the view.
+        camera: The camera shape whose field of view is used.
+    """
+    focalLength = cmds.getAttr('{}.focalLength'.format(camera))
+    # apertures are in inches, focal length in millimeters
+    horizontalHalfFov = math.atan(cmds.getAttr('{}.horizontalFilmAperture'.format(camera)) * 25.4 / 2.0 / focalLength)
+
+    aspect = cmds.getAttr('defaultResolution.deviceAspectRatio') or 1.0
+    verticalHalfFov = math.atan(math.tan(horizontalHalfFov) / aspect)
+
+    distance = max(halfWidth / math.tan(horizontalHalfFov), halfHeight / math.tan(verticalHalfFov))
+    return (distance + halfDepth) * constants.FRAMING_MARGIN
+
+
+def _groundRoots() -> List[str]:
+    return [root for root in cmds.ls('*ground_*_ALL_Grp', type='transform') or []
+            if cmds.listRelatives(root, parent=True) is None]
+
+
+def frameAsset(nodes: Optional[Sequence[str]] = None, principalAxes: bool = False) -> Tuple[float, float, float]:
+    """Places and scales the camera, the lights and the ground around an asset
+
+    The camera keeps its default direction and is pulled back until the asset's bounds fit its frame, the lights and
+    the ground are moved under the asset and scaled from the size the default rig was made for.
+
+    Parameters:
+        nodes: The asset's nodes, the selection or the review and material variant grids if None.
+        principalAxes: Turns the camera to face the asset's longest horizontal axis.
+
+    Returns:
+        The asset's center.
+    """
+    _requireNumpy()
+
+    if nodes is None:
+        nodes = cmds.ls(selection=True, long=True) or []
+        if not nodes:
+            nodes = [grid for grid in ('ReviewGrid_Grp', 'MaterialVariants_Grp') if cmds.objExists(grid)]
+
+    if not nodes:
+        raise RuntimeError('Select the asset to frame')
+
+    startTime = time.perf_counter()
+    points = worldPoints(nodes)
+    minimum, maximum = points.min(axis=0), points.max(axis=0)
+    center = (minimum + maximum) / 2.0
+
+    angle = 0.0
+    if principalAxes:
+        angle = principalAngle(points)
+        # extents in the rotated frame, camera looks along its local -Z
+        radians = math.radians(angle)
+        localX = (points[:, 0] - center[0]) * math.cos(radians) - (points[:, 2] - center[2]) * math.sin(radians)
+        localZ = (points[:, 0] - center[0]) * math.sin(radians) + (points[:, 2] - center[2]) * math.cos(radians)
+        halfWidth, halfDepth = np.abs(localX).max(), np.abs(localZ).max()
+    else:
+        halfWidth, halfDepth = (maximum[0] - minimum[0]) / 2.0, (maximum[2] - minimum[2]) / 2.0
+
+    halfHeight = (maximum[1] - minimum[1]) / 2.0
+    radius = max(halfWidth, halfHeight, halfDepth, 1e-3)
+    scale = radius / constants.FRAMING_REFERENCE_RADIUS
+
+    with lookdev_core.IprBatch():
+        if cmds.objExists('Cam_Main_Grp'):
+            distance = framingDistance(halfWidth, halfHeight, halfDepth)
+            lookdev_core.setAttr('Cam_Main_Grp.translate', center[0], 0.0, center[2], type='double3')
+            lookdev_core.setAttr('Camera_Offset.rotateY', angle)
+            lookdev_core.setAttr('Main_Cam_Transform.translate', 0.0, center[1], distance, type='double3')
+
+        if cmds.objExists('Lights_Grp'):
+            lookdev_core.setAttr('Lights_Grp.translate', center[0], minimum[1], center[2], type='double3')
+            lookdev_core.setAttr('Lights_Grp.scale', scale, scale, scale, type='double3')
+
+        for ground in _groundRoots():
+            lookdev_core.setAttr('{}.translate'.format(ground), center[0], minimum[1], center[2], type='double3')
+            lookdev_core.setAttr('{}.scale'.format(ground), scale, scale, scale, type='double3')
+
+    AUTO_FRAMING_LOGGER.debug('{} points framed in {:.3f}s, radius {:.3f}'.format(
+        len(points), time.perf_counter() - startTime, radius))
+
+    return tuple(center)
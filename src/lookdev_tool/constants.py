@@ -1,12 +1,95 @@
 import os
+import tempfile
 from maya import cmds
 
+from lookdev_tool.Utils import image_utils
+
 
 TOOL_NAME = "Js_LookDev_Tool"
 COLORSPACE_LIST = cmds.colorManagementPrefs(query=True, renderingSpaceNames=True)
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 LIGHT_DOME_PATH = os.path.join(BASE_PATH, 'resources/hdri')
-HDR_EXTENSIONS = ('exr', 'hdr')
+HDR_EXTENSIONS = image_utils.HDR_EXTENSIONS
+
+# every node and reference created by the tool is recorded here so the scene can be cleared in one pass
+OWNERSHIP_SET_NAME = 'lookdevTool_nodes_SET'
+OWNERSHIP_REFERENCES_ATTR = 'lookdevReferences'
+
+# local copies of the HDRIs, grounds and palettes read from network storage
+ASSET_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.lookdev_tool', 'cache')
+ASSET_CACHE_MAX_SIZE = 20 * 1024 ** 3
+# network path kept on the file and reference nodes reading a local copy, saved with the scene
+ASSET_SOURCE_PATH_ATTR = 'lookdevSourcePath'
+
+# decimated grounds shown while interacting, ratio is the proportion of polygons kept
+GROUND_LOD_PATH = os.path.join(os.path.expanduser('~'), '.lookdev_tool', 'lod')
+GROUND_PROXY_RATIO = 0.1
+# milliseconds after the last gesture before the full ground is loaded back, consecutive gestures keep the proxy
+GROUND_LOD_RESTORE_DELAY = 1500
+
+# ground picker thumbnails, one file per ground content hash
+GROUND_THUMBNAIL_PATH = os.path.join(os.path.expanduser('~'), '.lookdev_tool', 'thumbnails')
+GROUND_THUMBNAIL_SIZE = 128
+
+# minimum time in seconds between two scene updates while a slider is dragged
+INTERACTION_PUSH_INTERVAL = 0.1
+
+# main camera position in its offset group
+CAMERA_TRANSLATION = (0, 4.542, 13.729)
+
+# review angles of the multi-view rig: (view name, rotateX, rotateY) of each camera's pivot
+MULTI_VIEWS = (
+    ('front', 0, 0),
+    ('threeQuarter', 0, 45),
+    ('side', 0, 90),
+    ('back', 0, 180),
+    ('top', -90, 0),
+)
+
+# auto framing: radius of the asset the default camera, lights and grounds are made for, room left around the asset
+FRAMING_REFERENCE_RADIUS = 4.5
+FRAMING_MARGIN = 1.1
+
+# namespace of the rig stashed while another renderer is active, followed by the renderer's name
+RIG_NAMESPACE_PREFIX = 'lookdevRig_'
+
+# prebuilt rig templates, one folder per definition hash
+RIG_TEMPLATE_PATH = os.path.join(os.path.expanduser('~'), '.lookdev_tool', 'templates')
+
+# review grid: gap between assets as a proportion of the biggest one, assets shown per frame
+REVIEW_GRID_SPACING = 0.25
+REVIEW_GRID_PAGE_SIZE = 16
+
+# material variants: gap between instances as a proportion of the asset's footprint
+MATERIAL_VARIANTS_SPACING = 0.25
+
+# HDRI preview: SH coefficients stored per HDRI, size of the preview sphere in pixels
+HDRI_SH_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.lookdev_tool', 'hdri_sh')
+HDRI_PREVIEW_SIZE = 64
+
+# render viewer: frame buffer shared with the render processes, one per Maya session, finished frames kept
+FRAME_BUFFER_PATH = os.path.join(tempfile.gettempdir(), 'lookdev_framebuffer_{}.bin'.format(os.getpid()))
+RENDER_HISTORY_SIZE = 8
+
+# sampling calibration: highest noise sigma accepted, calibrations stored per asset
+SAMPLING_NOISE_TARGET = 0.01
+SAMPLING_CALIBRATION_PATH = os.path.join(os.path.expanduser('~'), '.lookdev_tool', 'sampling')
+
+# sampling levels tried by the calibration, sorted by cost
+ARNOLD_SAMPLING_LEVELS = tuple(
+    {'defaultArnoldRenderOptions.AASamples': samples} for samples in (1, 2, 3, 4, 5, 6, 8)
+)
+VRAY_SAMPLING_LEVELS = tuple(
+    {'vraySettings.dmcThreshold': threshold, 'vraySettings.dmcMaxSubdivs': subdivs}
+    for threshold, subdivs in ((0.05, 4), (0.02, 8), (0.01, 16), (0.005, 24), (0.002, 32))
+)
+
+# ramp shared by the three lights: ((color, position), ...), ramp type, interpolation
+LIGHT_RAMP_DEFINITION = (
+    (((1, 1, 1), 0.0), ((0, 0, 0), 1.0)),
+    4,
+    3,
+)
 
 ARNOLD_PREFERENCE_PATH = os.path.join(BASE_PATH, 'resources/preferences/arnoldPrefs.json')
 VRAY_PREFERENCE_PATH = os.path.join(BASE_PATH, 'resources/preferences/vrayPrefs.json')
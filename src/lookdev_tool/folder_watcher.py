@@ -0,0 +1,313 @@
+import os
+import sys
+import queue
+import select
+import struct
+import logging
+import threading
+import collections
+import ctypes
+import ctypes.util
+from typing import Callable, Iterable, List, Optional
+
+FOLDER_WATCHER_LOGGER = logging.getLogger(__name__)
+FOLDER_WATCHER_LOGGER.setLevel(10)
+
+# kind is 'added', 'removed' or 'renamed', oldName is only set for 'renamed'
+FolderChange = collections.namedtuple('FolderChange', ['kind', 'name', 'oldName'])
+
+# inotify constants from <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')
+
+# statfs f_type of the network filesystems, inotify never reports the changes made by other hosts on them
+_NETWORK_FILESYSTEMS = {
+    0x6969: 'nfs',
+    0x517b: 'smb',
+    0xff534d42: 'cifs',
+    0xfe534d42: 'smb2',
+    0x65735546: 'fuse',
+    0x5346414f: 'afs',
+    0x00c36400: 'ceph',
+    0x01021997: '9p',
+    0x0bd00bd0: 'lustre',
+    0x47504653: 'gpfs',
+}
+
+
+class FolderWatcher(object):
+    """Watches a folder and reports the files added, removed or renamed in it.
+
+    The changes are queued from a background thread and consumed on the main thread with drain(), so the folder is
+    never listed again after the initial snapshot. On Linux local filesystems inotify is used. Elsewhere, network
+    shares included, the folder is polled and only listed when its mtime changes, renames are then detected through
+    the files' inodes.
+    """
+    def __init__(self, path: str, accept: Callable[[str], bool], names: Optional[Iterable[str]] = None,
+                 pollInterval: float = 2.0) -> None:
+        """
+        Parameters:
+            path: The watched folder.
+            accept: Filters the file names to report.
+            names: The accepted names already known by the caller. If None, the folder is listed by the watcher's
+                thread and every file is reported as added.
+            pollInterval: The polling period in seconds when inotify is not available.
+        """
+        self.path = path
+        self.accept = accept
+        self.pollInterval = pollInterval
+        self.names = set(names or ())
+        self._listed = names is not None
+        self._changes = queue.Queue()
+        self._stopEvent = threading.Event()
+        self._thread = None
+
+    def _listNames(self) -> List[str]:
+        return [entry.name for entry in os.scandir(self.path) if entry.is_file() and self.accept(entry.name)]
+
+    def start(self) -> None:
+        if self._thread:
+            return
+
+        target = self._runPolling
+        inotify = None
+        if sys.platform.startswith('linux') and not isNetworkFilesystem(self.path):
+            inotify = _Inotify.create(self.path)
+        if inotify:
+            target = lambda: self._runInotify(inotify)
+
+        self._thread = threading.Thread(target=target, name='FolderWatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopEvent.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def drain(self) -> List[FolderChange]:
+        """Returns the changes queued since the last call, to be called from the main thread"""
+        changes = []
+        while True:
+            try:
+                changes.append(self._changes.get_nowait())
+            except queue.Empty:
+                return changes
+
+    def _emit(self, kind: str, name: str, oldName: Optional[str] = None) -> None:
+        if kind == 'added':
+            self.names.add(name)
+        elif kind == 'removed':
+            self.names.discard(name)
+        else:
+            self.names.discard(oldName)
+            self.names.add(name)
+
+        self._changes.put(FolderChange(kind, name, oldName))
+
+    def _moved(self, oldName: str, newName: str) -> None:
+        oldAccepted = oldName in self.names
+        newAccepted = self.accept(newName)
+
+        if oldAccepted and newAccepted:
+            self._emit('renamed', newName, oldName)
+        elif oldAccepted:
+            self._emit('removed', oldName)
+        elif newAccepted:
+            self._emit('added', newName)
+
+    def _resync(self) -> None:
+        """Full listing, only used for the first listing and when inotify's queue overflowed"""
+        names = set(self._listNames())
+        for name in self.names - names:
+            self._emit('removed', name)
+        for name in names - self.names:
+            self._emit('added', name)
+
+    def _runInotify(self, inotify: '_Inotify') -> None:
+        try:
+            # watched before being listed, no file added in between is missed
+            if not self._listed:
+                self._resync()
+                self._listed = True
+
+            while not self._stopEvent.is_set():
+                events = inotify.read(timeout=0.5)
+                if events is None:
+                    FOLDER_WATCHER_LOGGER.debug('{} is not watched anymore'.format(self.path))
+                    return
+
+                movedFrom = {}
+                for mask, cookie, name in events:
+                    if mask & _IN_Q_OVERFLOW:
+                        self._resync()
+                    elif mask & _IN_MOVED_FROM:
+                        movedFrom[cookie] = name
+                    elif mask & _IN_MOVED_TO:
+                        if cookie in movedFrom:
+                            self._moved(movedFrom.pop(cookie), name)
+                        elif self.accept(name) and name not in self.names:
+                            self._emit('added', name)
+                    elif mask & _IN_CLOSE_WRITE:
+                        # written files are reported once complete, not when created
+                        if self.accept(name) and name not in self.names:
+                            self._emit('added', name)
+                    elif mask & _IN_DELETE:
+                        if name in self.names:
+                            self._emit('removed', name)
+
+                # moved out of the folder
+                for name in movedFrom.values():
+                    if name in self.names:
+                        self._emit('removed', name)
+        finally:
+            inotify.close()
+
+    def _runPolling(self) -> None:
+        lastMtime = None
+        inodes = {}
+        delay = 0
+
+        if self._listed:
+            # the caller's names are up to date, the folder is only listed once it changes
+            delay = self.pollInterval
+            try:
+                lastMtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                pass
+
+        while not self._stopEvent.wait(delay):
+            delay = self.pollInterval
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                # the share is unreachable, tried again on the next pass
+                continue
+
+            if mtime == lastMtime:
+                continue
+
+            lastMtime = mtime
+            current = {}
+            try:
+                for entry in os.scandir(self.path):
+                    if entry.is_file() and self.accept(entry.name):
+                        current[entry.inode()] = entry.name
+            except OSError:
+                lastMtime = None
+                continue
+
+            if not inodes:
+                # first listing, the names known so far are the reference
+                self._listed = True
+                inodes = current
+                for name in set(current.values()) - self.names:
+                    self._emit('added', name)
+                for name in self.names - set(current.values()):
+                    self._emit('removed', name)
+                continue
+
+            for inode, name in current.items():
+                oldName = inodes.get(inode)
+                if oldName is None:
+                    self._emit('added', name)
+                elif oldName != name:
+                    self._emit('renamed', name, oldName)
+
+            for inode, name in inodes.items():
+                if inode not in current and name in self.names:
+                    self._emit('removed', name)
+
+            inodes = current
+
+
+def isNetworkFilesystem(path: str) -> bool:
+    """True if path is on a network filesystem, Linux only, where inotify misses the other hosts' changes"""
+    libraryName = ctypes.util.find_library('c')
+    if not libraryName:
+        return False
+
+    # struct statfs starts with f_type, a native long, the buffer is larger than the whole struct
+    buffer = ctypes.create_string_buffer(256)
+    try:
+        libc = ctypes.CDLL(libraryName, use_errno=True)
+        if libc.statfs(os.fsencode(path), buffer) != 0:
+            return False
+    except (OSError, AttributeError):
+        return False
+
+    fileSystemType = ctypes.c_ulong.from_buffer(buffer).value & 0xffffffff
+    if fileSystemType in _NETWORK_FILESYSTEMS:
+        FOLDER_WATCHER_LOGGER.debug('{} is on {}, polled'.format(path, _NETWORK_FILESYSTEMS[fileSystemType]))
+        return True
+
+    return False
+
+
+class _Inotify(object):
+    """Minimal ctypes binding of the Linux inotify API"""
+    def __init__(self, libc, fileDescriptor: int) -> None:
+        self._libc = libc
+        self.fileDescriptor = fileDescriptor
+
+    @classmethod
+    def create(cls, path: str) -> Optional['_Inotify']:
+        """Returns an _Inotify watching path, None if inotify is not available"""
+        libraryName = ctypes.util.find_library('c')
+        if not libraryName:
+            return None
+
+        try:
+            libc = ctypes.CDLL(libraryName, use_errno=True)
+            fileDescriptor = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+
+        if fileDescriptor < 0:
+            return None
+
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE | _IN_DELETE_SELF | _IN_ONLYDIR
+        if libc.inotify_add_watch(fileDescriptor, os.fsencode(path), mask) < 0:
+            FOLDER_WATCHER_LOGGER.debug('inotify_add_watch failed on {}: {}'.format(path, os.strerror(ctypes.get_errno())))
+            os.close(fileDescriptor)
+            return None
+
+        return cls(libc, fileDescriptor)
+
+    def read(self, timeout: float):
+        """Returns a list of (mask, cookie, name), None once the watched folder is gone"""
+        readable, _, _ = select.select([self.fileDescriptor], [], [], timeout)
+        if not readable:
+            return []
+
+        try:
+            data = os.read(self.fileDescriptor, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            _, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & (_IN_DELETE_SELF | _IN_IGNORED):
+                return None
+
+            events.append((mask, cookie, name))
+
+        return events
+
+    def close(self) -> None:
+        os.close(self.fileDescriptor)
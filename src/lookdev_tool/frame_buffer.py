@@ -0,0 +1,305 @@
+"""Frame buffer shared between a render process and the tool's render viewer, runs without Maya.
+
+The buffer is a memory-mapped file: a header, a ring of the last updated tiles and the RGBA float32 pixels. The
+render process writes tiles straight into the mapping, the viewer reads the tiles updated since its last look from
+the same pages, no frame is ever copied between the two processes.
+
+Batch usage:
+    python frame_buffer.py stub buffer.bin [--width N] [--height N] [--delay S]     progressive test render
+    python frame_buffer.py publish buffer.bin image.exr                             (inside mayapy)
+"""
+import os
+import sys
+import mmap
+import time
+import glob
+import ctypes
+import struct
+import argparse
+import collections
+from typing import List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b'LDFB'
+VERSION = 1
+CHANNELS = 4
+
+# magic, version, width, height, frame id, generation, generation the frame started at, completed frame id, name
+_HEADER = struct.Struct('<4sIIIQQQQ64s')
+_TILE = struct.Struct('<QIIII')
+RING_SIZE = 1024
+_RING_OFFSET = 128
+_PIXELS_OFFSET = _RING_OFFSET + RING_SIZE * _TILE.size
+
+TILE_SIZE = 64
+
+# images already published by this render process
+_PUBLISHED = set()
+
+FrameHeader = collections.namedtuple('FrameHeader', ['width', 'height', 'frameId', 'generation', 'startGeneration',
+                                                     'completedFrame', 'name'])
+Tile = collections.namedtuple('Tile', ['x', 'y', 'width', 'height'])
+
+
+def isAvailable() -> bool:
+    """True if NumPy can be imported, the frame buffer needs it"""
+    return np is not None
+
+
+def _requireNumpy() -> None:
+    if np is None:
+        raise RuntimeError('NumPy is required by the frame buffer')
+
+
+class FrameBuffer(object):
+    """Memory-mapped RGBA float32 frame, written tile by tile by one process and read by others.
+
+    A tile is published by writing its pixels, then its entry in the ring, then the generation: a reader seeing a
+    generation always finds its pixels in place.
+    """
+    def __init__(self, path: str) -> None:
+        """Maps an existing buffer, see create() for a new one"""
+        _requireNumpy()
+
+        self.path = path
+        with open(path, 'r+b') as rwFile:
+            self._inode = os.fstat(rwFile.fileno()).st_ino
+            self._map = mmap.mmap(rwFile.fileno(), 0)
+
+        magic, version, self.width, self.height = _HEADER.unpack_from(self._map)[:4]
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise RuntimeError('{} is not a frame buffer'.format(path))
+
+        # the pixels are read and written in place
+        self.pixels = np.ndarray((self.height, self.width, CHANNELS), dtype=np.float32, buffer=self._map,
+                                 offset=_PIXELS_OFFSET)
+
+    @classmethod
+    def create(cls, path: str, width: int, height: int) -> 'FrameBuffer':
+        """Maps the buffer at path, a new file replaces it if its resolution differs
+
+        The file is replaced, never resized, so the viewers still mapping the old one are never cut off.
+        """
+        try:
+            frameBuffer = cls(path)
+            if (frameBuffer.width, frameBuffer.height) == (width, height):
+                return frameBuffer
+            frameBuffer.close()
+        except (OSError, RuntimeError, ValueError):
+            pass
+
+        tmpPath = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmpPath, 'wb') as wFile:
+            wFile.truncate(_PIXELS_OFFSET + width * height * CHANNELS * 4)
+            wFile.write(_HEADER.pack(MAGIC, VERSION, width, height, 0, 0, 0, 0, b''))
+
+        os.replace(tmpPath, path)
+        return cls(path)
+
+    def close(self) -> None:
+        self.pixels = None
+        try:
+            self._map.close()
+        except BufferError:
+            # tiles are still viewed by the caller, the mapping is released with them
+            pass
+
+    def isStale(self) -> bool:
+        """True if the file has been replaced by a buffer of another resolution"""
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except OSError:
+            return True
+
+    def header(self) -> FrameHeader:
+        values = _HEADER.unpack_from(self._map)
+        return FrameHeader(*values[2:8], values[8].rstrip(b'\0').decode('utf-8', 'replace'))
+
+    def _setHeader(self, header: FrameHeader) -> None:
+        _HEADER.pack_into(self._map, 0, MAGIC, VERSION, *header[:-1], header.name.encode('utf-8')[:64])
+
+    def beginFrame(self, name: str = '') -> int:
+        """Starts a new frame, the viewers drop what they show of the previous one
+
+        Returns:
+            The frame's id.
+        """
+        header = self.header()
+        self._setHeader(header._replace(frameId=header.frameId + 1, startGeneration=header.generation, name=name))
+        return header.frameId + 1
+
+    def writeTile(self, x: int, y: int, tile) -> None:
+        """Writes a (height, width, 3 or 4) tile at x, y, y going down"""
+        height, width, channels = tile.shape
+        self.pixels[y:y + height, x:x + width, :channels] = tile
+        if channels < CHANNELS:
+            self.pixels[y:y + height, x:x + width, 3] = 1.0
+
+        header = self.header()
+        generation = header.generation + 1
+        _TILE.pack_into(self._map, _RING_OFFSET + (generation % RING_SIZE) * _TILE.size, generation, x, y, width,
+                        height)
+        self._setHeader(header._replace(generation=generation))
+
+    def endFrame(self) -> None:
+        header = self.header()
+        self._setHeader(header._replace(completedFrame=header.frameId))
+
+    def updates(self, sinceGeneration: int) -> Optional[List[Tile]]:
+        """Returns the tiles written after sinceGeneration, oldest first
+
+        Returns:
+            None if more tiles have been written than the ring holds, the whole frame must be read again.
+        """
+        generation = self.header().generation
+        if generation - sinceGeneration > RING_SIZE - 1:
+            return None
+
+        tiles = []
+        for tileGeneration in range(sinceGeneration + 1, generation + 1):
+            entry = _TILE.unpack_from(self._map, _RING_OFFSET + (tileGeneration % RING_SIZE) * _TILE.size)
+            # overwritten while read, the writer went around the ring
+            if entry[0] != tileGeneration:
+                return None
+            tiles.append(Tile(*entry[1:]))
+
+        return tiles
+
+
+def toDisplay(pixels, out=None, exposure: float = 0.0):
+    """Converts linear float pixels to sRGB uint8 RGBA
+
+    Parameters:
+        pixels: (height, width, 4) linear float array.
+        out: (height, width, 4) uint8 array written in place, a new one if None.
+        exposure: Exposure in stops.
+    """
+    linear = np.clip(pixels[..., :3] * (2.0 ** exposure), 0.0, 1.0)
+    display = np.where(linear <= 0.0031308, linear * 12.92, 1.055 * np.power(linear, 1.0 / 2.4) - 0.055)
+
+    if out is None:
+        out = np.empty(pixels.shape[:2] + (4,), dtype=np.uint8)
+
+    out[..., :3] = display * 255.0 + 0.5
+    out[..., 3] = np.clip(pixels[..., 3], 0.0, 1.0) * 255.0 + 0.5
+    return out
+
+
+def publishImage(bufferPath: str, pixels, name: str = '', tileSize: int = TILE_SIZE) -> None:
+    """Writes a whole image in the buffer as a new frame, tile by tile
+
+    Parameters:
+        bufferPath: The frame buffer's file.
+        pixels: (height, width, 3 or 4) linear float array, top row first.
+        name: The frame's name shown by the viewers.
+        tileSize: The tiles' width and height.
+    """
+    height, width = pixels.shape[:2]
+    frameBuffer = FrameBuffer.create(bufferPath, width, height)
+    try:
+        frameBuffer.beginFrame(name)
+        for y in range(0, height, tileSize):
+            for x in range(0, width, tileSize):
+                frameBuffer.writeTile(x, y, pixels[y:y + tileSize, x:x + tileSize])
+        frameBuffer.endFrame()
+    finally:
+        frameBuffer.close()
+
+
+def readImageFile(path: str):
+    """Reads an image with Maya's MImage, returns a (height, width, 4) float32 array, top row first"""
+    import maya.api.OpenMaya as om
+
+    image = om.MImage()
+    image.readFromFile(path, om.MImage.kFloat)
+    width, height = image.getSize()
+
+    buffer = (ctypes.c_float * (width * height * 4)).from_address(int(image.floatPixels()))
+    # MImage rows go bottom to top
+    return np.ndarray(shape=(height, width, 4), buffer=buffer, dtype=np.float32)[::-1].copy()
+
+
+def publishRenderedImages(bufferPath: str, imageDir: str, since: float) -> int:
+    """Publishes the images rendered in imageDir after since, called by the render process after each frame
+
+    Parameters:
+        bufferPath: The frame buffer's file.
+        imageDir: The render's output folder.
+        since: Time the render started at, older images are left out.
+
+    Returns:
+        The number of images published.
+    """
+    imagePaths = [path for path in glob.glob(os.path.join(imageDir, '**', '*.*'), recursive=True)
+                  if path not in _PUBLISHED and os.path.getmtime(path) >= since]
+
+    for imagePath in sorted(imagePaths, key=os.path.getmtime):
+        publishImage(bufferPath, readImageFile(imagePath), os.path.relpath(imagePath, imageDir))
+        _PUBLISHED.add(imagePath)
+
+    return len(imagePaths)
+
+
+def postFrameCommand(bufferPath: str, imageDir: str) -> str:
+    """Returns the MEL command publishing each rendered frame, for Render -postFrame"""
+    return 'python("from lookdev_tool import frame_buffer; frame_buffer.publishRenderedImages(\'{}\', \'{}\', {})")'.format(
+        bufferPath.replace('\\', '/'), imageDir.replace('\\', '/'), time.time())
+
+
+def stubRender(bufferPath: str, width: int = 320, height: int = 180, tileSize: int = TILE_SIZE,
+               delay: float = 0.01, name: str = 'stub') -> None:
+    """Renders a gradient tile by tile in the buffer, stands in for a render process"""
+    _requireNumpy()
+
+    frameBuffer = FrameBuffer.create(bufferPath, width, height)
+    try:
+        frameBuffer.beginFrame(name)
+        rows, columns = np.mgrid[0:height, 0:width].astype(np.float32)
+        image = np.stack((columns / width, rows / height, np.full_like(rows, 0.25)), axis=-1)
+
+        for y in range(0, height, tileSize):
+            for x in range(0, width, tileSize):
+                frameBuffer.writeTile(x, y, image[y:y + tileSize, x:x + tileSize])
+                time.sleep(delay)
+
+        frameBuffer.endFrame()
+    finally:
+        frameBuffer.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Writes frames in the lookdev tool\'s frame buffer.')
+    subparsers = parser.add_subparsers(dest='command')
+
+    stubParser = subparsers.add_parser('stub')
+    stubParser.add_argument('bufferPath')
+    stubParser.add_argument('--width', type=int, default=320)
+    stubParser.add_argument('--height', type=int, default=180)
+    stubParser.add_argument('--delay', type=float, default=0.01)
+
+    publishParser = subparsers.add_parser('publish')
+    publishParser.add_argument('bufferPath')
+    publishParser.add_argument('imagePath')
+
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == 'stub':
+        stubRender(arguments.bufferPath, arguments.width, arguments.height, delay=arguments.delay)
+    elif arguments.command == 'publish':
+        import maya.standalone
+        maya.standalone.initialize(name='python')
+        publishImage(arguments.bufferPath, readImageFile(arguments.imagePath), os.path.basename(arguments.imagePath))
+    else:
+        parser.print_usage()
+        return 2
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
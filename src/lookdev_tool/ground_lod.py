@@ -0,0 +1,126 @@
+"""Decimated proxies of the grounds, generated in a mayapy batch process.
+
+A proxy keeps the base name of its ground (<lodDir>/<key>/ground_2_arnold.ma) so that once loaded in place of the
+full ground, the referenced nodes keep their ground_2_arnold_ prefix.
+
+Batch usage, run by generateProxy:
+    mayapy -m lookdev_tool.ground_lod source.ma target.ma ratio
+"""
+import os
+import sys
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+from concurrent import futures
+from typing import Callable, Dict, Optional
+
+from lookdev_tool.Utils.maya_executables import mayaExecutable, packageEnvironment
+
+GROUND_LOD_LOGGER = logging.getLogger(__name__)
+GROUND_LOD_LOGGER.setLevel(10)
+
+LOD_FULL = 'full'
+LOD_PROXY = 'proxy'
+
+_EXECUTOR = futures.ThreadPoolExecutor(max_workers=1)
+_PENDING: Dict[str, futures.Future] = {}
+_LOCK = threading.Lock()
+
+
+def proxyPath(lodDir: str, sourcePath: str, ratio: float) -> str:
+    """Returns where the proxy of sourcePath is cached, the key changes with the source's size, mtime and ratio
+
+    Parameters:
+        lodDir: The proxies' cache folder.
+        sourcePath: The full ground's path.
+        ratio: The proportion of polygons kept.
+    """
+    stat = os.stat(sourcePath)
+    key = hashlib.sha1('{}|{}|{}|{}'.format(os.path.abspath(sourcePath), stat.st_size, stat.st_mtime, ratio).encode('utf-8'))
+
+    return os.path.join(lodDir, key.hexdigest(), os.path.basename(sourcePath))
+
+
+def readyProxyPath(lodDir: str, sourcePath: str, ratio: float) -> Optional[str]:
+    """Returns the proxy's path if it has already been generated"""
+    path = proxyPath(lodDir, sourcePath, ratio)
+    return path if os.path.isfile(path) else None
+
+
+def generateProxy(lodDir: str, sourcePath: str, ratio: float,
+                  onReady: Optional[Callable[[str], None]] = None) -> futures.Future:
+    """Generates the proxy of sourcePath in a background mayapy process
+
+    Parameters:
+        lodDir: The proxies' cache folder.
+        sourcePath: The full ground's path.
+        ratio: The proportion of polygons kept.
+        onReady: Called with the proxy's path (from a worker thread) once generated.
+    """
+    targetPath = proxyPath(lodDir, sourcePath, ratio)
+
+    with _LOCK:
+        future = _PENDING.get(targetPath)
+        if future is None:
+            future = _EXECUTOR.submit(_runBatch, sourcePath, targetPath, ratio)
+            future.add_done_callback(lambda done: _PENDING.pop(targetPath, None))
+            _PENDING[targetPath] = future
+
+    if onReady:
+        future.add_done_callback(lambda done: done.exception() is None and onReady(done.result()))
+
+    return future
+
+
+def _runBatch(sourcePath: str, targetPath: str, ratio: float) -> str:
+    startTime = time.perf_counter()
+    command = [mayaExecutable('mayapy'), '-m', 'lookdev_tool.ground_lod', sourcePath, targetPath, str(ratio)]
+
+    process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
+                             env=packageEnvironment())
+    if process.returncode != 0:
+        GROUND_LOD_LOGGER.error('proxy generation of {} failed:\n{}'.format(sourcePath, process.stdout))
+        raise RuntimeError('proxy generation of {} failed'.format(sourcePath))
+
+    elapsed = time.perf_counter() - startTime
+    GROUND_LOD_LOGGER.debug('proxy of {} generated in {:.3f}s'.format(sourcePath, elapsed),
+                            extra={'operation': 'groundProxy', 'elapsed': elapsed})
+    return targetPath
+
+
+def decimate(sourcePath: str, targetPath: str, ratio: float) -> None:
+    """Saves a copy of sourcePath keeping ratio of each mesh's polygons, runs inside mayapy"""
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    from maya import cmds
+
+    cmds.file(sourcePath, open=True, force=True)
+
+    for mesh in cmds.ls(type='mesh', noIntermediate=True, long=True) or []:
+        cmds.polyReduce(mesh, version=1, percentage=(1.0 - ratio) * 100.0, keepQuadsWeight=1.0,
+                        keepBorder=True, replaceOriginal=True)
+
+    cmds.delete(cmds.ls(type='mesh', long=True), constructionHistory=True)
+
+    # saved under the same base name, moved once complete so a partial file is never picked up
+    lodDir = os.path.dirname(os.path.dirname(targetPath))
+    os.makedirs(lodDir, exist_ok=True)
+    tmpDir = tempfile.mkdtemp(dir=lodDir)
+    tmpPath = os.path.join(tmpDir, os.path.basename(targetPath))
+    cmds.file(rename=tmpPath)
+    cmds.file(save=True, type='mayaAscii', force=True)
+
+    os.makedirs(os.path.dirname(targetPath), exist_ok=True)
+    os.replace(tmpPath, targetPath)
+    shutil.rmtree(tmpDir, ignore_errors=True)
+
+    maya.standalone.uninitialize()
+
+
+if __name__ == '__main__':
+    decimate(sys.argv[1], sys.argv[2], float(sys.argv[3]))
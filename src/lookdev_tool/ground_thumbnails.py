@@ -0,0 +1,261 @@
+"""Thumbnails of the grounds, rendered offline so picking a ground never references it.
+
+A thumbnail is keyed by the hash of its ground's content, it is rendered again only when the ground changes. Each
+ground is prepared in its own mayapy process (camera framing the ground) then rendered with Maya Hardware 2.0, the
+grounds are processed in parallel.
+
+Batch usage:
+    python -m lookdev_tool.ground_thumbnails generate [--stub] [--workers N] [--size N] thumbnailDir ground.ma ...
+    mayapy -m lookdev_tool.ground_thumbnails prepare source.ma scene.ma size      (run by BatchRenderer)
+"""
+import os
+import sys
+import glob
+import math
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent import futures
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from lookdev_tool.Utils.image_utils import writePng
+from lookdev_tool.Utils.maya_executables import mayaExecutable, packageEnvironment
+
+GROUND_THUMBNAILS_LOGGER = logging.getLogger(__name__)
+GROUND_THUMBNAILS_LOGGER.setLevel(10)
+
+THUMBNAIL_SIZE = 128
+THUMBNAIL_CAMERA = 'thumbnailCam'
+
+# three quarter view from above, room left around the ground
+CAMERA_ROTATION = (-30.0, 45.0, 0.0)
+FRAMING_MARGIN = 1.05
+
+# content hashes by (path, size, mtime), a ground is only read again once changed
+_HASHES: Dict[Tuple[str, int, float], str] = {}
+_LOCK = threading.Lock()
+
+
+def sourceHash(sourcePath: str) -> str:
+    """Returns the sha1 of the ground's content"""
+    stat = os.stat(sourcePath)
+    statKey = (os.path.abspath(sourcePath), stat.st_size, stat.st_mtime)
+
+    with _LOCK:
+        if statKey in _HASHES:
+            return _HASHES[statKey]
+
+    key = hashlib.sha1()
+    with open(sourcePath, 'rb') as rFile:
+        for chunk in iter(lambda: rFile.read(1024 * 1024), b''):
+            key.update(chunk)
+
+    with _LOCK:
+        _HASHES[statKey] = key.hexdigest()
+
+    return _HASHES[statKey]
+
+
+def thumbnailPath(thumbnailDir: str, sourcePath: str, size: int = THUMBNAIL_SIZE) -> str:
+    """Returns where the thumbnail of sourcePath is cached
+
+    Parameters:
+        thumbnailDir: The thumbnails' cache folder.
+        sourcePath: The ground's path.
+        size: The thumbnail's width and height.
+    """
+    return os.path.join(thumbnailDir, '{}_{}.png'.format(sourceHash(sourcePath), size))
+
+
+def readyThumbnailPath(thumbnailDir: str, sourcePath: str, size: int = THUMBNAIL_SIZE) -> Optional[str]:
+    """Returns the thumbnail's path if it has already been rendered"""
+    path = thumbnailPath(thumbnailDir, sourcePath, size)
+    return path if os.path.isfile(path) else None
+
+
+class StubRenderer(object):
+    """Writes a flat color thumbnail derived from the ground's hash, runs without Maya"""
+    def __init__(self, delay: float = 0.0) -> None:
+        """
+        Parameters:
+            delay: Seconds spent per thumbnail, to mimic a render.
+        """
+        self.delay = delay
+
+    def render(self, sourcePath: str, targetPath: str, size: int) -> None:
+        time.sleep(self.delay)
+        color = bytes.fromhex(sourceHash(sourcePath)[:6])
+        writePng(targetPath, [color * size] * size, size)
+
+
+class BatchRenderer(object):
+    """Frames the ground in a mayapy process then renders it with Maya Hardware 2.0"""
+    def render(self, sourcePath: str, targetPath: str, size: int) -> None:
+        folder = tempfile.mkdtemp(prefix='lookdev_thumbnail_')
+        try:
+            scenePath = os.path.join(folder, 'thumbnail.ma')
+            command = [mayaExecutable('mayapy'), '-m', 'lookdev_tool.ground_thumbnails', 'prepare', sourcePath,
+                       scenePath, str(size)]
+            process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
+                                     env=packageEnvironment())
+            if process.returncode != 0:
+                raise RuntimeError('thumbnail scene of {} failed:\n{}'.format(sourcePath, process.stdout))
+
+            command = [mayaExecutable('Render'), '-r', 'hw2', '-x', str(size), '-y', str(size),
+                       '-cam', THUMBNAIL_CAMERA, '-of', 'png', '-rd', folder, '-im', 'thumbnail', scenePath]
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+            imagePaths = glob.glob(os.path.join(folder, '**', 'thumbnail*.png'), recursive=True)
+            if not imagePaths:
+                raise RuntimeError('thumbnail render of {} failed: {}'.format(sourcePath, ' '.join(command)))
+
+            shutil.move(imagePaths[0], targetPath)
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+def prepareScene(sourcePath: str, scenePath: str, size: int) -> None:
+    """Opens the ground and adds a camera framing it, runs inside mayapy"""
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    from maya import cmds
+
+    cmds.file(sourcePath, open=True, force=True)
+
+    meshes = cmds.ls(type='mesh', noIntermediate=True, long=True) or []
+    if not meshes:
+        raise RuntimeError('{} has no mesh'.format(sourcePath))
+
+    xMin, yMin, zMin, xMax, yMax, zMax = cmds.exactWorldBoundingBox(meshes)
+    center = ((xMin + xMax) * 0.5, (yMin + yMax) * 0.5, (zMin + zMax) * 0.5)
+    radius = math.sqrt((xMax - xMin) ** 2 + (yMax - yMin) ** 2 + (zMax - zMin) ** 2) * 0.5
+
+    camera = cmds.rename(cmds.camera()[0], THUMBNAIL_CAMERA)
+    cmds.setAttr('{}.rotate'.format(camera), *CAMERA_ROTATION)
+
+    # the camera looks down its -Z axis, it is moved back along +Z until the bounding sphere fits
+    backward = cmds.xform(camera, query=True, matrix=True, worldSpace=True)[8:11]
+    fieldOfView = math.radians(cmds.camera(camera, query=True, horizontalFieldOfView=True))
+    distance = radius / math.sin(fieldOfView * 0.5) * FRAMING_MARGIN
+    cmds.setAttr('{}.translate'.format(camera), *(center[axis] + backward[axis] * distance for axis in range(3)))
+    cmds.setAttr('{}.farClipPlane'.format(cmds.listRelatives(camera, shapes=True)[0]), distance + radius * 2.0)
+
+    for otherCamera in cmds.ls(type='camera'):
+        cmds.setAttr('{}.renderable'.format(otherCamera), otherCamera.startswith(THUMBNAIL_CAMERA))
+
+    cmds.setAttr('defaultResolution.width', size)
+    cmds.setAttr('defaultResolution.height', size)
+    cmds.setAttr('defaultResolution.deviceAspectRatio', 1.0)
+
+    cmds.file(rename=scenePath)
+    cmds.file(save=True, type='mayaAscii', force=True)
+
+    maya.standalone.uninitialize()
+
+
+def generateThumbnails(thumbnailDir: str, sourcePaths: Sequence[str], size: int = THUMBNAIL_SIZE, renderer=None,
+                       workers: int = 4, job=None) -> Dict[str, Optional[str]]:
+    """Renders the missing thumbnails in parallel, the cached ones are kept
+
+    Parameters:
+        thumbnailDir: The thumbnails' cache folder.
+        sourcePaths: The grounds' paths.
+        size: The thumbnails' width and height.
+        renderer: Object with a render(sourcePath, targetPath, size) method, BatchRenderer if None.
+        workers: The number of grounds rendered at the same time.
+        job: The jobs.Job running the generation, its progress is reported and its cancellation checked.
+
+    Returns:
+        {ground's path: thumbnail's path, None if its render failed}.
+    """
+    startTime = time.perf_counter()
+    renderer = renderer or BatchRenderer()
+    os.makedirs(thumbnailDir, exist_ok=True)
+
+    thumbnails = {sourcePath: readyThumbnailPath(thumbnailDir, sourcePath, size) for sourcePath in sourcePaths}
+    missing = [sourcePath for sourcePath, path in thumbnails.items() if path is None]
+
+    def render(sourcePath: str) -> str:
+        if job:
+            job.checkCancelled()
+
+        # rendered next to its target and moved once complete, a partial thumbnail is never picked up
+        targetPath = thumbnailPath(thumbnailDir, sourcePath, size)
+        tmpPath = '{}.{}.tmp.png'.format(targetPath, threading.get_ident())
+        try:
+            renderer.render(sourcePath, tmpPath, size)
+            os.replace(tmpPath, targetPath)
+        finally:
+            if os.path.exists(tmpPath):
+                os.remove(tmpPath)
+
+        return targetPath
+
+    with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = {executor.submit(render, sourcePath): sourcePath for sourcePath in missing}
+        for done, future in enumerate(futures.as_completed(pending), 1):
+            sourcePath = pending[future]
+            try:
+                thumbnails[sourcePath] = future.result()
+            except Exception as error:
+                if job and job.cancelled:
+                    continue
+                GROUND_THUMBNAILS_LOGGER.error('thumbnail of {} failed: {}'.format(sourcePath, error))
+
+            if job:
+                job.reportProgress(done / len(pending), 'Ground thumbnails {}/{}'.format(done, len(pending)))
+
+    if job:
+        job.checkCancelled()
+
+    elapsed = time.perf_counter() - startTime
+    GROUND_THUMBNAILS_LOGGER.debug('{} ground thumbnails rendered in {:.3f}s, {} cached'.format(
+        len(missing), elapsed, len(sourcePaths) - len(missing)),
+        extra={'operation': 'groundThumbnails', 'elapsed': elapsed})
+
+    return thumbnails
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Renders the thumbnails of the lookdev grounds.')
+    subparsers = parser.add_subparsers(dest='command')
+
+    generateParser = subparsers.add_parser('generate')
+    generateParser.add_argument('thumbnailDir')
+    generateParser.add_argument('sourcePaths', nargs='+')
+    generateParser.add_argument('--size', type=int, default=THUMBNAIL_SIZE)
+    generateParser.add_argument('--workers', type=int, default=4)
+    generateParser.add_argument('--stub', action='store_true', help='Flat colors instead of renders, without Maya')
+
+    prepareParser = subparsers.add_parser('prepare')
+    prepareParser.add_argument('sourcePath')
+    prepareParser.add_argument('scenePath')
+    prepareParser.add_argument('size', type=int)
+
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == 'prepare':
+        prepareScene(arguments.sourcePath, arguments.scenePath, arguments.size)
+        return 0
+
+    if arguments.command != 'generate':
+        parser.print_usage()
+        return 2
+
+    thumbnails = generateThumbnails(arguments.thumbnailDir, arguments.sourcePaths, arguments.size,
+                                    StubRenderer() if arguments.stub else None, arguments.workers)
+    for sourcePath, path in thumbnails.items():
+        print('{}: {}'.format(sourcePath, path or 'failed'))
+
+    return 0 if all(thumbnails.values()) else 1
+
+
+if __name__ == '__main__':
+    logging.basicConfig()
+    sys.exit(main())
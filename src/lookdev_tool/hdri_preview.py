@@ -0,0 +1,224 @@
+"""Diffuse preview of an HDRI from its spherical harmonics, runs without Maya except to read the image.
+
+The equirect is projected once on the 9 coefficients of the first three SH bands, which hold the diffuse lighting of
+the environment (Ramamoorthi & Hanrahan). Shading a preview sphere for a dome rotation and intensity then only
+evaluates 9 basis functions per pixel.
+"""
+import os
+import json
+import time
+import ctypes
+import hashlib
+import logging
+import collections
+from typing import Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HDRI_PREVIEW_LOGGER = logging.getLogger(__name__)
+HDRI_PREVIEW_LOGGER.setLevel(10)
+
+# width the HDRI is resized to before the projection, the first bands don't need more
+PROJECTION_WIDTH = 256
+
+# cosine lobe convolution of each band
+_BAND_FACTORS = (np.pi, 2.0 * np.pi / 3.0, np.pi / 4.0) if np is not None else ()
+
+# coefficients in memory, by HDRI path and modification time
+_COEFFICIENTS = collections.OrderedDict()
+_MEMORY_CACHE_SIZE = 32
+
+
+def isAvailable() -> bool:
+    """True if NumPy can be imported, the preview is disabled otherwise"""
+    return np is not None
+
+
+def _requireNumpy() -> None:
+    if np is None:
+        raise RuntimeError('NumPy is required to preview the HDRIs')
+
+
+def shBasis(directions):
+    """Returns the 9 real SH basis functions of the first three bands
+
+    Parameters:
+        directions: (..., 3) unit vectors.
+
+    Returns:
+        (..., 9) array.
+    """
+    x, y, z = directions[..., 0], directions[..., 1], directions[..., 2]
+    return np.stack((
+        np.full_like(x, 0.282095),
+        0.488603 * y,
+        0.488603 * z,
+        0.488603 * x,
+        1.092548 * x * y,
+        1.092548 * y * z,
+        0.315392 * (3.0 * z * z - 1.0),
+        1.092548 * x * z,
+        0.546274 * (x * x - y * y),
+    ), axis=-1)
+
+
+def equirectDirections(height: int, width: int):
+    """Returns the direction and the solid angle of each pixel of an equirect
+
+    Y is up, the image's center looks down -Z.
+
+    Returns:
+        (height, width, 3) directions, (height, 1) solid angles.
+    """
+    theta = (np.arange(height) + 0.5) * (np.pi / height)
+    phi = (np.arange(width) + 0.5) * (2.0 * np.pi / width) - np.pi
+
+    sinTheta = np.sin(theta)[:, None]
+    directions = np.empty((height, width, 3))
+    directions[..., 0] = sinTheta * np.sin(phi)[None, :]
+    directions[..., 1] = np.cos(theta)[:, None]
+    directions[..., 2] = -sinTheta * np.cos(phi)[None, :]
+
+    solidAngles = sinTheta * (np.pi / height) * (2.0 * np.pi / width)
+    return directions, solidAngles
+
+
+def projectEquirect(image):
+    """Projects an equirect's radiance on the SH basis
+
+    Parameters:
+        image: (height, width, channels) linear float array, the first three channels are used.
+
+    Returns:
+        (9, 3) coefficients.
+    """
+    _requireNumpy()
+
+    image = np.asarray(image, dtype=np.float64)[..., :3]
+    directions, solidAngles = equirectDirections(image.shape[0], image.shape[1])
+    weighted = image * solidAngles[..., None]
+
+    return np.einsum('hwk,hwc->kc', shBasis(directions), weighted)
+
+
+def readEquirect(path: str, width: int = PROJECTION_WIDTH):
+    """Reads an HDRI with Maya's MImage resized to width, returns a (height, width, 4) float array, top row first
+
+    MImage is only called on the main thread, workers read through jobs.MainThreadBridge.call.
+    """
+    import maya.api.OpenMaya as om
+
+    image = om.MImage()
+    image.readFromFile(path, om.MImage.kFloat)
+    image.resize(width, width // 2, False)
+    width, height = image.getSize()
+
+    buffer = (ctypes.c_float * (width * height * 4)).from_address(int(image.floatPixels()))
+    # MImage rows go bottom to top
+    return np.ndarray(shape=(height, width, 4), buffer=buffer, dtype=np.float32)[::-1].astype(np.float64)
+
+
+def _cacheKey(path: str) -> Tuple[str, float, int]:
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime, stat.st_size
+
+
+def hdriCoefficients(path: str, cachePath: str, reader=readEquirect):
+    """Returns the SH coefficients of an HDRI, projected once and cached in memory and on disk
+
+    Parameters:
+        path: The HDRI's path.
+        cachePath: Folder of the cached coefficients, keyed by the HDRI's path and modification time,
+            constants.HDRI_SH_CACHE_PATH in the tool.
+        reader: Returns the HDRI's pixels from its path, readEquirect by default.
+
+    Returns:
+        (9, 3) coefficients.
+    """
+    _requireNumpy()
+
+    key = _cacheKey(path)
+    if key in _COEFFICIENTS:
+        _COEFFICIENTS.move_to_end(key)
+        return _COEFFICIENTS[key]
+
+    cacheFile = os.path.join(cachePath, '{}.json'.format(hashlib.sha1(repr(key).encode('utf-8')).hexdigest()))
+    if os.path.isfile(cacheFile):
+        with open(cacheFile, 'r') as rFile:
+            coefficients = np.array(json.load(rFile))
+    else:
+        startTime = time.perf_counter()
+        coefficients = projectEquirect(reader(path))
+        elapsed = time.perf_counter() - startTime
+        HDRI_PREVIEW_LOGGER.debug('{} projected in {:.3f}s'.format(path, elapsed),
+                                  extra={'operation': 'hdriProjection', 'elapsed': elapsed})
+
+        os.makedirs(cachePath, exist_ok=True)
+        with open(cacheFile, 'w') as wFile:
+            json.dump(coefficients.tolist(), wFile)
+
+    _COEFFICIENTS[key] = coefficients
+    while len(_COEFFICIENTS) > _MEMORY_CACHE_SIZE:
+        _COEFFICIENTS.popitem(last=False)
+
+    return coefficients
+
+
+_SPHERES = {}
+
+
+def _sphereNormals(size: int):
+    """Returns the normals of a sphere filling a size x size image, facing +Z, and its mask"""
+    if size not in _SPHERES:
+        coordinates = (np.arange(size) + 0.5) / size * 2.0 - 1.0
+        x, y = np.meshgrid(coordinates, -coordinates)
+        squaredRadius = x * x + y * y
+        mask = squaredRadius < 1.0
+
+        normals = np.stack((x, y, np.sqrt(np.clip(1.0 - squaredRadius, 0.0, None))), axis=-1)
+        _SPHERES[size] = (normals[mask], mask)
+
+    return _SPHERES[size]
+
+
+def previewSphere(coefficients, size: int = 64, rotation: float = 0.0, intensity: float = 1.0,
+                  albedo: float = 0.18, exposure: float = 0.0):
+    """Shades a diffuse sphere lit by the HDRI
+
+    Parameters:
+        coefficients: The HDRI's SH coefficients.
+        size: The image's width and height in pixels.
+        rotation: The dome's rotateY in degrees.
+        intensity: The dome's intensity.
+        albedo: The sphere's diffuse albedo, middle grey by default.
+        exposure: Exposure in stops applied before the display transform.
+
+    Returns:
+        (size, size, 4) uint8 RGBA image, sRGB, transparent around the sphere.
+    """
+    _requireNumpy()
+
+    normals, mask = _sphereNormals(size)
+
+    # rotating the dome by angle lights a normal as the unrotated dome lights the normal rotated by -angle
+    angle = np.radians(rotation)
+    cosAngle, sinAngle = np.cos(angle), np.sin(angle)
+    rotated = np.empty_like(normals)
+    rotated[:, 0] = cosAngle * normals[:, 0] - sinAngle * normals[:, 2]
+    rotated[:, 1] = normals[:, 1]
+    rotated[:, 2] = sinAngle * normals[:, 0] + cosAngle * normals[:, 2]
+
+    bandFactors = np.repeat(_BAND_FACTORS, (1, 3, 5))
+    irradiance = shBasis(rotated) @ (coefficients * bandFactors[:, None])
+    radiance = np.clip(irradiance * (albedo / np.pi * intensity * 2.0 ** exposure), 0.0, 1.0)
+
+    # sRGB display transform
+    display = np.where(radiance <= 0.0031308, radiance * 12.92, 1.055 * radiance ** (1.0 / 2.4) - 0.055)
+
+    image = np.zeros((size, size, 4), dtype=np.uint8)
+    image[mask, :3] = np.round(display * 255.0).astype(np.uint8)
+    image[mask, 3] = 255
+    return image
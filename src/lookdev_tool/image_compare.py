@@ -0,0 +1,315 @@
+"""A/B comparison of rendered frames and turntable sequences, runs without Maya except to read EXRs.
+
+Each pair of frames gets a difference map, its PSNR and SSIM, and the color difference (CIE76 delta E) of every
+ColorChecker patch. Sequences are read one pair of frames at a time, only the metrics of each frame are kept, so a
+long turntable is compared in the memory of a single frame.
+
+Usage:
+    mayapy -m lookdev_tool.image_compare sequenceA sequenceB [--checker x y width height] [--maps folder] [--json]
+
+.npy frames are read with NumPy, everything else with Maya's MImage.
+"""
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import collections
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from lookdev_tool.Utils.image_utils import writePng
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+IMAGE_COMPARE_LOGGER = logging.getLogger(__name__)
+IMAGE_COMPARE_LOGGER.setLevel(10)
+
+# SSIM window in pixels and stabilizing constants for values in [0, 1]
+SSIM_WINDOW = 8
+SSIM_C1 = 0.01 ** 2
+SSIM_C2 = 0.03 ** 2
+
+# the 24 patches of the ColorChecker Classic, rows from the top
+COLOR_CHECKER_NAMES = (
+    'darkSkin', 'lightSkin', 'blueSky', 'foliage', 'blueFlower', 'bluishGreen',
+    'orange', 'purplishBlue', 'moderateRed', 'purple', 'yellowGreen', 'orangeYellow',
+    'blue', 'green', 'red', 'yellow', 'magenta', 'cyan',
+    'white', 'neutral8', 'neutral65', 'neutral5', 'neutral35', 'black',
+)
+
+# linear sRGB to XYZ, D65 white
+_RGB_TO_XYZ = ((0.4124564, 0.3575761, 0.1804375),
+               (0.2126729, 0.7151522, 0.0721750),
+               (0.0193339, 0.1191920, 0.9503041))
+_WHITE = (0.95047, 1.0, 1.08883)
+
+Patch = collections.namedtuple('Patch', ['name', 'x', 'y', 'width', 'height'])
+FrameMetrics = collections.namedtuple('FrameMetrics', ['name', 'meanDifference', 'maxDifference', 'psnr', 'ssim',
+                                                       'patchDeltas'])
+
+
+def _requireNumpy() -> None:
+    if np is None:
+        raise RuntimeError('NumPy is required to compare images')
+
+
+def colorCheckerPatches(x: float, y: float, width: float, height: float, inset: float = 0.2) -> List[Patch]:
+    """Returns the 24 patches of a ColorChecker filling a rectangle of the frame
+
+    Parameters:
+        x, y, width, height: The chart's rectangle, as fractions of the frame, y going down.
+        inset: Proportion of each cell left out around its patch, the cell borders are never sampled.
+    """
+    cellWidth, cellHeight = width / 6.0, height / 4.0
+    return [Patch(name,
+                  x + (index % 6 + inset * 0.5) * cellWidth, y + (index // 6 + inset * 0.5) * cellHeight,
+                  cellWidth * (1.0 - inset), cellHeight * (1.0 - inset))
+            for index, name in enumerate(COLOR_CHECKER_NAMES)]
+
+
+def luminance(image):
+    """Returns the Rec.709 luminance of a (height, width, channels) linear image"""
+    return image[..., :3] @ np.array(_RGB_TO_XYZ[1], dtype=image.dtype)
+
+
+def differenceMap(imageA, imageB):
+    """Returns the per-pixel difference, the largest absolute difference of the RGB channels"""
+    return np.abs(imageA[..., :3] - imageB[..., :3]).max(axis=-1)
+
+
+def heatMap(difference, scale: float = 10.0):
+    """Returns an RGB uint8 picture of a difference map: black, red, yellow then white as the difference grows
+
+    Parameters:
+        difference: The (height, width) difference map.
+        scale: Gain applied before the ramp, a difference of 1 / scale is shown white.
+    """
+    value = np.clip(difference * scale, 0.0, 1.0) * 3.0
+    heat = np.stack((np.clip(value, 0.0, 1.0), np.clip(value - 1.0, 0.0, 1.0), np.clip(value - 2.0, 0.0, 1.0)),
+                    axis=-1)
+    return (heat * 255.0 + 0.5).astype(np.uint8)
+
+
+def psnr(imageA, imageB, peak: float = 1.0) -> float:
+    """Returns the peak signal to noise ratio in dB, values above peak are clipped, inf for identical images"""
+    a = np.clip(imageA[..., :3], 0.0, peak)
+    b = np.clip(imageB[..., :3], 0.0, peak)
+    meanSquaredError = float(np.mean((a - b) ** 2))
+    if meanSquaredError == 0.0:
+        return float('inf')
+    return 10.0 * np.log10(peak * peak / meanSquaredError)
+
+
+def _boxMeans(image, window: int):
+    """Returns the mean of every window x window block of a 2D image, from its summed area table"""
+    table = np.zeros((image.shape[0] + 1, image.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(image, axis=0), axis=1, out=table[1:, 1:])
+    sums = table[window:, window:] - table[:-window, window:] - table[window:, :-window] + table[:-window, :-window]
+    return sums / (window * window)
+
+
+def ssim(imageA, imageB, window: int = SSIM_WINDOW) -> float:
+    """Returns the mean structural similarity of the images' luminance, on square windows clipped to [0, 1]"""
+    a = np.clip(luminance(imageA), 0.0, 1.0).astype(np.float64)
+    b = np.clip(luminance(imageB), 0.0, 1.0).astype(np.float64)
+    window = min(window, a.shape[0], a.shape[1])
+
+    meanA, meanB = _boxMeans(a, window), _boxMeans(b, window)
+    varianceA = _boxMeans(a * a, window) - meanA * meanA
+    varianceB = _boxMeans(b * b, window) - meanB * meanB
+    covariance = _boxMeans(a * b, window) - meanA * meanB
+
+    ssimMap = ((2.0 * meanA * meanB + SSIM_C1) * (2.0 * covariance + SSIM_C2)) / \
+              ((meanA * meanA + meanB * meanB + SSIM_C1) * (varianceA + varianceB + SSIM_C2))
+    return float(ssimMap.mean())
+
+
+def toLab(rgb):
+    """Converts (..., 3) linear sRGB to CIE L*a*b*"""
+    xyz = rgb @ np.array(_RGB_TO_XYZ).T / np.array(_WHITE)
+    f = np.where(xyz > (6.0 / 29.0) ** 3, np.cbrt(xyz), xyz / (3.0 * (6.0 / 29.0) ** 2) + 4.0 / 29.0)
+    return np.stack((116.0 * f[..., 1] - 16.0, 500.0 * (f[..., 0] - f[..., 1]), 200.0 * (f[..., 1] - f[..., 2])),
+                    axis=-1)
+
+
+def patchColors(image, patches: Sequence[Patch]):
+    """Returns the mean linear RGB of each patch, (patches, 3)"""
+    height, width = image.shape[:2]
+    colors = np.empty((len(patches), 3))
+    for index, patch in enumerate(patches):
+        top, left = int(patch.y * height), int(patch.x * width)
+        bottom = max(int((patch.y + patch.height) * height), top + 1)
+        right = max(int((patch.x + patch.width) * width), left + 1)
+        colors[index] = image[top:bottom, left:right, :3].reshape(-1, 3).mean(axis=0)
+    return colors
+
+
+def patchDeltas(imageA, imageB, patches: Sequence[Patch]) -> Dict[str, float]:
+    """Returns the CIE76 delta E of each patch between the images"""
+    if not patches:
+        return {}
+
+    deltas = np.linalg.norm(toLab(patchColors(imageA, patches)) - toLab(patchColors(imageB, patches)), axis=-1)
+    return {patch.name: float(delta) for patch, delta in zip(patches, deltas)}
+
+
+def compareFrames(imageA, imageB, patches: Sequence[Patch] = (), name: str = '') -> Tuple[FrameMetrics, object]:
+    """Compares two frames of the same resolution
+
+    Returns:
+        The frame's metrics and its difference map.
+    """
+    _requireNumpy()
+
+    if imageA.shape[:2] != imageB.shape[:2]:
+        raise ValueError('{}: resolutions differ, {} and {}'.format(name, imageA.shape[:2], imageB.shape[:2]))
+
+    difference = differenceMap(imageA, imageB)
+    metrics = FrameMetrics(name, float(difference.mean()), float(difference.max()), psnr(imageA, imageB),
+                           ssim(imageA, imageB), patchDeltas(imageA, imageB, patches))
+    return metrics, difference
+
+
+class SequenceReport(object):
+    """Running summary of a sequence comparison, only the per-frame metrics are kept"""
+    def __init__(self) -> None:
+        self.frames: List[FrameMetrics] = []
+
+    def add(self, metrics: FrameMetrics) -> None:
+        self.frames.append(metrics)
+
+    def summary(self) -> dict:
+        if not self.frames:
+            return {'frames': 0}
+
+        finitePsnr = [frame.psnr for frame in self.frames if frame.psnr != float('inf')]
+        worst = min(self.frames, key=lambda frame: frame.ssim)
+        patchNames = self.frames[0].patchDeltas.keys()
+
+        return {
+            'frames': len(self.frames),
+            'meanDifference': sum(frame.meanDifference for frame in self.frames) / len(self.frames),
+            'maxDifference': max(frame.maxDifference for frame in self.frames),
+            'minPsnr': min(finitePsnr) if finitePsnr else float('inf'),
+            'meanPsnr': sum(finitePsnr) / len(finitePsnr) if finitePsnr else float('inf'),
+            'minSsim': worst.ssim,
+            'meanSsim': sum(frame.ssim for frame in self.frames) / len(self.frames),
+            'worstFrame': worst.name,
+            'maxPatchDeltas': {name: max(frame.patchDeltas[name] for frame in self.frames) for name in patchNames},
+        }
+
+    def format(self) -> str:
+        summary = self.summary()
+        if not summary['frames']:
+            return 'no frame compared'
+
+        lines = ['{frames} frames, mean difference {meanDifference:.5f}, max {maxDifference:.5f}'.format(**summary),
+                 'PSNR min {minPsnr:.2f} dB, mean {meanPsnr:.2f} dB'.format(**summary),
+                 'SSIM min {minSsim:.4f} ({worstFrame}), mean {meanSsim:.4f}'.format(**summary)]
+        if summary['maxPatchDeltas']:
+            worstPatch = max(summary['maxPatchDeltas'].items(), key=lambda item: item[1])
+            lines.append('ColorChecker max delta E {:.2f} ({})'.format(worstPatch[1], worstPatch[0]))
+
+        return '\n'.join(lines)
+
+
+def readFrame(path: str):
+    """Reads a frame, .npy with NumPy and any other format with Maya's MImage"""
+    if path.endswith('.npy'):
+        return np.load(path)
+
+    from lookdev_tool import frame_buffer
+    return frame_buffer.readImageFile(path)
+
+
+def listSequence(folder: str) -> Dict[str, str]:
+    """Returns the frames of a folder by file name"""
+    return {name: os.path.join(folder, name) for name in sorted(os.listdir(folder))
+            if os.path.isfile(os.path.join(folder, name)) and not name.startswith('.')}
+
+
+def compareSequences(framesA: Iterable[Tuple[str, str]], framesB: Dict[str, str], patches: Sequence[Patch] = (),
+                     reader: Callable = readFrame, mapsFolder: Optional[str] = None,
+                     heatScale: float = 10.0) -> SequenceReport:
+    """Compares two sequences frame by frame, only one pair of frames is in memory at a time
+
+    Parameters:
+        framesA: (name, path) of each frame of the first sequence.
+        framesB: {name: path} of the second sequence, frames missing from it are reported and skipped.
+        patches: ColorChecker patches measured in each frame.
+        reader: Returns a frame's linear float pixels from its path.
+        mapsFolder: If set, the heat map of each frame's difference is written there as <name>.png.
+        heatScale: The heat maps' gain.
+    """
+    startTime = time.perf_counter()
+    report = SequenceReport()
+
+    if mapsFolder:
+        os.makedirs(mapsFolder, exist_ok=True)
+
+    for name, pathA in framesA:
+        pathB = framesB.get(name)
+        if pathB is None:
+            IMAGE_COMPARE_LOGGER.warning('{} missing from the second sequence'.format(name))
+            continue
+
+        metrics, difference = compareFrames(reader(pathA), reader(pathB), patches, name)
+        report.add(metrics)
+
+        if mapsFolder:
+            heat = heatMap(difference, heatScale)
+            writePng(os.path.join(mapsFolder, '{}.png'.format(os.path.splitext(name)[0])),
+                     [row.tobytes() for row in heat], heat.shape[1])
+
+    elapsed = time.perf_counter() - startTime
+    IMAGE_COMPARE_LOGGER.debug('{} frames compared in {:.3f}s'.format(len(report.frames), elapsed),
+                               extra={'operation': 'imageCompare', 'elapsed': elapsed})
+    return report
+
+
+def _finite(value):
+    """Returns value with its infinite and NaN floats replaced by None, in nested dicts and lists"""
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Compares two rendered sequences of the lookdev tool.')
+    parser.add_argument('sequenceA')
+    parser.add_argument('sequenceB')
+    parser.add_argument('--checker', type=float, nargs=4, metavar=('X', 'Y', 'WIDTH', 'HEIGHT'),
+                        help='The ColorChecker\'s rectangle, as fractions of the frame')
+    parser.add_argument('--maps', help='Folder of the difference heat maps')
+    parser.add_argument('--json', dest='asJson', action='store_true')
+    arguments = parser.parse_args(argv)
+
+    if not all(path.endswith('.npy') for path in listSequence(arguments.sequenceA).values()):
+        import maya.standalone
+        maya.standalone.initialize(name='python')
+
+    patches = colorCheckerPatches(*arguments.checker) if arguments.checker else ()
+    report = compareSequences(listSequence(arguments.sequenceA).items(), listSequence(arguments.sequenceB), patches,
+                              mapsFolder=arguments.maps)
+
+    if arguments.asJson:
+        # identical frames have an infinite PSNR, written as null since JSON has no infinity
+        print(json.dumps(_finite({'summary': report.summary(), 'frames': [frame._asdict() for frame in report.frames]}),
+                         indent=4, allow_nan=False))
+    else:
+        print(report.format())
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
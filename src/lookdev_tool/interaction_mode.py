@@ -0,0 +1,135 @@
+import time
+import logging
+from typing import Callable, Dict, List, Tuple
+
+from maya import cmds
+
+INTERACTION_MODE_LOGGER = logging.getLogger(__name__)
+INTERACTION_MODE_LOGGER.setLevel(10)
+
+# modelEditor flags lowered while interacting: {flag: interaction value}
+MODEL_EDITOR_SETTINGS = {
+    'displayTextures': False,
+    'shadows': False,
+    'displayLights': 'default',
+}
+
+# Viewport 2.0 attributes lowered while interacting: {attribute: interaction value}
+HARDWARE_RENDERING_SETTINGS = {
+    'hardwareRenderingGlobals.multiSampleEnable': False,
+    'hardwareRenderingGlobals.ssaoEnable': False,
+    'hardwareRenderingGlobals.motionBlurEnable': False,
+    'hardwareRenderingGlobals.lineAAEnable': False,
+}
+
+
+def measureFrameTime(samples: int = 10) -> float:
+    """Returns the average time of a forced viewport refresh in seconds
+
+    Parameters:
+        samples: The number of refreshes measured.
+    """
+    startTime = time.perf_counter()
+    for _ in range(samples):
+        cmds.refresh(force=True, currentView=True)
+
+    return (time.perf_counter() - startTime) / samples
+
+
+class InteractionMode(object):
+    """Lowers the viewport quality for the duration of a gesture.
+
+    Only the settings actually changed are recorded and they are restored to their exact previous values on end(),
+    nothing is written to the user preferences. Nested begin() calls are counted, the settings are restored by the
+    last end().
+
+    beginCallbacks are called once the settings are lowered by the first begin(), endCallbacks before they are
+    restored by the last end().
+    """
+    def __init__(self, profile: bool = False) -> None:
+        """
+        Parameters:
+            profile: Logs the viewport frame time before and after lowering the settings, the refreshes measured
+                add a short pause at the start of each gesture.
+        """
+        self.profile = profile
+        self._depth = 0
+        self._savedEditors: Dict[Tuple[str, str], object] = {}
+        self._savedAttributes: Dict[str, object] = {}
+        self.beginCallbacks: List[Callable[[], None]] = []
+        self.endCallbacks: List[Callable[[], None]] = []
+
+    @property
+    def active(self) -> bool:
+        return self._depth > 0
+
+    def begin(self) -> None:
+        self._depth += 1
+        if self._depth > 1:
+            return
+
+        if self.profile:
+            frameTime = measureFrameTime()
+
+        for panel in cmds.getPanel(type='modelPanel') or []:
+            for flag, value in MODEL_EDITOR_SETTINGS.items():
+                current = cmds.modelEditor(panel, query=True, **{flag: True})
+                if current != value:
+                    self._savedEditors[(panel, flag)] = current
+                    cmds.modelEditor(panel, edit=True, **{flag: value})
+
+        for attribute, value in HARDWARE_RENDERING_SETTINGS.items():
+            if not cmds.objExists(attribute):
+                continue
+
+            current = cmds.getAttr(attribute)
+            if current != value:
+                self._savedAttributes[attribute] = current
+                cmds.setAttr(attribute, value)
+
+        if self.profile:
+            # recorded as two operations, perf_history reports them side by side
+            interactionFrameTime = measureFrameTime()
+            INTERACTION_MODE_LOGGER.debug('viewport frame time: {:.1f}ms'.format(frameTime * 1000.0),
+                                          extra={'operation': 'viewportFrame', 'elapsed': frameTime})
+            INTERACTION_MODE_LOGGER.debug('interaction frame time: {:.1f}ms'.format(interactionFrameTime * 1000.0),
+                                          extra={'operation': 'interactionFrame', 'elapsed': interactionFrameTime})
+
+        for callback in self.beginCallbacks:
+            callback()
+
+    def end(self) -> None:
+        if not self._depth:
+            return
+
+        self._depth -= 1
+        if self._depth:
+            return
+
+        for callback in self.endCallbacks:
+            callback()
+
+        self.restore()
+
+    def restore(self) -> None:
+        """Restores every changed setting, whatever the number of pending begin()"""
+        self._depth = 0
+
+        for (panel, flag), value in self._savedEditors.items():
+            # the panel may have been deleted during the gesture
+            if cmds.modelPanel(panel, exists=True):
+                cmds.modelEditor(panel, edit=True, **{flag: value})
+
+        for attribute, value in self._savedAttributes.items():
+            if cmds.objExists(attribute):
+                cmds.setAttr(attribute, value)
+
+        self._savedEditors.clear()
+        self._savedAttributes.clear()
+
+    def __enter__(self) -> 'InteractionMode':
+        self.begin()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.end()
@@ -0,0 +1,231 @@
+"""Background jobs of the lookdev tool.
+
+Pure Python and I/O work runs on a worker pool, anything touching the scene is posted back to Maya's main thread
+through the MainThreadBridge, which runs the posted calls in batches on idle.
+"""
+import time
+import logging
+import itertools
+import threading
+import collections
+from concurrent import futures
+from typing import Callable, List, Optional
+
+JOBS_LOGGER = logging.getLogger(__name__)
+JOBS_LOGGER.setLevel(10)
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+_JOB_IDS = itertools.count(1)
+
+
+class JobCancelled(Exception):
+    """Raised by Job.checkCancelled, ends the job quietly"""
+
+
+class Job(object):
+    """State of a background job, shared by the worker running it and the UI showing it.
+
+    The worker reports its progress and checks the cancellation at its own pace, cancelling never interrupts it.
+    """
+    def __init__(self, name: str) -> None:
+        self.id = next(_JOB_IDS)
+        self.name = name
+        self.state = JOB_PENDING
+        self.progress = 0.0
+        self.message = ''
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.elapsed = 0.0
+        self._cancelEvent = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelEvent.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+    def cancel(self) -> None:
+        self._cancelEvent.set()
+
+    def checkCancelled(self) -> None:
+        """Raises JobCancelled if the job has been cancelled, called by the worker between two steps"""
+        if self._cancelEvent.is_set():
+            raise JobCancelled()
+
+    def reportProgress(self, progress: float, message: Optional[str] = None) -> None:
+        """
+        Parameters:
+            progress: The job's progress in [0, 1].
+            message: What the job is doing.
+        """
+        self.progress = min(max(progress, 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+
+class MainThreadBridge(object):
+    """Queues calls from any thread and runs them on Maya's main thread.
+
+    The queue is drained by a single deferred call running up to batchSize calls, wrapped in batchContext so their
+    scene edits are applied as one undo chunk and one IPR update. A new drain is only scheduled when the queue goes
+    from empty to pending.
+    """
+    def __init__(self, scheduler: Optional[Callable[[Callable], None]] = None, batchSize: int = 64,
+                 batchContext: Optional[Callable] = None) -> None:
+        """
+        Parameters:
+            scheduler: Runs a callable on the main thread later, maya.utils.executeDeferred if None.
+            batchSize: The highest number of calls run by one drain.
+            batchContext: Returns the context manager wrapping a batch, lookdev_core.IprBatch if None.
+        """
+        self._scheduler = scheduler
+        self.batchSize = batchSize
+        self._batchContext = batchContext
+        self._calls = collections.deque()
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+    def post(self, func: Callable, *args, **kwargs) -> futures.Future:
+        """Runs func(*args, **kwargs) on the main thread
+
+        Returns:
+            A future holding func's result, never wait for it from the main thread.
+        """
+        future = futures.Future()
+        with self._lock:
+            self._calls.append((future, func, args, kwargs))
+            schedule = not self._scheduled
+            self._scheduled = True
+
+        if schedule:
+            self._schedule()
+
+        return future
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Runs func on the main thread and waits for its result, only from a worker thread"""
+        return self.post(func, *args, **kwargs).result()
+
+    def _schedule(self) -> None:
+        if self._scheduler is None:
+            import maya.utils
+            self._scheduler = maya.utils.executeDeferred
+
+        self._scheduler(self.drain)
+
+    def drain(self) -> int:
+        """Runs one batch of the posted calls, on the main thread
+
+        Returns:
+            The number of calls run.
+        """
+        with self._lock:
+            batch = [self._calls.popleft() for _ in range(min(self.batchSize, len(self._calls)))]
+
+        if batch:
+            if self._batchContext is None:
+                from lookdev_tool import lookdev_core
+                self._batchContext = lookdev_core.IprBatch
+
+            with self._batchContext():
+                for future, func, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+
+                    try:
+                        future.set_result(func(*args, **kwargs))
+                    except BaseException as error:
+                        future.set_exception(error)
+
+        with self._lock:
+            # calls posted during the batch are run by the next drain
+            self._scheduled = bool(self._calls)
+            schedule = self._scheduled
+
+        if schedule:
+            self._schedule()
+
+        return len(batch)
+
+
+class JobManager(object):
+    """Runs jobs on a worker pool, their completion callbacks are run on the main thread"""
+    def __init__(self, workers: int = 4, bridge: Optional[MainThreadBridge] = None) -> None:
+        self.bridge = bridge or MainThreadBridge()
+        self._executor = futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='LookdevJob')
+        self._jobs: List[Job] = []
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, func: Callable, *args, onDone: Optional[Callable[[Job], None]] = None,
+               **kwargs) -> Job:
+        """Runs func(job, *args, **kwargs) on a worker
+
+        Parameters:
+            name: The job's name shown in the UI.
+            func: The work, reports its progress and checks the cancellation through its job argument. It must not
+                touch the scene, scene calls go through self.bridge.
+            onDone: Called with the job on the main thread once it is finished, whatever its state.
+        """
+        job = Job(name)
+        with self._lock:
+            self._jobs.append(job)
+
+        self._executor.submit(self._run, job, func, args, kwargs, onDone)
+        return job
+
+    def _run(self, job: Job, func: Callable, args: tuple, kwargs: dict,
+             onDone: Optional[Callable[[Job], None]]) -> None:
+        startTime = time.perf_counter()
+        job.state = JOB_RUNNING
+        try:
+            job.checkCancelled()
+            job.result = func(job, *args, **kwargs)
+            job.state = JOB_DONE
+            job.progress = 1.0
+        except JobCancelled:
+            job.state = JOB_CANCELLED
+        except Exception as error:
+            job.error = error
+            job.state = JOB_FAILED
+            JOBS_LOGGER.exception('job {} failed'.format(job.name))
+
+        job.elapsed = time.perf_counter() - startTime
+        JOBS_LOGGER.debug('job {} {} in {:.3f}s'.format(job.name, job.state, job.elapsed))
+
+        with self._lock:
+            self._jobs.remove(job)
+
+        if onDone:
+            self.bridge.post(onDone, job)
+
+    def activeJobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs)
+
+    def cancelAll(self) -> None:
+        for job in self.activeJobs():
+            job.cancel()
+
+    def shutdown(self, wait: bool = False) -> None:
+        self.cancelAll()
+        self._executor.shutdown(wait=wait)
+
+
+_JOB_MANAGER = None
+
+
+def getJobManager() -> JobManager:
+    """Returns the tool's job manager"""
+    global _JOB_MANAGER
+
+    if _JOB_MANAGER is None:
+        _JOB_MANAGER = JobManager()
+
+    return _JOB_MANAGER
@@ -1,4 +1,128 @@
+import os
+import logging
+
 from maya import cmds
+import maya.utils
+import maya.api.OpenMaya as om
+
+from lookdev_tool import constants
+from lookdev_tool import asset_cache
+from lookdev_tool import ground_lod
+from lookdev_tool import rig_switcher
+from lookdev_tool.Utils import image_utils
+
+# texture nodes reused across domes and lights, {texture path: file node} and {ramp definition: ramp node}
+_FILE_TEXTURE_POOL = {}
+_RAMP_POOL = {}
+
+# {source path: path actually referenced}, the referenced path is the local cache copy when there is one
+_REFERENCED_PATHS = {}
+
+LOOKDEV_CORE_LOGGER = logging.getLogger(__name__)
+LOOKDEV_CORE_LOGGER.setLevel(10)
+
+# open IprBatch, innermost last
+_IPR_BATCHES = []
+
+# edits applied through IprBatch and IPR updates they saved
+IPR_STATS = {'commits': 0, 'edits': 0, 'updatesAvoided': 0}
+
+
+class IprBatch(object):
+    """
+    Collects scene edits and applies them at once so the renderer's IPR sees a single update.
+    Edits are keyed, the last edit of a key wins (the same attribute set ten times while dragging is set once).
+    A batch opened inside another one is merged into it on commit.
+
+        with lookdev_core.IprBatch(renderEngine.pauseIpr):
+            renderEngine.rotLights(90)
+            renderEngine.changeLightIntensity('keyLight', 40)
+    """
+    def __init__(self, pauseIpr=None):
+        """
+        :param pauseIpr: Renderer function pausing (True) and resuming (False) its IPR
+        """
+        self.pauseIpr = pauseIpr
+        self.recorded = 0
+        self._edits = {}
+
+    def record(self, key, func, *args, **kwargs):
+        self.recorded += 1
+        # re-insert so the edit keeps the order of its last call
+        self._edits.pop(key, None)
+        self._edits[key] = (func, args, kwargs)
+
+    def commit(self):
+        if _IPR_BATCHES:
+            # nested batch, the outer one applies everything
+            outerBatch = _IPR_BATCHES[-1]
+            outerBatch.recorded += self.recorded - len(self._edits)
+            for key, (func, args, kwargs) in self._edits.items():
+                outerBatch.record(key, func, *args, **kwargs)
+            self._edits.clear()
+            return
+
+        if not self._edits:
+            return
+
+        if self.pauseIpr:
+            self.pauseIpr(True)
+
+        cmds.undoInfo(openChunk=True)
+        try:
+            for func, args, kwargs in self._edits.values():
+                func(*args, **kwargs)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+            if self.pauseIpr:
+                self.pauseIpr(False)
+
+        IPR_STATS['commits'] += 1
+        IPR_STATS['edits'] += self.recorded
+        IPR_STATS['updatesAvoided'] += self.recorded - 1
+        LOOKDEV_CORE_LOGGER.debug('IPR batch: {} edits applied in one update, {} updates avoided so far'.format(
+            self.recorded, IPR_STATS['updatesAvoided']))
+
+        self._edits.clear()
+        self.recorded = 0
+
+    def discard(self):
+        self._edits.clear()
+        self.recorded = 0
+
+    def __enter__(self):
+        _IPR_BATCHES.append(self)
+        return self
+
+    def __exit__(self, exceptionType, *args):
+        _IPR_BATCHES.remove(self)
+
+        if exceptionType is None:
+            self.commit()
+        else:
+            self.discard()
+
+
+def batchCall(key, func, *args, **kwargs):
+    """
+    Calls func now, or when the open IprBatch is committed
+    :param key: Edit's key, a later edit with the same key replaces this one in the batch
+    :param func: Function editing the scene
+    """
+    if _IPR_BATCHES:
+        _IPR_BATCHES[-1].record(key, func, *args, **kwargs)
+        return
+
+    func(*args, **kwargs)
+
+
+def setAttr(plug, *values, **kwargs):
+    """
+    cmds.setAttr going through the open IprBatch if any
+    :param plug: Attribute's name, node.attribute
+    """
+    batchCall(plug, cmds.setAttr, plug, *values, **kwargs)
 
 
 def createFileText(fileName):
@@ -8,9 +132,354 @@ def createFileText(fileName):
     """
     # create file node
     fileNode = cmds.createNode('file', name=fileName, skipSelect=True)
+    registerNodes(fileNode)
+    return fileNode
+
+
+def _pooledNode(pool, key, nodeType):
+    """
+    Returns the pooled node for key if it is still in scene, drops it from the pool otherwise
+    """
+    node = pool.get(key)
+    if node and cmds.objExists(node) and cmds.nodeType(node) == nodeType:
+        return node
+
+    pool.pop(key, None)
+    return None
+
+
+def acquireFileTexture(fileName, texturePath, fileNode=None):
+    """
+    Returns a file node reading texturePath, no new node is created nor texture reloaded if one already exists
+    :param fileName: Name of the file node if one has to be created
+    :param texturePath: Texture's path
+    :param fileNode: File node which can be re-pointed to texturePath instead of creating a new one
+    :return: File node's name
+    """
+    pooledNode = _pooledNode(_FILE_TEXTURE_POOL, texturePath, 'file')
+    if pooledNode:
+        return pooledNode
+
+    # read the texture from the local cache, the node is re-pointed once the background copy is done
+    readPath = asset_cache.getAssetCache().localPath(
+        texturePath, onReady=lambda localPath: maya.utils.executeDeferred(_repointFileTexture, texturePath, localPath)
+    )
+
+    if fileNode and cmds.objExists(fileNode):
+        # re-point the node, only fileTextureName changes
+        for path, node in list(_FILE_TEXTURE_POOL.items()):
+            if node == fileNode:
+                del _FILE_TEXTURE_POOL[path]
+    else:
+        fileNode = createFileText(fileName)
+
+    _setFileTexturePath(fileNode, texturePath, readPath)
+    _FILE_TEXTURE_POOL[texturePath] = fileNode
     return fileNode
 
 
+def _repointFileTexture(texturePath, localPath):
+    fileNode = _pooledNode(_FILE_TEXTURE_POOL, texturePath, 'file')
+    if fileNode:
+        _setFileTexturePath(fileNode, texturePath, localPath)
+
+
+def _setFileTexturePath(fileNode, texturePath, readPath):
+    """
+    Points a file node at readPath, the copy it reads is kept from eviction and its source is kept on the node
+    """
+    cache = asset_cache.getAssetCache()
+    currentPath = cmds.getAttr('{}.fileTextureName'.format(fileNode))
+    if currentPath != readPath:
+        cache.unpin(currentPath)
+        cmds.setAttr('{}.fileTextureName'.format(fileNode), readPath, type='string')
+
+    cache.pin(readPath)
+    _setSourcePath(fileNode, texturePath)
+
+
+def _setSourcePath(node, path):
+    """
+    Keeps the network path a node reads a local copy of, the saved scene never depends on the user's cache alone
+    """
+    if not cmds.attributeQuery(constants.ASSET_SOURCE_PATH_ATTR, node=node, exists=True):
+        cmds.addAttr(node, longName=constants.ASSET_SOURCE_PATH_ATTR, dataType='string')
+
+    cmds.setAttr('{}.{}'.format(node, constants.ASSET_SOURCE_PATH_ATTR), path, type='string')
+
+
+def restoreSourcePaths(*_):
+    """
+    Records the file nodes and references of an opened scene, those whose local copy is missing (scene saved on
+    another machine or copy evicted since) read their source again through the cache
+    """
+    cache = asset_cache.getAssetCache()
+
+    for plug in cmds.ls('*.{}'.format(constants.ASSET_SOURCE_PATH_ATTR), recursive=True) or []:
+        node = plug.split('.')[0]
+        sourcePath = cmds.getAttr(plug)
+        if not sourcePath:
+            continue
+
+        if cmds.nodeType(node) == 'file':
+            readPath = cmds.getAttr('{}.fileTextureName'.format(node))
+            if not os.path.isfile(readPath):
+                readPath = cache.localPath(sourcePath, onReady=lambda localPath, sourcePath=sourcePath:
+                                           maya.utils.executeDeferred(_repointFileTexture, sourcePath, localPath))
+            _FILE_TEXTURE_POOL[sourcePath] = node
+            _setFileTexturePath(node, sourcePath, readPath)
+
+        elif cmds.nodeType(node) == 'reference':
+            readPath = cmds.referenceQuery(node, filename=True, withoutCopyNumber=True)
+            if not os.path.isfile(readPath):
+                readPath = cache.localPath(sourcePath)
+                cmds.file(readPath, loadReference=node)
+            _REFERENCED_PATHS[sourcePath] = readPath
+            cache.pin(readPath)
+
+
+def installSceneCallbacks():
+    """
+    Restores the source paths each time a scene is opened
+    :return: Callback ids, to remove with removeSceneCallbacks
+    """
+    return [om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, restoreSourcePaths)]
+
+
+def removeSceneCallbacks(callbackIds):
+    om.MMessage.removeCallbacks(callbackIds)
+
+
+def fileTextureSource(fileNode):
+    """
+    Returns the source texture path of a file node, which can read a local cache copy
+    :param fileNode: File node's name
+    :return: Texture's path
+    """
+    for texturePath, node in _FILE_TEXTURE_POOL.items():
+        if node == fileNode:
+            return texturePath
+
+    return cmds.getAttr('{}.fileTextureName'.format(fileNode))
+
+
+def acquireRamp(name, definition):
+    """
+    Returns a ramp node matching definition, lights using the same definition share the same ramp
+    :param name: Base name of the nodes if they have to be created
+    :param definition: ((color, position), ...), ramp type, interpolation
+    :return: Ramp node's name
+    """
+    pooledNode = _pooledNode(_RAMP_POOL, definition, 'ramp')
+    if pooledNode:
+        return pooledNode
+
+    entries, rampType, interpolation = definition
+
+    rampText = cmds.createNode('place2dTexture', name='{}Text'.format(name), skipSelect=True)
+    ramp = cmds.createNode('ramp', name='{}Ramp'.format(name), skipSelect=True)
+    registerNodes(rampText, ramp)
+
+    cmds.connectAttr('{}.outUV'.format(rampText), '{}.uv'.format(ramp))
+    cmds.connectAttr('{}.outUvFilterSize'.format(rampText), '{}.uvFilterSize'.format(ramp))
+
+    for index, (color, position) in enumerate(entries):
+        cmds.setAttr('{}.colorEntryList[{}].color'.format(ramp, index), *color, type='double3')
+        cmds.setAttr('{}.colorEntryList[{}].position'.format(ramp, index), position)
+
+    cmds.setAttr('{}.type'.format(ramp), rampType)
+    cmds.setAttr('{}.interpolation'.format(ramp), interpolation)
+
+    _RAMP_POOL[definition] = ramp
+    return ramp
+
+
+def adoptRamp(definition, ramp):
+    """
+    Puts an existing ramp node in the pool, used for the ramp brought by a rig template
+    :param definition: Definition the ramp has been built from, see acquireRamp
+    :param ramp: Ramp node's name
+    """
+    _RAMP_POOL[definition] = ramp
+
+
+def _ownershipSet():
+    """
+    Returns the tool's ownership set, creates it if needed
+    :return: The set's name
+    """
+    if not cmds.objExists(constants.OWNERSHIP_SET_NAME):
+        cmds.sets(empty=True, name=constants.OWNERSHIP_SET_NAME)
+        cmds.addAttr(constants.OWNERSHIP_SET_NAME, longName=constants.OWNERSHIP_REFERENCES_ATTR, dataType='stringArray')
+
+    return constants.OWNERSHIP_SET_NAME
+
+
+def _ownedReferences():
+    if not cmds.objExists(constants.OWNERSHIP_SET_NAME):
+        return []
+
+    return cmds.getAttr('{}.{}'.format(constants.OWNERSHIP_SET_NAME, constants.OWNERSHIP_REFERENCES_ATTR)) or []
+
+
+def _setOwnedReferences(referenceNodes):
+    cmds.setAttr('{}.{}'.format(_ownershipSet(), constants.OWNERSHIP_REFERENCES_ATTR),
+                 len(referenceNodes), *referenceNodes, type='stringArray')
+
+
+def registerNodes(*nodes):
+    """
+    Records nodes created by the tool. The set follows renames, deleted nodes leave it by themselves.
+    Only top nodes need to be registered, their children are deleted with them.
+    :param nodes: Nodes' names
+    """
+    cmds.sets(list(nodes), addElement=_ownershipSet())
+
+
+def referenceFile(path, referencedPath=None, namespace=None):
+    """
+    References a file and records its reference node
+    :param path: File's path
+    :param referencedPath: File actually referenced in place of path (ground proxy), the local cache copy if None
+    :param namespace: Namespace of the referenced nodes, Maya's file name prefix if None
+    :return: Reference node's name
+    """
+    referencedPath = _resolveReferencedPath(path, referencedPath)
+    if namespace:
+        cmds.file(referencedPath, reference=True, namespace=namespace)
+    else:
+        cmds.file(referencedPath, reference=True)
+    referenceNode = cmds.referenceQuery(referencedPath, referenceNode=True)
+    _REFERENCED_PATHS[path] = referencedPath
+    asset_cache.getAssetCache().pin(referencedPath)
+    _setSourcePath(referenceNode, path)
+
+    references = _ownedReferences()
+    if referenceNode not in references:
+        _setOwnedReferences(references + [referenceNode])
+
+    return referenceNode
+
+
+def removeReference(path):
+    """
+    Removes a reference created with referenceFile
+    :param path: File's path
+    """
+    referenceNode = _referenceNode(path)
+    cmds.file(referenceNode=referenceNode, removeReference=True)
+    asset_cache.getAssetCache().unpin(_REFERENCED_PATHS.pop(path, path))
+
+    _setOwnedReferences([reference for reference in _ownedReferences() if reference != referenceNode])
+
+
+def _resolveReferencedPath(path, referencedPath):
+    """
+    Returns the file to load for path, path itself is read from the local cache copy when there is one
+    """
+    if referencedPath in (None, path):
+        return asset_cache.getAssetCache().localPath(path)
+
+    return referencedPath
+
+
+def referencedPath(path):
+    """
+    Returns the file referenced for path, None if path is not referenced
+    :param path: File's path
+    """
+    try:
+        return cmds.referenceQuery(_referenceNode(path), filename=True, withoutCopyNumber=True)
+    except RuntimeError:
+        return None
+
+
+def replaceReference(path, newReferencedPath):
+    """
+    Loads another file in path's reference, the reference node and the ownership record are kept
+    :param path: File's path
+    :param newReferencedPath: File to load in the reference
+    """
+    newReferencedPath = _resolveReferencedPath(path, newReferencedPath)
+    if referencedPath(path) == newReferencedPath:
+        return
+
+    cmds.file(newReferencedPath, loadReference=_referenceNode(path))
+    asset_cache.getAssetCache().unpin(_REFERENCED_PATHS.get(path, path))
+    asset_cache.getAssetCache().pin(newReferencedPath)
+    _REFERENCED_PATHS[path] = newReferencedPath
+
+
+def groundLodPath(path, lod, onProxyReady=None):
+    """
+    Returns the file to reference for a ground at a level of detail.
+    The full ground is returned while its proxy is being generated, onProxyReady(path) is then called on the main
+    thread once the proxy exists.
+    :param path: Full ground's path
+    :param lod: ground_lod.LOD_FULL or ground_lod.LOD_PROXY
+    :param onProxyReady: Called with path once the proxy is generated
+    :return: File's path
+    """
+    if lod == ground_lod.LOD_FULL:
+        return path
+
+    proxyPath = ground_lod.readyProxyPath(constants.GROUND_LOD_PATH, path, constants.GROUND_PROXY_RATIO)
+    if proxyPath:
+        return proxyPath
+
+    ground_lod.generateProxy(
+        constants.GROUND_LOD_PATH, path, constants.GROUND_PROXY_RATIO,
+        onReady=lambda _: onProxyReady and maya.utils.executeDeferred(onProxyReady, path)
+    )
+    return path
+
+
+def _referenceNode(path):
+    """
+    Returns the reference node of path, whether the source or its local cache copy has been referenced
+    """
+    for candidate in (_REFERENCED_PATHS.get(path), path, asset_cache.getAssetCache().cachedPath(path)):
+        if not candidate:
+            continue
+
+        try:
+            return cmds.referenceQuery(candidate, referenceNode=True)
+        except RuntimeError:
+            pass
+
+    raise RuntimeError('{} is not referenced'.format(path))
+
+
+def clearOwnedNodes():
+    """
+    Deletes every node and reference recorded by the tool.
+    No name lookup nor connection walk is done, the references are removed first then all nodes are deleted
+    in a single call.
+    """
+    if not cmds.objExists(constants.OWNERSHIP_SET_NAME):
+        return
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        for referenceNode in _ownedReferences():
+            # reference may already have been removed by hand
+            if cmds.objExists(referenceNode):
+                cmds.file(referenceNode=referenceNode, removeReference=True)
+
+        nodes = cmds.sets(constants.OWNERSHIP_SET_NAME, query=True) or []
+        readPaths = [cmds.getAttr('{}.fileTextureName'.format(fileNode)) for fileNode in cmds.ls(nodes, type='file')]
+        cmds.delete(nodes + [constants.OWNERSHIP_SET_NAME])
+
+        # the copies are no longer read, they can be evicted
+        asset_cache.getAssetCache().unpin(*readPaths + list(_REFERENCED_PATHS.values()))
+        _REFERENCED_PATHS.clear()
+
+        # the other renderer's rig has been deleted with the owned nodes, only its namespace is left
+        rig_switcher.removeStashedRigs()
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+
 def changeColorSpace(colorSpace):
     """
     Change Maya's color space
@@ -34,14 +503,14 @@ def createTurn(numberOfFrames):
 
     else:
         # clear previous keys
-        cmds.cutKey('Cam_Main_Grp', clear=True)
-        cmds.cutKey('Lights_Grp', clear=True)
+        batchCall(('cutKey', 'Cam_Main_Grp'), cmds.cutKey, 'Cam_Main_Grp', clear=True)
+        batchCall(('cutKey', 'Lights_Grp'), cmds.cutKey, 'Lights_Grp', clear=True)
 
         # set keys
-        cmds.setKeyframe('Cam_Main_Grp', attribute='rotateY', time=1, value=0, inTangentType='linear')
-        cmds.setKeyframe('Cam_Main_Grp', attribute='rotateY', time=numberOfFrames / 2.0, value=360, inTangentType='linear', outTangentType='linear')
-        cmds.setKeyframe('Lights_Grp', attribute='rotateY', time=numberOfFrames / 2.0, value=0, inTangentType='linear', outTangentType='linear')
-        cmds.setKeyframe('Lights_Grp', attribute='rotateY', time=float(numberOfFrames), value=360, inTangentType='linear', outTangentType='linear')
+        batchCall(('key', 'Cam_Main_Grp', 1), cmds.setKeyframe, 'Cam_Main_Grp', attribute='rotateY', time=1, value=0, inTangentType='linear')
+        batchCall(('key', 'Cam_Main_Grp', 2), cmds.setKeyframe, 'Cam_Main_Grp', attribute='rotateY', time=numberOfFrames / 2.0, value=360, inTangentType='linear', outTangentType='linear')
+        batchCall(('key', 'Lights_Grp', 1), cmds.setKeyframe, 'Lights_Grp', attribute='rotateY', time=numberOfFrames / 2.0, value=0, inTangentType='linear', outTangentType='linear')
+        batchCall(('key', 'Lights_Grp', 2), cmds.setKeyframe, 'Lights_Grp', attribute='rotateY', time=float(numberOfFrames), value=360, inTangentType='linear', outTangentType='linear')
 
 
 def toggleColorPalette(colorPaletteName):
@@ -54,5 +523,30 @@ def toggleColorPalette(colorPaletteName):
     cmds.setAttr('{}.visibility'.format(colorPaletteName), not cmds.getAttr('{}.visibility'.format(colorPaletteName)))
 
 
+def assetName():
+    """
+    Returns the name of the asset being looked at, the scene's name
+    :return: Scene's base name, 'untitled' for a new scene
+    """
+    sceneName = cmds.file(query=True, sceneName=True, shortName=True)
+    return sceneName.rsplit('.', 1)[0] if sceneName else 'untitled'
+
+
+def isHdri(fileName):
+    """
+    Returns True if fileName has an HDR extension
+    :param fileName: File's name
+    """
+    return image_utils.isHdri(fileName)
+
+
+def hdriPath(hdriName):
+    """
+    Returns the path of an HDRI in the HDRI folder, names without extension are .exr files
+    :param hdriName: HDRI's file name, as listed in the HDRI menu
+    """
+    return os.path.join(constants.LIGHT_DOME_PATH, hdriName if isHdri(hdriName) else '{}.exr'.format(hdriName))
+
+
 def queryExists(item):
     return cmds.objExists(item)
@@ -6,8 +6,28 @@ from PySide2 import QtCore, QtWidgets, QtGui
 from lookdev_tool import vray_core
 from lookdev_tool import arnold_core
 from lookdev_tool import lookdev_core
+from lookdev_tool import asset_cache
+from lookdev_tool import folder_watcher
+from lookdev_tool import preflight
+from lookdev_tool import ground_lod
+from lookdev_tool import interaction_mode
+from lookdev_tool import multi_view
+from lookdev_tool import sampling_calibrator
+from lookdev_tool import review_grid
+from lookdev_tool import material_variants
+from lookdev_tool import auto_framing
+from lookdev_tool import rig_switcher
+from lookdev_tool import jobs
+from lookdev_tool import playback_cache
+from lookdev_tool import rig_template
+from lookdev_tool import perf_history
+from lookdev_tool import hdri_preview
+from lookdev_tool import ground_thumbnails
+from lookdev_tool import frame_buffer
+from lookdev_tool import render_viewer
 from lookdev_tool.Utils.openMaya_utils import getMayaMainWindow
 from lookdev_tool.Utils import widgets
+from lookdev_tool.Utils import bindings
 from lookdev_tool import constants
 
 
@@ -17,12 +37,32 @@ class MainUi(QtWidgets.QDialog):
         super(MainUi, self).__init__(parent=getMayaMainWindow(QtWidgets.QDialog))
 
         self.colorList = [] 
+        self.hdriWatcher = None
+        self.hdriListJob = None
+        self.hdriCoefficients = None
+        # values last pushed to each renderer's rig, restored when the rig is brought back
+        self.rigSceneValues = {}
+        self.interactionMode = interaction_mode.InteractionMode()
+        self.turntableCache = playback_cache.TurntableCache()
+        self.groundLodTimer = QtCore.QTimer(self)
+        self.groundLodTimer.setSingleShot(True)
+        self.groundLodTimer.setInterval(constants.GROUND_LOD_RESTORE_DELAY)
+        self.hdriWatcherTimer = QtCore.QTimer(self)
+        self.hdriWatcherTimer.setInterval(500)
+        self.jobManager = jobs.getJobManager()
+        self.jobsTimer = QtCore.QTimer(self)
+        self.jobsTimer.setInterval(100)
+        perf_history.install(self.performanceContext)
+        self.sceneCallbacks = lookdev_core.installSceneCallbacks()
         self._buildUi()
         self.setRenderEngine()
         self.createComboBox()
+        self._bindUi()
         self._connectUi()
         self._setupUi()
         self.queryHdr()
+        self.queryGroundThumbnails()
+        self.prefetchAssets()
 
         self.setWindowTitle(constants.TOOL_NAME)
 
@@ -39,16 +79,29 @@ class MainUi(QtWidgets.QDialog):
         self.setFloorButton = QtWidgets.QPushButton('Create floor')
         self.colorPaletteButton = QtWidgets.QPushButton('Hide color palette')
         self.createTurnButton = QtWidgets.QPushButton('Create turntable')
+        self.multiViewButton = QtWidgets.QPushButton('Create multi-view')
+        self.renderMultiViewButton = QtWidgets.QPushButton('Render multi-view')
+        self.calibrateSamplingButton = QtWidgets.QPushButton('Calibrate sampling')
         self.storePrefsButton = QtWidgets.QPushButton('Store preferences')
         self.importPrefsButton = QtWidgets.QPushButton('Import preferences')
         self.clearSceneButton = QtWidgets.QPushButton('Clear scene')
+        self.preflightButton = QtWidgets.QPushButton('Check resources')
+        self.cancelJobsButton = QtWidgets.QPushButton('Cancel')
+        self.reviewGridButton = QtWidgets.QPushButton('Review grid')
+        self.materialVariantsButton = QtWidgets.QPushButton('Material variants')
+        self.materialVariantsButton.setToolTip('One instance of the selected asset, or a shader ball, per selected material')
+        self.frameAssetButton = QtWidgets.QPushButton('Frame asset')
+        self.buildRigButton = QtWidgets.QPushButton('Build rig')
+        self.buildRigButton.setToolTip('Camera, lights and dome in one step, from a cached template when there is one')
 
         # ComboBox
         self.renderEngineCombo = QtWidgets.QComboBox()
         self.renderEngineCombo.addItem('Arnold')
         self.renderEngineCombo.addItem('VRay')
 
-        self.setGroundMenu = QtWidgets.QComboBox()
+        self.setGroundMenu = widgets.ThumbnailComboBox()
+        self.setGroundMenu.setIconSize(QtCore.QSize(24, 24))
+        self.setGroundMenu.view().setIconSize(QtCore.QSize(constants.GROUND_THUMBNAIL_SIZE // 2, constants.GROUND_THUMBNAIL_SIZE // 2))
 
         self.setGroundMenu.addItem('Studio')
         self.setGroundMenu.addItem('Bathtub')
@@ -71,6 +124,24 @@ class MainUi(QtWidgets.QDialog):
         self.keyLightCheckBox.setText('Enable')
         self.backLightCheckBox = QtWidgets.QCheckBox()
         self.backLightCheckBox.setText('Enable')
+        self.proxyGroundCheckBox = QtWidgets.QCheckBox()
+        self.proxyGroundCheckBox.setText('Proxy')
+        self.proxyGroundCheckBox.setToolTip('Keep the decimated floor, otherwise it is only shown while a slider is dragged and the full floor is set back for the turntable')
+        self.jobsProgressBar = QtWidgets.QProgressBar()
+        self.principalAxesCheckBox = QtWidgets.QCheckBox()
+        self.principalAxesCheckBox.setText('Principal axes')
+        self.principalAxesCheckBox.setToolTip('Face the asset\'s longest side when framing it')
+        self.renderViewerCheckBox = QtWidgets.QCheckBox()
+        self.renderViewerCheckBox.setText('Render viewer')
+        self.renderViewerCheckBox.setEnabled(frame_buffer.isAvailable())
+        self.profileViewportCheckBox = QtWidgets.QCheckBox()
+        self.profileViewportCheckBox.setText('Profile viewport')
+        self.profileViewportCheckBox.setToolTip('Record the viewport frame time with and without the lowered settings when a slider is pressed')
+        self.renderViewer = render_viewer.RenderViewer(constants.FRAME_BUFFER_PATH, constants.RENDER_HISTORY_SIZE)
+
+        self.hdriPreview = widgets.ImageLabel()
+        self.hdriPreview.setFixedSize(constants.HDRI_PREVIEW_SIZE, constants.HDRI_PREVIEW_SIZE)
+        self.hdriPreview.setToolTip('Diffuse lighting of the HDRI, follows the dome rotation and intensity')
 
         # Labels
         self.rotateCamTitle = QtWidgets.QLabel('Rotate camera')
@@ -163,6 +234,7 @@ class MainUi(QtWidgets.QDialog):
         self.hLayoutSix = QtWidgets.QHBoxLayout()
         self.hLayoutSeven = QtWidgets.QHBoxLayout()
         self.hLayoutHeight = QtWidgets.QHBoxLayout()
+        self.hLayoutNine = QtWidgets.QHBoxLayout()
 
         # Add widgets
         self.mainLayout.addWidget(self.renderEngineCombo, 0, 0)
@@ -207,7 +279,8 @@ class MainUi(QtWidgets.QDialog):
         self.mainLayout.addWidget(self.sep7, 11, 2)
         self.mainLayout.addWidget(self.floorTitle, 12, 0)
         self.mainLayout.addWidget(self.setGroundMenu, 12, 1)
-        self.mainLayout.addWidget(self.setFloorButton, 12, 2)
+        self.hLayoutNine.addWidget(self.setFloorButton)
+        self.hLayoutNine.addWidget(self.proxyGroundCheckBox)
         self.mainLayout.addWidget(self.sep8, 13, 0)
         self.mainLayout.addWidget(self.sep9, 13, 1)
         self.mainLayout.addWidget(self.sep10, 13, 2)
@@ -224,6 +297,8 @@ class MainUi(QtWidgets.QDialog):
         self.hLayoutSeven.addWidget(self.lightDomeRotateLabel)
 
         self.mainLayout.addWidget(self.lightDomeRotateSlider, 16, 1)
+        self.mainLayout.addWidget(self.hdriPreview, 15, 2, 2, 1, QtCore.Qt.AlignCenter)
+        self.hdriPreview.setVisible(hdri_preview.isAvailable())
         self.mainLayout.addWidget(self.sep11, 17, 0)
         self.mainLayout.addWidget(self.sep12, 17, 1)
         self.mainLayout.addWidget(self.sep13, 17, 2)
@@ -233,6 +308,9 @@ class MainUi(QtWidgets.QDialog):
         self.hLayoutHeight.addWidget(self.turnTableTitle)
         self.hLayoutHeight.addWidget(self.turnTableFrameLabel)
 
+        self.mainLayout.addWidget(self.multiViewButton, 19, 0)
+        self.mainLayout.addWidget(self.renderMultiViewButton, 19, 1)
+        self.mainLayout.addWidget(self.calibrateSamplingButton, 19, 2)
         self.mainLayout.addWidget(self.sep11, 20, 0)
         self.mainLayout.addWidget(self.sep12, 20, 1)
         self.mainLayout.addWidget(self.sep13, 20, 2)
@@ -241,7 +319,21 @@ class MainUi(QtWidgets.QDialog):
         self.mainLayout.addWidget(self.sep14, 22, 0)
         self.mainLayout.addWidget(self.sep15, 22, 1)
         self.mainLayout.addWidget(self.sep16, 22, 2)
+        self.mainLayout.addWidget(self.preflightButton, 23, 0)
         self.mainLayout.addWidget(self.clearSceneButton, 23, 1)
+        self.mainLayout.addWidget(self.reviewGridButton, 23, 2)
+        self.mainLayout.addWidget(self.frameAssetButton, 24, 0)
+        self.mainLayout.addWidget(self.principalAxesCheckBox, 24, 1)
+        self.mainLayout.addWidget(self.buildRigButton, 24, 2)
+        self.mainLayout.addWidget(self.jobsProgressBar, 25, 0, 1, 2)
+        self.mainLayout.addWidget(self.cancelJobsButton, 25, 2)
+        self.mainLayout.addWidget(self.renderViewerCheckBox, 26, 0)
+        self.mainLayout.addWidget(self.profileViewportCheckBox, 26, 1)
+        self.mainLayout.addWidget(self.materialVariantsButton, 26, 2)
+        self.mainLayout.addWidget(self.renderViewer, 27, 0, 1, 3)
+        self.jobsProgressBar.hide()
+        self.cancelJobsButton.hide()
+        self.renderViewer.hide()
 
         # set spacing, width, height, etc
         self.mainLayout.setVerticalSpacing(5)
@@ -258,42 +350,80 @@ class MainUi(QtWidgets.QDialog):
         self.mainLayout.addLayout(self.hLayoutSix, 15, 0)
         self.mainLayout.addLayout(self.hLayoutSeven, 16, 0)
         self.mainLayout.addLayout(self.hLayoutHeight, 18, 2)
+        self.mainLayout.addLayout(self.hLayoutNine, 12, 2)
 
         self.clearSceneButton.setStyleSheet('color: white; background: darkRed')
         self.resize(500, 240)
 
+    def _bindUi(self) -> None:
+        """Binds each slider and its line edit to the scene attribute they drive.
+
+        The setters resolve the render engine at call time so the same bindings serve Arnold and VRay.
+        """
+        self.bindings = bindings.BindingGroup()
+        self.bindings.add('rotateCam', bindings.ParameterBinding(
+            self.rotateCamSlider, self.rotateCamLabel, lambda value: self.renderEngine.rotateCam(value)))
+        self.bindings.add('rotateLights', bindings.ParameterBinding(
+            self.rotateLightSlider, self.rotateLightLabel, lambda value: self.renderEngine.rotLights(value)))
+        self.bindings.add('fillLight', bindings.ParameterBinding(
+            self.fillLightSlider, self.fillLightLabel, lambda value: self.renderEngine.changeLightIntensity(self.fillLight, value)))
+        self.bindings.add('keyLight', bindings.ParameterBinding(
+            self.keyLightSlider, self.keyLightLabel, lambda value: self.renderEngine.changeLightIntensity(self.keyLight, value)))
+        self.bindings.add('backLight', bindings.ParameterBinding(
+            self.backLightSlider, self.backLightLabel, lambda value: self.renderEngine.changeLightIntensity(self.backLight, value)))
+        self.bindings.add('domeIntensity', bindings.ParameterBinding(
+            self.lightDomeIntensSlider, self.lightDomeintensLabel, lambda value: self.lightDomeClass.changeDome1Intens(value)))
+        self.bindings.add('domeRotate', bindings.ParameterBinding(
+            self.lightDomeRotateSlider, self.lightDomeRotateLabel, lambda value: self.lightDomeClass.rotateDome(value)))
+
+        # lower the viewport quality and throttle the scene updates while a slider is dragged
+        for binding in self.bindings:
+            binding.throttleInterval = constants.INTERACTION_PUSH_INTERVAL
+            binding.slider.sliderPressed.connect(self.interactionMode.begin)
+            binding.slider.sliderReleased.connect(self.interactionMode.end)
+
+        # the ground is swapped for its proxy during the gestures
+        self.interactionMode.beginCallbacks.append(self.onInteractionBegin)
+        self.interactionMode.endCallbacks.append(self.groundLodTimer.start)
+
     def _connectUi(self) -> None:
-        self.renderEngineCombo.currentIndexChanged.connect(self.setRenderEngine)
+        self.renderEngineCombo.currentIndexChanged.connect(self.onRenderEngineComboCurrentIndexChanged)
         self.colorSpaceMenu.currentIndexChanged.connect(self.onColorSpaceMenuCurrentIndexChanged)
         self.setDirectoryButton.clicked.connect(self.openBrowser)
         self.createCamButton.clicked.connect(self.sendToCreateCam)
         self.createCamButton.clicked.connect(self.resetRotateCamSlider)
-        self.rotateCamSlider.valueChanged.connect(self.updateRotateCamValueFromSlider)
-        self.rotateCamLabel.editingFinished.connect(self.changeRotateCamValueFromQline)
         self.createLightButton.clicked.connect(self.onCreateLightButtonClicked)
         self.createLightButton.clicked.connect(self.enableAllLights)
-        self.rotateLightSlider.valueChanged.connect(self.onRotateLightSliderValueChanged)
-        self.rotateLightLabel.editingFinished.connect(self.changeRotateLightLabelFromQline)
         self.setFloorButton.clicked.connect(self.onSetFloorButtonClicked)
-        self.fillLightSlider.valueChanged.connect(self.onFillLightSliderValueChanged)
-        self.fillLightLabel.editingFinished.connect(self.onFillLightLabelEditingFinished)
-        self.keyLightSlider.valueChanged.connect(self.onKeyLightSliderValueChanged)
-        self.keyLightLabel.editingFinished.connect(self.changeKeyLightFromQline)
-        self.backLightLabel.editingFinished.connect(self.onBackLightLabelEditingFinished)
-        self.backLightSlider.valueChanged.connect(self.changeBackLightFromSlider)
+        self.proxyGroundCheckBox.stateChanged.connect(self.onProxyGroundCheckBoxStateChanged)
+        self.groundLodTimer.timeout.connect(self.onProxyGroundCheckBoxStateChanged)
         self.fillLightCheckBox.stateChanged.connect(self.enableFillLight)
         self.keyLightCheckBox.stateChanged.connect(self.onKeyLightCheckBoxStateChanged)
         self.backLightCheckBox.stateChanged.connect(self.onBackLightCheckBoxStateChanged)
         self.setHdriButton.clicked.connect(self.onSetHdriButtonClicked)
-        self.lightDomeintensLabel.editingFinished.connect(self.onLightDomeintensLabelEditingFinished)
-        self.lightDomeIntensSlider.valueChanged.connect(self.onLightDomeIntensSliderValueChanged)
-        self.lightDomeRotateLabel.editingFinished.connect(self.onLightDomeRotateLabelEditingFinished)
-        self.lightDomeRotateSlider.valueChanged.connect(self.changeLightDomerotateFromSlider)
+        self.setHdriMenu.currentIndexChanged.connect(self.onSetHdriMenuCurrentIndexChanged)
+        # the preview follows the slider while dragged, not the throttled scene updates
+        for name in ('domeIntensity', 'domeRotate'):
+            self.bindings[name].slider.valueChanged.connect(self.updateHdriPreview)
+            self.bindings[name].lineEdit.editingFinished.connect(self.updateHdriPreview)
+        self.hdriWatcherTimer.timeout.connect(self.onHdriWatcherTimerTimeout)
+        self.jobsTimer.timeout.connect(self.onJobsTimerTimeout)
+        self.cancelJobsButton.clicked.connect(self.jobManager.cancelAll)
         self.colorPaletteButton.clicked.connect(self.onToggleColorPaletteButtonClicked)
         self.createTurnButton.clicked.connect(self.onCreateTurnButtonClicked)
+        self.multiViewButton.clicked.connect(self.onMultiViewButtonClicked)
+        self.renderMultiViewButton.clicked.connect(self.onRenderMultiViewButtonClicked)
+        self.calibrateSamplingButton.clicked.connect(self.onCalibrateSamplingButtonClicked)
         self.storePrefsButton.clicked.connect(self.onStorePrefsButtonClicked)
         self.importPrefsButton.clicked.connect(self.onImportPrefsButtonClicked)
         self.clearSceneButton.clicked.connect(self.onClearSceneButtonClicked)
+        self.preflightButton.clicked.connect(self.onPreflightButtonClicked)
+        self.reviewGridButton.clicked.connect(self.onReviewGridButtonClicked)
+        self.materialVariantsButton.clicked.connect(self.onMaterialVariantsButtonClicked)
+        self.frameAssetButton.clicked.connect(self.onFrameAssetButtonClicked)
+        self.buildRigButton.clicked.connect(self.onBuildRigButtonClicked)
+        self.renderViewerCheckBox.toggled.connect(self.renderViewer.setVisible)
+        self.profileViewportCheckBox.toggled.connect(self.onProfileViewportCheckBoxToggled)
 
     def createComboBox(self) -> None:
         """Creates a combo box with the Maya's colorSpaces."""
@@ -302,10 +432,147 @@ class MainUi(QtWidgets.QDialog):
             self.colorSpaceMenu.addItem(colorSpace)
 
     def queryHdr(self) -> None:
-        """Adds the hrd present in hdr path"""
-        for hdr in os.listdir(constants.LIGHT_DOME_PATH):
-            if hdr.split('.')[-1] in constants.HDR_EXTENSIONS:
-                self.setHdriMenu.addItem(hdr)
+        """Adds the hrd present in hdr path and watches the folder for new ones"""
+        self.hdriWatcherTimer.stop()
+        if self.hdriWatcher:
+            self.hdriWatcher.stop()
+
+        self.setHdriMenu.clear()
+        self.hdriWatcher = None
+
+        # the folder can be on a slow network share, it is listed on a worker
+        self.hdriListJob = self.submitJob('List HDRIs', self._listHdris, constants.LIGHT_DOME_PATH,
+                                          onDone=self._onHdrisListed)
+
+    @staticmethod
+    def _listHdris(job: jobs.Job, hdriPath: str):
+        hdrs = [hdr for hdr in os.listdir(hdriPath) if lookdev_core.isHdri(hdr)]
+
+        # copied to the local cache in the background, picking one never waits for the network
+        asset_cache.getAssetCache().prefetchAll(os.path.join(hdriPath, hdr) for hdr in hdrs)
+        return hdriPath, hdrs
+
+    def prefetchAssets(self) -> None:
+        """Copies the current engine's grounds and color palette to the local cache in the background"""
+        self.submitJob('Prefetch assets', self._prefetchAssets,
+                       [self.ground_1_path, self.ground_2_path, self.ground_3_path, self.color_checker_path])
+
+    @staticmethod
+    def _prefetchAssets(job: jobs.Job, paths: list) -> None:
+        # only the stats are read here, the copies run on the cache's own workers
+        asset_cache.getAssetCache().prefetchAll(paths)
+
+    def _onHdrisListed(self, job: jobs.Job) -> None:
+        # the folder has been changed while it was listed, or the dialog closed
+        if job is not self.hdriListJob:
+            return
+
+        self.hdriListJob = None
+        hdrs = None
+        if job.state == jobs.JOB_DONE:
+            hdrs = job.result[1]
+            self.setHdriMenu.addItems(hdrs)
+        elif job.state == jobs.JOB_FAILED:
+            QtWidgets.QMessageBox.warning(self, constants.TOOL_NAME, 'HDRI folder not listed, the menu fills up once it '
+                                                                     'can be read:\n{}'.format(job.error))
+
+        # the folder is never listed again, only the changes are applied to the menu. Without a listing, the watcher
+        # lists it from its own thread and reports every HDRI as added
+        self.hdriWatcher = folder_watcher.FolderWatcher(constants.LIGHT_DOME_PATH, lookdev_core.isHdri, names=hdrs)
+        self.hdriWatcher.start()
+        self.hdriWatcherTimer.start()
+
+    def queryGroundThumbnails(self) -> None:
+        """Shows the grounds' thumbnails in the ground menu, the missing ones are rendered on a worker"""
+        for index in range(self.setGroundMenu.count()):
+            self.setGroundMenu.setThumbnailPath(index, None)
+
+        groundPaths = [self.ground_1_path, self.ground_2_path, self.ground_3_path]
+        self.submitJob('Ground thumbnails', self._renderGroundThumbnails, groundPaths,
+                       onDone=self._onGroundThumbnailsRendered)
+
+    @staticmethod
+    def _renderGroundThumbnails(job: jobs.Job, groundPaths: list):
+        return groundPaths, ground_thumbnails.generateThumbnails(
+            constants.GROUND_THUMBNAIL_PATH, groundPaths, constants.GROUND_THUMBNAIL_SIZE, job=job)
+
+    def _onGroundThumbnailsRendered(self, job: jobs.Job) -> None:
+        if job.state != jobs.JOB_DONE:
+            return
+
+        groundPaths, thumbnails = job.result
+        # the render engine has been switched while they were rendered
+        if groundPaths != [self.ground_1_path, self.ground_2_path, self.ground_3_path]:
+            return
+
+        for index, groundPath in enumerate(groundPaths):
+            self.setGroundMenu.setThumbnailPath(index, thumbnails[groundPath])
+
+    def submitJob(self, name: str, func, *args, **kwargs) -> jobs.Job:
+        """Runs func(job, *args) on a worker and shows its progress in the dialog, see jobs.JobManager.submit"""
+        job = self.jobManager.submit(name, func, *args, **kwargs)
+        self.onJobsTimerTimeout()
+        self.jobsTimer.start()
+        return job
+
+    def onJobsTimerTimeout(self) -> None:
+        """Shows the progress of the running jobs"""
+        activeJobs = self.jobManager.activeJobs()
+        if not activeJobs:
+            self.jobsTimer.stop()
+            self.jobsProgressBar.hide()
+            self.cancelJobsButton.hide()
+            return
+
+        progress = sum(job.progress for job in activeJobs) / len(activeJobs)
+        # jobs which do not report progress show a busy bar
+        self.jobsProgressBar.setRange(0, 100 if progress else 0)
+        self.jobsProgressBar.setValue(int(progress * 100))
+        self.jobsProgressBar.setFormat('{} %p%'.format(', '.join(job.message or job.name for job in activeJobs)))
+        self.jobsProgressBar.show()
+        self.cancelJobsButton.show()
+
+    def onHdriWatcherTimerTimeout(self) -> None:
+        """Applies the HDRI folder changes to the HDRI menu"""
+        for change in self.hdriWatcher.drain():
+            if change.kind == 'added':
+                self.setHdriMenu.addItem(change.name)
+                continue
+
+            index = self.setHdriMenu.findText(change.oldName if change.kind == 'renamed' else change.name)
+            if index < 0:
+                continue
+
+            if change.kind == 'renamed':
+                self.setHdriMenu.setItemText(index, change.name)
+            else:
+                self.setHdriMenu.removeItem(index)
+
+    def performanceContext(self) -> dict:
+        """Returns the scene's context stored with the timed operations"""
+        meshes = cmds.ls(type='mesh', noIntermediate=True)
+        return {
+            'asset': lookdev_core.assetName(),
+            'sceneSize': cmds.polyEvaluate(meshes, face=True) if meshes else 0,
+            'renderer': self.renderEngine.RENDERER if hasattr(self, 'renderEngine') else None,
+        }
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        """Stops the HDRI folder watcher and restores the viewport settings"""
+        self.hdriWatcherTimer.stop()
+        self.jobsTimer.stop()
+        self.hdriListJob = None
+        self.jobManager.cancelAll()
+        if self.hdriWatcher:
+            self.hdriWatcher.stop()
+
+        # never leave the viewport settings lowered
+        self.groundLodTimer.stop()
+        self.interactionMode.restore()
+        self.renderViewer.close()
+        lookdev_core.removeSceneCallbacks(self.sceneCallbacks)
+
+        super(MainUi, self).closeEvent(event)
 
     def setRenderEngine(self) -> None:
         """Sets the render engine"""
@@ -323,7 +590,7 @@ class MainUi(QtWidgets.QDialog):
             self.ground_2_path = QtCore.QDir.path(QtCore.QDir('grounds:ground_2_vray.ma'))
             self.ground_3_path = QtCore.QDir.path(QtCore.QDir('grounds:ground_3_vray.ma'))
             self.color_checker_path = QtCore.QDir.path(QtCore.QDir('camera:ColorPalette_vray.ma'))
-            self.groundClass = self.renderEngine.GroundClass(self.ground_1_path, self.ground_2_path, self.ground_3_path, self.color_checker_path)
+            self.groundClass = self.renderEngine.GroundClass(self.ground_1_path, self.ground_2_path, self.ground_3_path, self.color_checker_path, self.groundLod())
             self.lightValues = constants.VRAY_LIGHT_VALUES
             self.colorpaletteName = 'ColorPalette_vray_ALL_Grp'
             return
@@ -337,112 +604,124 @@ class MainUi(QtWidgets.QDialog):
         self.ground_2_path = QtCore.QDir.path(QtCore.QDir('grounds:ground_2_arnold.ma'))
         self.ground_3_path = QtCore.QDir.path(QtCore.QDir('grounds:ground_3_arnold.ma'))
         self.color_checker_path = QtCore.QDir.path(QtCore.QDir('camera:ColorPalette_arnold.ma'))
-        self.groundClass = self.renderEngine.GroundClass(self.ground_1_path, self.ground_2_path, self.ground_3_path, self.color_checker_path)
+        self.groundClass = self.renderEngine.GroundClass(self.ground_1_path, self.ground_2_path, self.ground_3_path, self.color_checker_path, self.groundLod())
         self.lightValues = constants.ARNOLD_LIGHT_VALUES
         self.colorpaletteName = 'ColorPalette_arnold_ALL_Grp'
 
+    def onRenderEngineComboCurrentIndexChanged(self) -> None:
+        """Switches the render engine, the current rig is kept aside and the other engine's rig is brought back
+
+        The new rig is built like the current one if it has never been, then receives the UI values changed since it
+        was kept aside.
+        """
+        renderEngine = vray_core if self.renderEngineCombo.currentText() == 'VRay' else arnold_core
+        if not renderEngine.pluginLoaded():
+            # nothing is stashed, the scene stays on the current engine
+            blocked = self.renderEngineCombo.blockSignals(True)
+            self.renderEngineCombo.setCurrentIndex(1 if self.renderEngine is vray_core else 0)
+            self.renderEngineCombo.blockSignals(blocked)
+            QtWidgets.QMessageBox.warning(self, constants.TOOL_NAME, '{} plugin not loaded'.format(renderEngine.PLUGIN))
+            return
+
+        state = rig_switcher.rigState()
+        rig_switcher.stashRig(self.renderEngine.RENDERER)
+        self.rigSceneValues[self.renderEngine.RENDERER] = self.bindings.sceneValues()
+
+        self.setRenderEngine()
+        self.queryGroundThumbnails()
+        self.prefetchAssets()
+
+        with lookdev_core.IprBatch(self.renderEngine.pauseIpr):
+            if rig_switcher.activateRig(self.renderEngine.RENDERER):
+                self.bindings.setSceneValues(self.rigSceneValues.get(self.renderEngine.RENDERER, {}))
+            else:
+                self._buildRig(state)
+                self.bindings.invalidate()
+
+            # values changed while the other engine was active
+            self.bindings.push()
+
+    def _buildRig(self, state: rig_switcher.RigState) -> None:
+        """Builds the current engine's camera, lights, dome and ground as described by state"""
+        if state.camera:
+            self.renderEngine.createCam(self.color_checker_path)
+
+        if state.lights:
+            self.renderEngine.setThreePointsLights()
+            self.enableFillLight()
+            self.onKeyLightCheckBoxStateChanged()
+            self.onBackLightCheckBoxStateChanged()
+
+        if state.dome:
+            self.lightDomeClass.setLightDome(self.setHdriMenu.currentText())
+
+        if state.groundIndex is not None:
+            self.groundClass.setGround(state.groundIndex)
+
     def sendToCreateCam(self) -> None:
         """Triggers create cam function with the associated color path"""
         self.renderEngine.createCam(self.color_checker_path)
 
     def resetRotateCamSlider(self) -> None:
         """Reset the cam slider when cam is created"""
-        self.rotateCamLabel.setText('0')
-        self.rotateCamSlider.setValue(0)
+        self.bindings.reset(rotateCam=0)
 
     def onColorSpaceMenuCurrentIndexChanged(self) -> None:
         """Change the Maya's color space"""
         # change Maya's color space in Core
         lookdev_core.changeColorSpace(self.colorSpaceMenu.currentText())
 
-    @staticmethod
-    def openBrowser() -> None:
+    def openBrowser(self) -> None:
         """opens the browser to set a new ground and prefs path"""
         groundDirectory = cmds.fileDialog2(fileFilter='*', fileMode=3, dialogStyle=2)
+        if not groundDirectory:
+            return
 
         constants.PREFERENCE_PATH = groundDirectory[0] + '/Preferences.txt'
         constants.LIGHT_DOME_PATH = groundDirectory[0] + '/'
 
-    def updateRotateCamValueFromSlider(self) -> None:
-        """changes the rotateCam label when slider value is changed"""
-        # change rotateCam label value
-        self.rotateCamLabel.setText(str(self.rotateCamSlider.value())[:6])
-
-        # send rotateCam value to rotateCam in Core
-        self.renderEngine.rotateCam(self.rotateCamSlider.value())
-
-    def changeRotateCamValueFromQline(self) -> None:
-        """Changes rotateCam label's value from slider"""
-        self.rotateCamSlider.setValue(float(self.rotateCamLabel.text()))
+        # watch the new HDRI folder
+        self.queryHdr()
 
     def onCreateLightButtonClicked(self) -> None:
         """Create a three point lights in Maya's scene"""
         # send setThreePointsLight to Core
         self.renderEngine.setThreePointsLights()
 
+        # the lights have been rebuilt or removed, their previous values are gone
+        self.bindings.reset(rotateLights=0, fillLight=0, keyLight=0, backLight=0)
+
         if not lookdev_core.queryExists('Lights_Grp'):
-            self.rotateLightSlider.setValue(0)
-            self.rotateLightLabel.setText('0')
-            self.fillLightLabel.setText('0')
-            self.fillLightSlider.setValue(0)
-            self.keyLightSlider.setValue(0)
-            self.keyLightLabel.setText('0')
-            self.backLightSlider.setValue(0)
-            self.backLightLabel.setText('0')
             return
 
-        # reset sliders and lineEdits
-        self.rotateLightSlider.setValue(0)
-        self.rotateLightLabel.setText('0')
-        self.fillLightLabel.setText('10')
-        self.fillLightSlider.setValue(10)
-        self.keyLightSlider.setValue(40)
-        self.keyLightLabel.setText('40')
-        self.backLightSlider.setValue(10)
-        self.backLightLabel.setText('10')
-
-    def onRotateLightSliderValueChanged(self) -> None:
-        """changes the rotateLight label when slider is moved and send it to Core"""
-        # change rotateCam label value
-        self.rotateLightLabel.setText(str(self.rotateLightSlider.value())[:6])
-
-        # send to Core
-        self.renderEngine.rotLights(self.rotateLightSlider.value())
-
-    def changeRotateLightLabelFromQline(self) -> None:
-        """Changes rotateLight label's value"""
-        self.rotateLightSlider.setValue(float(self.rotateLightLabel.text()))
+        # send the default intensities to the new lights
+        with lookdev_core.IprBatch(self.renderEngine.pauseIpr):
+            self.bindings['fillLight'].setValue(10)
+            self.bindings['keyLight'].setValue(40)
+            self.bindings['backLight'].setValue(10)
 
     def onSetFloorButtonClicked(self) -> None:
         """Sets a ground on Maya's scene"""
         self.groundClass.setGround(self.setGroundMenu.currentIndex())
 
-    def onFillLightSliderValueChanged(self) -> None:
-        """Changes Fill light label from slider's value and send it to Core"""
-        self.fillLightLabel.setText(str(self.fillLightSlider.value())[:6])
-        self.renderEngine.changeLightIntensity(self.fillLight, float(self.fillLightSlider.value()))
+    def groundLod(self) -> str:
+        """Returns the ground's level of detail chosen in the UI"""
+        return ground_lod.LOD_PROXY if self.proxyGroundCheckBox.isChecked() else ground_lod.LOD_FULL
 
-    def onFillLightLabelEditingFinished(self) -> None:
-        """Changes Fill light slider's value"""
-        self.fillLightSlider.setValue(float(self.fillLightLabel.text()))
+    def onProxyGroundCheckBoxStateChanged(self) -> None:
+        """Swaps the ground in scene between its proxy and its full version"""
+        self.groundLodTimer.stop()
+        self.groundClass.setLod(self.groundLod())
 
-    def changeKeyLightFromQline(self) -> None:
-        """Changes key light label from slider's value"""
-        self.keyLightSlider.setValue(float(self.keyLightLabel.text()))
+    def onProfileViewportCheckBoxToggled(self, checked: bool) -> None:
+        """Measures the viewport frame time at the start of the next gestures"""
+        self.interactionMode.profile = checked
 
-    def onKeyLightSliderValueChanged(self) -> None:
-        """Changes key light label from slider and send it to Core"""
-        self.keyLightLabel.setText(str(self.keyLightSlider.value())[:6])
-        self.renderEngine.changeLightIntensity(self.keyLight, float(self.keyLightLabel.text()))
-
-    def onBackLightLabelEditingFinished(self) -> None:
-        """Changes back light slider's value'"""
-        self.backLightSlider.setValue(float(self.backLightLabel.text()))
-
-    def changeBackLightFromSlider(self) -> None:
-        """Changes back light label's value'"""
-        self.backLightLabel.setText(str(self.backLightSlider.value()))
-        self.renderEngine.changeLightIntensity(self.backLight, float(self.backLightLabel.text()))
+    def onInteractionBegin(self) -> None:
+        """Shows the ground's proxy for the gesture, the ground set back by the timer is kept if still pending"""
+        self.groundLodTimer.stop()
+        if self.groundClass.lod != ground_lod.LOD_PROXY:
+            self.groundClass.setLod(ground_lod.LOD_PROXY)
 
     def enableAllLights(self) -> None:
         """Enables all lights when create light button is pressed"""
@@ -479,48 +758,132 @@ class MainUi(QtWidgets.QDialog):
         """Enables back light"""
         self.renderEngine.disableLight(self.backLight, self.backLightCheckBox.isChecked())
 
+    def onSetHdriMenuCurrentIndexChanged(self) -> None:
+        """Projects the selected HDRI for its preview, on a worker"""
+        self.hdriCoefficients = None
+        self.updateHdriPreview()
+
+        hdriName = self.setHdriMenu.currentText()
+        if not hdriName or not hdri_preview.isAvailable():
+            return
+
+        texturePath = self.lightDomeClass.texturePath(hdriName)
+        self.submitJob('Preview {}'.format(hdriName), self._projectHdri, texturePath, onDone=self._onHdriProjected)
+
+    def _projectHdri(self, job: jobs.Job, texturePath: str):
+        # the image is read on the main thread, only the projection runs on the worker
+        def reader(path):
+            return self.jobManager.bridge.call(hdri_preview.readEquirect, path)
+
+        return texturePath, hdri_preview.hdriCoefficients(texturePath, constants.HDRI_SH_CACHE_PATH, reader)
+
+    def _onHdriProjected(self, job: jobs.Job) -> None:
+        if job.state != jobs.JOB_DONE:
+            return
+
+        texturePath, coefficients = job.result
+        # another HDRI has been selected meanwhile
+        if texturePath != self.lightDomeClass.texturePath(self.setHdriMenu.currentText()):
+            return
+
+        self.hdriCoefficients = coefficients
+        self.updateHdriPreview()
+
+    def updateHdriPreview(self) -> None:
+        """Shades the preview sphere with the dome's current rotation and intensity"""
+        if self.hdriCoefficients is None:
+            self.hdriPreview.setArray(None)
+            return
+
+        self.hdriPreview.setArray(hdri_preview.previewSphere(
+            self.hdriCoefficients, constants.HDRI_PREVIEW_SIZE, rotation=self.bindings['domeRotate'].value,
+            intensity=self.bindings['domeIntensity'].value))
+
     def onSetHdriButtonClicked(self) -> None:
         """Sets a HDR in Maya's scene"""
+        domeExisted = lookdev_core.queryExists(self.lightDomeClass.LIGHT_DOME_NAME)
         self.lightDomeClass.setLightDome(self.setHdriMenu.currentText())
 
-        # if HDRI exists, set lightDome's slider and Qline to 1
-        if not lookdev_core.queryExists(self.lightDomeClass.LIGHT_DOME_NAME):
-            self.lightDomeRotateSlider.setValue(0)
-            self.lightDomeRotateLabel.setText('0')
-            self.lightDomeIntensSlider.setValue(0)
-            self.lightDomeintensLabel.setText('0')
+        # HDRI switched on the existing dome, its rotation and intensity are kept
+        if domeExisted and lookdev_core.queryExists(self.lightDomeClass.LIGHT_DOME_NAME):
             return
 
-        self.lightDomeRotateSlider.setValue(0)
-        self.lightDomeRotateLabel.setText('0')
-        self.lightDomeIntensSlider.setValue(1)
-        self.lightDomeintensLabel.setText('1')
-
-    def onLightDomeintensLabelEditingFinished(self) -> None:
-        """Changes lightDome slider's value"""
-        self.lightDomeIntensSlider.setValue(float(self.lightDomeintensLabel.text()))
+        # reset lightDome's sliders and Qlines, intensity goes to 1 if HDRI exists
+        self.bindings.reset(domeRotate=0, domeIntensity=0)
 
-    def onLightDomeIntensSliderValueChanged(self) -> None:
-        """Changes lightDome label from slider and send it to Core"""
-        self.lightDomeintensLabel.setText(str(self.lightDomeIntensSlider.value()))
-        self.lightDomeClass.changeDome1Intens(float(self.lightDomeintensLabel.text()))
+        if lookdev_core.queryExists(self.lightDomeClass.LIGHT_DOME_NAME):
+            self.bindings['domeIntensity'].setValue(1)
 
-    def onLightDomeRotateLabelEditingFinished(self) -> None:
-        """Changes lightDome rotate slider's value'"""
-        self.lightDomeRotateSlider.setValue(float(self.lightDomeRotateLabel.text()))
-
-    def changeLightDomerotateFromSlider(self) -> None:
-        """Changes lightDome rotate label's text and send it to Core"""
-        self.lightDomeRotateLabel.setText(str(self.lightDomeRotateSlider.value()))
-        self.lightDomeClass.rotateDome(float(self.lightDomeRotateLabel.text()))
+        self.updateHdriPreview()
 
     def onToggleColorPaletteButtonClicked(self) -> None:
         """Hide color palette group in Maya's scene"""
         lookdev_core.toggleColorPalette(self.colorpaletteName)
 
     def onCreateTurnButtonClicked(self) -> None:
-        """Creates turn table in Maya"""
-        lookdev_core.createTurn(int(self.turnTableFrameLabel.text()))
+        """Creates turn table in Maya, an unchanged turntable is not keyed again so its playback cache is kept"""
+        numberOfFrames = int(self.turnTableFrameLabel.text())
+
+        # the turntable is rendered with the full ground, it is loaded before the cache is filled: reloading the
+        # reference afterwards would flush it
+        blocked = self.proxyGroundCheckBox.blockSignals(True)
+        self.proxyGroundCheckBox.setChecked(False)
+        self.proxyGroundCheckBox.blockSignals(blocked)
+        self.onProxyGroundCheckBoxStateChanged()
+
+        rekey = not self.turntableCache.isCurrent(numberOfFrames)
+
+        with lookdev_core.IprBatch(self.renderEngine.pauseIpr):
+            if rekey:
+                lookdev_core.createTurn(numberOfFrames)
+            sampling_calibrator.applyCalibration(lookdev_core.assetName(), self.renderEngine.RENDERER)
+
+        # the keys are applied once the batch is committed
+        if rekey:
+            self.turntableCache.warm(numberOfFrames)
+
+    def onMultiViewButtonClicked(self) -> None:
+        """Creates or deletes the multi-view cameras"""
+        multi_view.createMultiViewRig(self.renderEngine)
+
+    def onRenderMultiViewButtonClicked(self) -> None:
+        """Renders all multi-view cameras in one batch render, in the project's images folder"""
+        outputDir = cmds.workspace(expandName=cmds.workspace(fileRuleEntry='images'))
+        sampling_calibrator.applyCalibration(lookdev_core.assetName(), self.renderEngine.RENDERER)
+        multi_view.renderMultiView(self.renderEngine.RENDERER, outputDir, int(cmds.currentTime(query=True)),
+                                   constants.FRAME_BUFFER_PATH if frame_buffer.isAvailable() else None)
+
+    def onCalibrateSamplingButtonClicked(self) -> None:
+        """Finds the cheapest sampling meeting the noise target for the current asset and stores it"""
+        # the scene is exported here, the test renders run on a worker and read their images on the main thread
+        renderer = sampling_calibrator.MayaRenderer(
+            self.renderEngine.RENDERER,
+            reader=lambda path: self.jobManager.bridge.call(sampling_calibrator.readImage, path))
+
+        self.submitJob('Calibrate sampling', self._calibrateSampling, renderer, self.renderEngine.SAMPLING_LEVELS,
+                       lookdev_core.assetName(), self.renderEngine.RENDERER, onDone=self._onSamplingCalibrated)
+
+    @staticmethod
+    def _calibrateSampling(job: jobs.Job, renderer: sampling_calibrator.MayaRenderer, levels, asset: str,
+                           rendererName: str):
+        try:
+            return asset, rendererName, sampling_calibrator.calibrate(renderer, levels, job=job)
+        finally:
+            renderer.close()
+
+    def _onSamplingCalibrated(self, job: jobs.Job) -> None:
+        if job.state == jobs.JOB_FAILED:
+            QtWidgets.QMessageBox.warning(self, constants.TOOL_NAME, 'Sampling not calibrated:\n{}'.format(job.error))
+            return
+
+        if job.state != jobs.JOB_DONE:
+            return
+
+        asset, rendererName, calibration = job.result
+        sampling_calibrator.saveCalibration(asset, rendererName, calibration)
+        # the engine or the scene may have changed during the renders, the calibration is then only stored
+        if asset == lookdev_core.assetName() and rendererName == self.renderEngine.RENDERER:
+            sampling_calibrator.applyCalibration(asset, rendererName)
 
     def onStorePrefsButtonClicked(self) -> None:
         """Store preferences"""
@@ -529,41 +892,118 @@ class MainUi(QtWidgets.QDialog):
         self.lightValues[1].get(self.keyLight, {})['keyLightEnabled'] = self.keyLightCheckBox.isChecked()
         self.lightValues[2].get(self.backLight, {})['backLightEnabled'] = self.backLightCheckBox.isChecked()
 
-        self.renderEngine.storePrefs()
+        preferencePath, preferences = self.renderEngine.storePrefs()
+
+        # the preferences file can be on a network share, it is written on a worker
+        self.submitJob('Store preferences', self._writePrefs, preferencePath, preferences, onDone=self._onPrefsWritten)
+
+    @staticmethod
+    def _writePrefs(job: jobs.Job, preferencePath: str, preferences: str) -> None:
+        # written next to the file then moved, an interrupted write never leaves a truncated file
+        tmpPath = '{}.tmp'.format(preferencePath)
+        with open(tmpPath, 'w') as wFile:
+            wFile.write(preferences)
+        os.replace(tmpPath, preferencePath)
+
+    def _onPrefsWritten(self, job: jobs.Job) -> None:
+        if job.state == jobs.JOB_FAILED:
+            QtWidgets.QMessageBox.warning(self, constants.TOOL_NAME, 'Preferences not stored:\n{}'.format(job.error))
 
     def onImportPrefsButtonClicked(self) -> None:
         """Import preferences and sets lights values"""
-        settings = self.renderEngine.importPrefs()
+        # the preset reaches the renderer as a single update
+        with lookdev_core.IprBatch(self.renderEngine.pauseIpr):
+            settings = self.renderEngine.importPrefs()
 
-        #fillLight
-        self.fillLightSlider.setValue(settings[0].get('fillLight', {}).get('fillLightIntens'))
-        self.fillLightCheckBox.setChecked(settings[0].get('fillLight', {}).get('fillLightEnabled'))
+            #fillLight
+            self.bindings['fillLight'].setValue(settings[0].get('fillLight', {}).get('fillLightIntens'))
+            self.fillLightCheckBox.setChecked(settings[0].get('fillLight', {}).get('fillLightEnabled'))
 
-        # keyLight
-        self.keyLightSlider.setValue(settings[1].get('keyLight', {}).get('keyLightIntens'))
-        self.keyLightCheckBox.setChecked(settings[1].get('keyLight', {}).get('keyLightEnabled'))
+            # keyLight
+            self.bindings['keyLight'].setValue(settings[1].get('keyLight', {}).get('keyLightIntens'))
+            self.keyLightCheckBox.setChecked(settings[1].get('keyLight', {}).get('keyLightEnabled'))
 
-        # backLight
-        self.backLightSlider.setValue(settings[2].get('backLight', {}).get('backLightIntens'))
-        self.backLightCheckBox.setChecked(settings[2].get('backLight', {}).get('backLightEnabled'))
+            # backLight
+            self.bindings['backLight'].setValue(settings[2].get('backLight', {}).get('backLightIntens'))
+            self.backLightCheckBox.setChecked(settings[2].get('backLight', {}).get('backLightEnabled'))
 
     def onClearSceneButtonClicked(self) -> None:
         """Clears scene and reset light's sliders and labels"""
-        self.renderEngine.clearScene(self.color_checker_path,
-                                     self.ground_1_path,
-                                     self.ground_2_path,
-                                     self.ground_3_path
-                                     )
+        self.renderEngine.clearScene()
+        self.turntableCache.restore()
 
         # reset sliders and labels
         self.fillLightCheckBox.setChecked(False)
         self.keyLightCheckBox.setChecked(False)
         self.backLightCheckBox.setChecked(False)
-        self.rotateCamSlider.setValue(0)
-        self.rotateLightSlider.setValue(0)
-        self.rotateLightSlider.setValue(0)
-        self.fillLightSlider.setValue(0)
-        self.keyLightSlider.setValue(0)
-        self.backLightSlider.setValue(0)
-        self.lightDomeIntensSlider.setValue(0)
-        self.lightDomeRotateSlider.setValue(0)
+        self.bindings.reset(rotateCam=0, rotateLights=0, fillLight=0, keyLight=0, backLight=0, domeIntensity=0, domeRotate=0)
+        self.updateHdriPreview()
+
+    def onReviewGridButtonClicked(self) -> None:
+        """Lays out the chosen assets side by side on the ground, removes the grid if it is already in scene"""
+        if cmds.objExists(review_grid.REVIEW_GRID_GROUP):
+            review_grid.removeReviewGrid()
+            return
+
+        paths = cmds.fileDialog2(fileFilter='Maya Scenes (*.ma *.mb)', fileMode=4, dialogStyle=2)
+        if not paths:
+            return
+
+        review_grid.createReviewGrid(paths)
+
+    def onMaterialVariantsButtonClicked(self) -> None:
+        """Lays out one variant per selected material and frames them, removes the variants if already in scene"""
+        if cmds.objExists(material_variants.MATERIAL_VARIANTS_GROUP):
+            material_variants.removeVariantGrid()
+            return
+
+        materials = material_variants.selectedVariants()
+        if not materials:
+            QtWidgets.QMessageBox.warning(self, constants.TOOL_NAME, 'Select the materials to compare, and the asset to apply them to')
+            return
+
+        material_variants.createVariantGrid(materials)
+        auto_framing.frameAsset(nodes=[material_variants.MATERIAL_VARIANTS_GROUP],
+                                principalAxes=self.principalAxesCheckBox.isChecked())
+
+    def onBuildRigButtonClicked(self) -> None:
+        """Builds the camera, the lights and the dome then applies the default values and the asset's sampling"""
+        try:
+            rig_template.buildRig(self.renderEngine, self.color_checker_path, self.setHdriMenu.currentText())
+        except RuntimeError as error:
+            QtWidgets.QMessageBox.warning(self, constants.TOOL_NAME, 'Rig not built:\n{}'.format(error))
+            return
+
+        self.enableAllLights()
+
+        with lookdev_core.IprBatch(self.renderEngine.pauseIpr):
+            self.bindings.reset(rotateCam=0, rotateLights=0, domeRotate=0)
+            self.bindings['fillLight'].setValue(10)
+            self.bindings['keyLight'].setValue(40)
+            self.bindings['backLight'].setValue(10)
+            self.bindings['domeIntensity'].setValue(1)
+            sampling_calibrator.applyCalibration(lookdev_core.assetName(), self.renderEngine.RENDERER)
+
+        self.updateHdriPreview()
+
+    def onFrameAssetButtonClicked(self) -> None:
+        """Fits the camera, lights and ground to the selected asset"""
+        auto_framing.frameAsset(principalAxes=self.principalAxesCheckBox.isChecked())
+
+    def onPreflightButtonClicked(self) -> None:
+        """Checks the grounds, palettes, HDRIs and preferences files and shows the problems found"""
+        self.preflightButton.setEnabled(False)
+        self.submitJob('Check resources', lambda job, hdriPath: preflight.runPreflight(hdriPath),
+                       constants.LIGHT_DOME_PATH, onDone=self._onPreflightDone)
+
+    def _onPreflightDone(self, job: jobs.Job) -> None:
+        self.preflightButton.setEnabled(True)
+        if job.state != jobs.JOB_DONE:
+            return
+
+        report = job.result
+        if report.ok:
+            QtWidgets.QMessageBox.information(self, constants.TOOL_NAME, report.summary())
+            return
+
+        QtWidgets.QMessageBox.warning(self, constants.TOOL_NAME, report.summary())
@@ -0,0 +1,229 @@
+"""Streaming reader of Maya ASCII files, runs without Maya.
+
+Usage:
+    python -m lookdev_tool.ma_reader [--renderer arnold|vray] file.ma [file.ma ...]
+"""
+import os
+import re
+import sys
+import argparse
+import collections
+from typing import Dict, Iterator, List, Optional, Set, TextIO
+
+# statements longer than this (mesh data) are truncated, only their first tokens are needed
+MAX_STATEMENT_LENGTH = 4096
+
+# string attributes holding a texture path
+TEXTURE_ATTRIBUTES = ('.ftn', '.fileTextureName', '.filename')
+
+RENDERER_NODE_TYPES = {
+    'arnold': re.compile(r'^ai[A-Z]'),
+    'vray': re.compile(r'^VRay'),
+}
+
+ROOT_SUFFIX = 'ALL_Grp'
+
+_TOKEN_RE = re.compile(r'"((?:[^"\\]|\\.)*)"|([^\s"]+)')
+_ESCAPE_RE = re.compile(r'\\(.)')
+
+MaNode = collections.namedtuple('MaNode', ['name', 'nodeType', 'parent', 'shared'])
+
+
+class MaSummary(object):
+    """What a .ma file contains, as far as the lookdev tool is concerned"""
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.nodes: List[MaNode] = []
+        self.nodeTypes = collections.Counter()
+        self.texturePaths: Set[str] = set()
+        self.references: List[str] = []
+        self.plugins: Set[str] = set()
+        self.connections = 0
+        self.statements = 0
+
+    @property
+    def rootNames(self) -> List[str]:
+        """The root groups as named once referenced, Maya prefixes them with the file's base name"""
+        prefix = os.path.splitext(os.path.basename(self.path))[0]
+        return ['{}_{}'.format(prefix, node.name) for node in self.nodes
+                if node.parent is None and node.nodeType == 'transform' and node.name.endswith(ROOT_SUFFIX)]
+
+    def rendererNodeTypes(self) -> Dict[str, Set[str]]:
+        """Returns {renderer: node types}, shared nodes (render settings) are ignored"""
+        rendererTypes = {renderer: set() for renderer in RENDERER_NODE_TYPES}
+        for node in self.nodes:
+            if node.shared:
+                continue
+
+            for renderer, pattern in RENDERER_NODE_TYPES.items():
+                if pattern.match(node.nodeType):
+                    rendererTypes[renderer].add(node.nodeType)
+
+        return rendererTypes
+
+    def problems(self, renderer: Optional[str] = None) -> List[str]:
+        """Returns what would break the tool once the file is referenced
+
+        Parameters:
+            renderer: The renderer the file is meant for, enables the foreign node types check.
+        """
+        problems = []
+        if not self.rootNames:
+            problems.append('no root group ending with {}'.format(ROOT_SUFFIX))
+
+        if renderer:
+            for otherRenderer, nodeTypes in self.rendererNodeTypes().items():
+                if otherRenderer != renderer and nodeTypes:
+                    problems.append('{} node types: {}'.format(otherRenderer, ', '.join(sorted(nodeTypes))))
+
+        return problems
+
+
+def iterStatements(fileObject: TextIO, maxLength: int = MAX_STATEMENT_LENGTH) -> Iterator[str]:
+    """Yields the MEL statements of a .ma file without their ending semicolon
+
+    Statements can span several lines and strings can hold semicolons. Comments outside strings are dropped before
+    anything else is read from their line. Only the first maxLength characters of a statement are kept, so memory
+    stays bounded whatever the size of the mesh data.
+    """
+    buffer = []
+    length = 0
+    inString = False
+    escaped = False
+
+    for line in fileObject:
+        # a comment line can sit between two lines of a statement
+        if not inString and line.lstrip().startswith('//'):
+            continue
+
+        start = 0
+        for index, char in enumerate(line):
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = inString
+            elif char == '"':
+                inString = not inString
+            elif char == '/' and not inString and line.startswith('//', index):
+                # trailing comment, its quotes and semicolons are not part of the statement
+                line = line[:index] + '\n'
+                break
+            elif char == ';' and not inString:
+                if length < maxLength:
+                    buffer.append(line[start:index][:maxLength - length])
+                yield ''.join(buffer).strip()
+
+                buffer = []
+                length = 0
+                start = index + 1
+
+        if length < maxLength:
+            chunk = line[start:][:maxLength - length]
+            buffer.append(chunk)
+            length += len(chunk)
+
+    if ''.join(buffer).strip():
+        yield ''.join(buffer).strip()
+
+
+def tokenize(statement: str) -> List[str]:
+    """Splits a statement in words, quotes are removed from strings"""
+    tokens = []
+    for match in _TOKEN_RE.finditer(statement):
+        if match.group(1) is not None:
+            tokens.append(_ESCAPE_RE.sub(r'\1', match.group(1)))
+        else:
+            tokens.append(match.group(2))
+
+    return tokens
+
+
+def _flagValue(tokens: List[str], *flags: str) -> Optional[str]:
+    for index, token in enumerate(tokens[:-1]):
+        if token in flags:
+            return tokens[index + 1]
+
+    return None
+
+
+def readMayaAscii(path: str) -> MaSummary:
+    """Reads a .ma file and returns its MaSummary
+
+    Parameters:
+        path: The .ma file's path.
+    """
+    summary = MaSummary(path)
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as rFile:
+        for statement in iterStatements(rFile):
+            summary.statements += 1
+            command, _, arguments = statement.partition(' ')
+
+            if command == 'setAttr':
+                # cheap test first, most setAttr statements are mesh data
+                if '-type "string"' not in arguments:
+                    continue
+
+                tokens = tokenize(arguments)
+                if tokens and tokens[0] in TEXTURE_ATTRIBUTES and tokens[-1]:
+                    summary.texturePaths.add(tokens[-1])
+
+            elif command == 'createNode':
+                tokens = tokenize(arguments)
+                summary.nodes.append(MaNode(
+                    name=_flagValue(tokens, '-n', '-name'),
+                    nodeType=tokens[0],
+                    parent=_flagValue(tokens, '-p', '-parent'),
+                    shared='-s' in tokens or '-shared' in tokens,
+                ))
+                summary.nodeTypes[tokens[0]] += 1
+
+            elif command == 'connectAttr':
+                summary.connections += 1
+
+            elif command == 'file':
+                tokens = tokenize(arguments)
+                # file -rdi/-r ... "path"
+                if tokens and ('-r' in tokens or '-rdi' in tokens):
+                    summary.references.append(tokens[-1])
+
+            elif command == 'requires':
+                tokens = tokenize(arguments)
+                # requires [-nodeType ...] "plugin" "version"
+                strings = [token for index, token in enumerate(tokens)
+                           if not token.startswith('-') and (index == 0 or not tokens[index - 1].startswith('-'))]
+                if len(strings) >= 2:
+                    summary.plugins.add(strings[-2])
+
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Inspects Maya ASCII lookdev resources without Maya.')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--renderer', choices=sorted(RENDERER_NODE_TYPES))
+    arguments = parser.parse_args(argv)
+
+    failed = False
+    for path in arguments.paths:
+        summary = readMayaAscii(path)
+        print(path)
+        print('    nodes: {}, connections: {}'.format(len(summary.nodes), summary.connections))
+        print('    roots: {}'.format(', '.join(summary.rootNames)))
+        print('    plugins: {}'.format(', '.join(sorted(summary.plugins))))
+
+        for texturePath in sorted(summary.texturePaths):
+            print('    texture: {}'.format(texturePath))
+
+        for reference in summary.references:
+            print('    reference: {}'.format(reference))
+
+        for problem in summary.problems(arguments.renderer):
+            failed = True
+            print('    PROBLEM: {}'.format(problem))
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
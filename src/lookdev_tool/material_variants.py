@@ -0,0 +1,132 @@
+"""Material variants of an asset laid out side by side, every variant is rendered in a single pass.
+
+Each variant is an instance of the asset, or of a shader ball, with its own shader assignment. The instances share
+their shapes with the asset, the scene and the textures are loaded once and the variants all stand in the rig built
+by setThreePointsLights and setLightDome.
+"""
+import time
+import logging
+from typing import List, Optional, Sequence
+
+from maya import cmds
+
+from lookdev_tool import constants
+from lookdev_tool import lookdev_core
+from lookdev_tool import review_grid
+
+MATERIAL_VARIANTS_LOGGER = logging.getLogger(__name__)
+MATERIAL_VARIANTS_LOGGER.setLevel(10)
+
+MATERIAL_VARIANTS_GROUP = 'MaterialVariants_Grp'
+MATERIAL_VARIANTS_SOURCES_ATTR = 'variantSources'
+SHADER_BALL = 'ShaderBall_Geo'
+
+
+def _shadingEngine(material: str) -> str:
+    """Returns the shading engine of a material or a shading engine, one is created for a material without any"""
+    if cmds.nodeType(material) == 'shadingEngine':
+        return material
+
+    shadingEngines = cmds.listConnections(material, source=False, destination=True, type='shadingEngine') or []
+    if shadingEngines:
+        return shadingEngines[0]
+
+    shadingEngine = cmds.sets(renderable=True, noSurfaceShader=True, empty=True, name='{}SG'.format(material))
+    cmds.connectAttr('{}.outColor'.format(material), '{}.surfaceShader'.format(shadingEngine))
+    lookdev_core.registerNodes(shadingEngine)
+    return shadingEngine
+
+
+def _shaderBall() -> str:
+    """Creates the shader ball standing in for the asset, a subdivided sphere of the ground's unit size"""
+    shaderBall = cmds.polySphere(name=SHADER_BALL, radius=0.5, subdivisionsAxis=64, subdivisionsHeight=32,
+                                 constructionHistory=False)[0]
+    lookdev_core.registerNodes(shaderBall)
+    return cmds.ls(shaderBall, long=True)[0]
+
+
+def selectedVariants() -> List[str]:
+    """Returns the materials and shading engines selected, in the outliner or in the hypershade"""
+    selection = cmds.ls(selection=True) or []
+    return cmds.ls(selection, materials=True) + cmds.ls(selection, type='shadingEngine')
+
+
+def createVariantGrid(materials: Sequence[str], nodes: Optional[Sequence[str]] = None) -> List[str]:
+    """Instances the asset once per material on a grid standing on the ground, deletes the grid if already in scene
+
+    The asset is hidden while the grid exists, its instances share its shapes so only the shader assignments differ.
+    Assignments are made per instance, the asset keeps its own.
+
+    Parameters:
+        materials: The variants' materials or shading engines, one instance each.
+        nodes: The asset's top transforms, the selected ones or a shader ball if None.
+
+    Returns:
+        The variants' offset groups, in the materials' order.
+    """
+    if cmds.objExists(MATERIAL_VARIANTS_GROUP):
+        removeVariantGrid()
+        return []
+
+    if not materials:
+        raise RuntimeError('Select the materials to compare')
+
+    if nodes is None:
+        nodes = cmds.ls(selection=True, type='transform', long=True) or []
+    nodes = list(nodes) or [_shaderBall()]
+
+    startTime = time.perf_counter()
+    grid = cmds.createNode('transform', name=MATERIAL_VARIANTS_GROUP, skipSelect=True)
+    lookdev_core.registerNodes(grid)
+
+    # the hidden sources are kept on the grid to show them again with its removal
+    cmds.addAttr(grid, longName=MATERIAL_VARIANTS_SOURCES_ATTR, dataType='stringArray')
+    cmds.setAttr('{}.{}'.format(grid, MATERIAL_VARIANTS_SOURCES_ATTR), len(nodes), *nodes, type='stringArray')
+
+    # every instance has the asset's footprint, the asset stands on the ground centered on its cell
+    bounds = cmds.exactWorldBoundingBox(nodes)
+    footprint = (bounds[3] - bounds[0], bounds[5] - bounds[2])
+    spacing = constants.MATERIAL_VARIANTS_SPACING * max(footprint)
+    centers = review_grid.gridLayout([footprint] * len(materials), spacing)
+
+    offsets = []
+    for index, (material, (x, z)) in enumerate(zip(materials, centers), 1):
+        offset = cmds.createNode('transform', name='Variant{}_Offset_Grp'.format(index), parent=grid,
+                                 skipSelect=True)
+        shadingEngine = _shadingEngine(material)
+
+        for node in nodes:
+            instance = cmds.instance(node, name='{}_Variant{}'.format(node.split('|')[-1], index))[0]
+            instance = cmds.parent(instance, offset)[0]
+            # assigned on the instance's path, the shared shape keeps one assignment per instance
+            cmds.sets(instance, forceElement=shadingEngine)
+
+        cmds.setAttr('{}.translate'.format(offset), x - (bounds[0] + bounds[3]) / 2.0, -bounds[1],
+                     z - (bounds[2] + bounds[5]) / 2.0, type='double3')
+        offsets.append(offset)
+
+    cmds.hide(nodes)
+    cmds.select(clear=True)
+
+    elapsed = time.perf_counter() - startTime
+    MATERIAL_VARIANTS_LOGGER.debug('{} material variants laid out in {:.3f}s'.format(len(materials), elapsed),
+                                   extra={'operation': 'materialVariants', 'elapsed': elapsed})
+
+    return offsets
+
+
+def removeVariantGrid() -> None:
+    """Deletes the variants and shows the asset again"""
+    if not cmds.objExists(MATERIAL_VARIANTS_GROUP):
+        return
+
+    sources = cmds.getAttr('{}.{}'.format(MATERIAL_VARIANTS_GROUP, MATERIAL_VARIANTS_SOURCES_ATTR)) or []
+    cmds.delete(MATERIAL_VARIANTS_GROUP)
+
+    # the shader ball was only made for the grid
+    if cmds.objExists(SHADER_BALL):
+        cmds.delete(SHADER_BALL)
+
+    sources = [source for source in sources if cmds.objExists(source)]
+    if sources:
+        cmds.showHidden(sources)
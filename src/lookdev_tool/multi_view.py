@@ -0,0 +1,135 @@
+import os
+import time
+import shutil
+import logging
+import tempfile
+import threading
+import subprocess
+from typing import Iterable, List, Optional, Tuple
+
+from maya import cmds
+
+from lookdev_tool import constants
+from lookdev_tool import lookdev_core
+from lookdev_tool import frame_buffer
+from lookdev_tool.Utils.maya_executables import mayaExecutable
+
+MULTI_VIEW_LOGGER = logging.getLogger(__name__)
+MULTI_VIEW_LOGGER.setLevel(10)
+
+MULTI_VIEW_GROUP = 'MultiView_Grp'
+
+
+def createMultiViewRig(renderEngine, views: Iterable[Tuple[str, float, float]] = constants.MULTI_VIEWS) -> List[str]:
+    """Creates one camera per review angle around the asset, deletes the rig if it is already in scene
+
+    Each camera sits at the main camera's position in a pivot group rotated to its angle, and gets the main camera's
+    focal length if there is one.
+
+    Parameters:
+        renderEngine: The render engine's core module, sets the renderer's camera attributes.
+        views: (view name, rotateX, rotateY) of each camera's pivot.
+
+    Returns:
+        The created camera shapes.
+    """
+    if cmds.objExists(MULTI_VIEW_GROUP):
+        cmds.delete(MULTI_VIEW_GROUP)
+        return []
+
+    group = cmds.createNode('transform', name=MULTI_VIEW_GROUP, skipSelect=True)
+    lookdev_core.registerNodes(group)
+
+    cameras = []
+    for viewName, rotateX, rotateY in views:
+        pivot = cmds.createNode('transform', name='{}_View_Pivot'.format(viewName), parent=group, skipSelect=True)
+        camera = cmds.createNode('camera', name='{}_View_Cam'.format(viewName), skipSelect=True)
+        cameraTransform = cmds.rename(cmds.listRelatives(camera, parent=True)[0], '{}_View_Cam_Transform'.format(viewName))
+
+        cmds.parent(cameraTransform, pivot)
+        cmds.xform(cameraTransform, translation=constants.CAMERA_TRANSLATION)
+        cmds.setAttr('{}.rotate'.format(pivot), rotateX, rotateY, 0, type='double3')
+
+        if cmds.objExists('Main_Cam'):
+            cmds.setAttr('{}.focalLength'.format(camera), cmds.getAttr('Main_Cam.focalLength'))
+
+        renderEngine.setupCamera(camera)
+        cameras.append(camera)
+
+    cmds.select(clear=True)
+    return cameras
+
+
+def multiViewCameras() -> List[str]:
+    """Returns the camera shapes of the multi-view rig"""
+    if not cmds.objExists(MULTI_VIEW_GROUP):
+        return []
+
+    return cmds.listRelatives(MULTI_VIEW_GROUP, allDescendents=True, type='camera') or []
+
+
+def renderMultiView(renderer: str, outputDir: str, frame: int = 1,
+                    frameBufferPath: Optional[str] = None) -> subprocess.Popen:
+    """Renders every view of the multi-view rig in a single batch render
+
+    The scene is exported once with only the multi-view cameras renderable, Maya's renderer then renders all of them
+    in the same session, so the scene and the textures are loaded once instead of once per view. The user's scene
+    and its cameras' renderable states are left untouched, the exported scene is deleted once rendered.
+
+    Parameters:
+        renderer: The renderer's name for Render -r, arnold or vray.
+        outputDir: The images' folder, one sub folder per camera.
+        frame: The rendered frame.
+        frameBufferPath: The render viewer's frame buffer, each view is published in it once rendered.
+
+    Returns:
+        The running Render process.
+    """
+    cameras = multiViewCameras()
+    if not cameras:
+        raise RuntimeError('Multi-view rig not in scene')
+
+    renderableStates = {camera: cmds.getAttr('{}.renderable'.format(camera)) for camera in cmds.ls(type='camera')}
+
+    folder = tempfile.mkdtemp(prefix='lookdev_multiview_')
+    scenePath = os.path.join(folder, 'multiView.ma')
+
+    # the renderable states are only changed for the export, they are kept out of the undo queue
+    undoState = cmds.undoInfo(query=True, stateWithoutFlush=True)
+    cmds.undoInfo(stateWithoutFlush=False)
+    try:
+        for camera in renderableStates:
+            cmds.setAttr('{}.renderable'.format(camera), camera in cameras)
+
+        cmds.file(scenePath, exportAll=True, preserveReferences=True, type='mayaAscii', force=True)
+    except Exception:
+        shutil.rmtree(folder, ignore_errors=True)
+        raise
+    finally:
+        for camera, state in renderableStates.items():
+            cmds.setAttr('{}.renderable'.format(camera), state)
+        cmds.undoInfo(stateWithoutFlush=undoState)
+
+    command = [mayaExecutable('Render'), '-r', renderer, '-s', str(frame), '-e', str(frame),
+               '-rd', outputDir, '-im', '<Camera>/<Scene>', scenePath]
+    if frameBufferPath:
+        command[-1:-1] = ['-postFrame', frame_buffer.postFrameCommand(frameBufferPath, outputDir)]
+    MULTI_VIEW_LOGGER.debug('rendering {} views: {}'.format(len(cameras), ' '.join(command)))
+
+    startTime = time.perf_counter()
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        shutil.rmtree(folder, ignore_errors=True)
+        raise
+
+    def waitRender():
+        process.wait()
+        # the exported scene is only read by the render
+        shutil.rmtree(folder, ignore_errors=True)
+        elapsed = time.perf_counter() - startTime
+        MULTI_VIEW_LOGGER.debug('{} views rendered in {:.1f}s, return code {}'.format(
+            len(cameras), elapsed, process.returncode), extra={'operation': 'multiViewRender', 'elapsed': elapsed})
+
+    threading.Thread(target=waitRender, name='MultiViewRender', daemon=True).start()
+    return process
@@ -0,0 +1,226 @@
+"""Persistent history of the tool's timed operations, runs without Maya.
+
+The timed log points of the tool pass the operation's name and duration as extra fields:
+    LOGGER.debug('clearScene: {:.3f}s'.format(elapsed), extra={'operation': 'clearScene', 'elapsed': elapsed})
+PerformanceHandler, installed on the package's logger, appends them to a SQLite database with the asset, the scene
+size, the renderer and the tool's version.
+
+Usage:
+    python -m lookdev_tool.perf_history [--operation NAME] [--by asset|renderer|version] [--days N]
+"""
+import os
+import sys
+import json
+import time
+import queue
+import sqlite3
+import logging
+import argparse
+import threading
+import statistics
+import collections
+from typing import Callable, Dict, List, Optional
+
+import lookdev_tool
+
+PERF_HISTORY_PATH = os.path.join(os.path.expanduser('~'), '.lookdev_tool', 'perf_history.sqlite')
+
+# a group is reported as a regression when its recent median is this much slower than the previous one
+REGRESSION_THRESHOLD = 0.2
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    operation TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    asset TEXT,
+    sceneSize INTEGER,
+    renderer TEXT,
+    version TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS records_operation_time ON records (operation, time);
+'''
+
+_COLUMNS = ('time', 'operation', 'seconds', 'asset', 'sceneSize', 'renderer', 'version', 'details')
+
+ReportLine = collections.namedtuple('ReportLine', ['operation', 'group', 'count', 'previous', 'recent', 'regression'])
+
+
+class PerformanceHistory(object):
+    """SQLite store of the timed operations.
+
+    Records are written by a single writer thread, so recording never waits for the disk.
+    """
+    def __init__(self, path: str = PERF_HISTORY_PATH) -> None:
+        self.path = path
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10.0)
+
+    def record(self, operation: str, seconds: float, asset: Optional[str] = None, sceneSize: Optional[int] = None,
+               renderer: Optional[str] = None, details: Optional[str] = None) -> None:
+        """Queues a record, written in the background"""
+        with self._lock:
+            self._queue.put((time.time(), operation, seconds, asset, sceneSize, renderer, lookdev_tool.__version__,
+                             details))
+
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write, name='PerformanceHistory', daemon=True)
+                self._writer.start()
+
+    def _write(self) -> None:
+        connection = self._connect()
+        try:
+            while True:
+                try:
+                    rows = [self._queue.get(timeout=1.0)]
+                except queue.Empty:
+                    # idle, a new writer is started by the next record
+                    with self._lock:
+                        if self._queue.empty():
+                            self._writer = None
+                            return
+                    continue
+
+                # whatever has been queued meanwhile goes in the same transaction
+                while not self._queue.empty():
+                    rows.append(self._queue.get_nowait())
+
+                try:
+                    with connection:
+                        connection.executemany('INSERT INTO records ({}) VALUES ({})'.format(
+                            ', '.join(_COLUMNS), ', '.join('?' * len(_COLUMNS))), rows)
+                except sqlite3.Error as error:
+                    # a lost record must never break the tool
+                    sys.stderr.write('perf_history: {} record(s) lost: {}\n'.format(len(rows), error))
+                finally:
+                    for _ in rows:
+                        self._queue.task_done()
+        finally:
+            connection.close()
+
+    def flush(self) -> None:
+        """Waits for the queued records to be written"""
+        self._queue.join()
+
+    def records(self, operation: Optional[str] = None, since: float = 0.0) -> List[Dict[str, object]]:
+        """Returns the records as dicts, oldest first"""
+        query = 'SELECT {} FROM records WHERE time >= ?'.format(', '.join(_COLUMNS))
+        parameters = [since]
+        if operation:
+            query += ' AND operation = ?'
+            parameters.append(operation)
+
+        with self._connect() as connection:
+            rows = connection.execute(query + ' ORDER BY time', parameters).fetchall()
+
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def report(self, operation: Optional[str] = None, groupBy: Optional[str] = None,
+               days: float = 30.0) -> List[ReportLine]:
+        """Compares the recent half of each group's records with the previous half
+
+        Parameters:
+            operation: Only reports this operation.
+            groupBy: asset, renderer or version, the records of each operation are split by this column.
+            days: The period covered.
+        """
+        groups = collections.defaultdict(list)
+        for record in self.records(operation, time.time() - days * 86400.0):
+            groups[(record['operation'], record[groupBy] if groupBy else None)].append(record['seconds'])
+
+        lines = []
+        for (operationName, group), seconds in sorted(groups.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+            half = len(seconds) // 2
+            previous = statistics.median(seconds[:half]) if half else None
+            recent = statistics.median(seconds[half:])
+            regression = previous is not None and recent > previous * (1.0 + REGRESSION_THRESHOLD)
+            lines.append(ReportLine(operationName, group, len(seconds), previous, recent, regression))
+
+        return lines
+
+
+class PerformanceHandler(logging.Handler):
+    """Records the log records carrying operation and elapsed extra fields
+
+    The scene context (asset, scene size, renderer) is only queried on the main thread, records logged by workers get
+    the last context known.
+    """
+    def __init__(self, history: PerformanceHistory, contextProvider: Optional[Callable[[], dict]] = None) -> None:
+        super(PerformanceHandler, self).__init__(level=logging.DEBUG)
+        self.history = history
+        self.contextProvider = contextProvider
+        self._context = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        operation = getattr(record, 'operation', None)
+        elapsed = getattr(record, 'elapsed', None)
+        if operation is None or elapsed is None:
+            return
+
+        try:
+            if self.contextProvider and threading.current_thread() is threading.main_thread():
+                self._context = self.contextProvider()
+
+            self.history.record(operation, elapsed, details=record.getMessage(), **self._context)
+        except Exception:
+            self.handleError(record)
+
+
+_HANDLER = None
+
+
+def install(contextProvider: Optional[Callable[[], dict]] = None,
+            path: str = PERF_HISTORY_PATH) -> PerformanceHandler:
+    """Installs the handler on the package's logger, once
+
+    Parameters:
+        contextProvider: Returns {'asset', 'sceneSize', 'renderer'} of the current scene.
+        path: The database's path.
+    """
+    global _HANDLER
+
+    if _HANDLER is None:
+        _HANDLER = PerformanceHandler(PerformanceHistory(path))
+        logging.getLogger('lookdev_tool').addHandler(_HANDLER)
+
+    _HANDLER.contextProvider = contextProvider
+    return _HANDLER
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Shows the trends of the lookdev tool\'s timed operations.')
+    parser.add_argument('--operation')
+    parser.add_argument('--by', dest='groupBy', choices=('asset', 'renderer', 'version'))
+    parser.add_argument('--days', type=float, default=30.0)
+    parser.add_argument('--json', dest='asJson', action='store_true')
+    parser.add_argument('--database', default=PERF_HISTORY_PATH)
+    arguments = parser.parse_args(argv)
+
+    lines = PerformanceHistory(arguments.database).report(arguments.operation, arguments.groupBy, arguments.days)
+
+    if arguments.asJson:
+        print(json.dumps([line._asdict() for line in lines], indent=4))
+    else:
+        for line in lines:
+            previous = '{:.3f}s'.format(line.previous) if line.previous is not None else '-'
+            group = ' [{}]'.format(line.group) if arguments.groupBy else ''
+            print('{}{}: {} runs, median {} -> {:.3f}s{}'.format(
+                line.operation, group, line.count, previous, line.recent, '  REGRESSION' if line.regression else ''))
+
+    return 1 if any(line.regression for line in lines) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
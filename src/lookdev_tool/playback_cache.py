@@ -0,0 +1,105 @@
+import time
+import logging
+from typing import Dict, Optional, Tuple
+
+from maya import cmds
+
+PLAYBACK_CACHE_LOGGER = logging.getLogger(__name__)
+PLAYBACK_CACHE_LOGGER.setLevel(10)
+
+# groups keyed by the turntable, their rotateY is animated, everything else is part of the signature
+TURNTABLE_GROUPS = ('Cam_Main_Grp', 'Lights_Grp')
+GROUP_STATIC_ATTRIBUTES = ('translate', 'rotateX', 'rotateZ', 'scale')
+
+
+def rigSignature(numberOfFrames: int) -> Tuple:
+    """Returns what the turntable's evaluation depends on: its phases and the static transforms of the rig
+
+    Parameters:
+        numberOfFrames: The turntable's length.
+    """
+    signature = [numberOfFrames]
+    for group in TURNTABLE_GROUPS:
+        if not cmds.objExists(group):
+            signature.append(None)
+            continue
+
+        signature.extend(str(cmds.getAttr('{}.{}'.format(group, attribute))) for attribute in GROUP_STATIC_ATTRIBUTES)
+        for child in cmds.listRelatives(group, allDescendents=True, type='transform', fullPath=True) or []:
+            signature.append((child, tuple(round(value, 6) for value in cmds.xform(child, query=True, matrix=True))))
+
+    return tuple(signature)
+
+
+class TurntableCache(object):
+    """Keeps the turntable's cached playback warm.
+
+    Maya's cached playback is flushed as soon as the animation changes, so the turntable is only keyed again when its
+    phases or the rig's transforms changed. The cache is filled in the background on idle, the evaluation settings
+    changed to enable it are restored by restore().
+    """
+    def __init__(self) -> None:
+        self.signature: Optional[Tuple] = None
+        self._previousSettings: Dict[str, object] = {}
+
+    def isCurrent(self, numberOfFrames: int) -> bool:
+        """True if the keyed turntable and its cache are still valid for numberOfFrames"""
+        if self.signature is None or not all(cmds.objExists(group) for group in TURNTABLE_GROUPS):
+            return False
+
+        if not all(cmds.keyframe(group, attribute='rotateY', query=True, keyframeCount=True)
+                   for group in TURNTABLE_GROUPS):
+            return False
+
+        return rigSignature(numberOfFrames) == self.signature
+
+    def warm(self, numberOfFrames: int) -> None:
+        """Enables the cached playback on the turntable's range and lets Maya fill it in the background
+
+        Parameters:
+            numberOfFrames: The turntable's length.
+        """
+        startTime = time.perf_counter()
+
+        if not self._previousSettings:
+            self._previousSettings = {
+                'minTime': cmds.playbackOptions(query=True, minTime=True),
+                'maxTime': cmds.playbackOptions(query=True, maxTime=True),
+                'evaluationMode': cmds.evaluationManager(query=True, mode=True)[0],
+                'cacheEnabled': cmds.evaluator(name='cache', query=True, enable=True),
+                'cacheFillMode': cmds.cacheEvaluator(query=True, cacheFillMode=True),
+            }
+
+        cmds.playbackOptions(minTime=1, maxTime=numberOfFrames)
+
+        # cached playback needs the parallel evaluation
+        if cmds.evaluationManager(query=True, mode=True)[0] == 'off':
+            cmds.evaluationManager(mode='parallel')
+
+        cmds.evaluator(name='cache', enable=True)
+        cmds.cacheEvaluator(cacheFillMode='asyncOnly')
+
+        # the keys have been rebuilt, cached frames of the previous turntable are useless
+        cmds.cacheEvaluator(flushCache='destroy')
+
+        self.signature = rigSignature(numberOfFrames)
+        PLAYBACK_CACHE_LOGGER.debug('turntable cache set up for {} frames in {:.3f}s'.format(
+            numberOfFrames, time.perf_counter() - startTime))
+
+    def invalidate(self) -> None:
+        """Forgets the turntable, the next createTurn keys it again"""
+        self.signature = None
+
+    def restore(self) -> None:
+        """Restores the playback range and the evaluation settings changed by warm()"""
+        self.invalidate()
+        if not self._previousSettings:
+            return
+
+        settings = self._previousSettings
+        cmds.playbackOptions(minTime=settings['minTime'], maxTime=settings['maxTime'])
+        cmds.cacheEvaluator(cacheFillMode=settings['cacheFillMode'])
+        cmds.evaluator(name='cache', enable=settings['cacheEnabled'])
+        cmds.evaluationManager(mode=settings['evaluationMode'])
+
+        self._previousSettings = {}
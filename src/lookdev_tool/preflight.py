@@ -0,0 +1,215 @@
+"""Checks every external file the lookdev tool reads, runs without Maya.
+
+Usage:
+    python -m lookdev_tool.preflight [--hdri-dir DIR] [--no-cache]
+"""
+import os
+import sys
+import json
+import ntpath
+import time
+import argparse
+import threading
+import collections
+from concurrent import futures
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from lookdev_tool import ma_reader
+from lookdev_tool.Utils.image_utils import isHdri
+
+RESOURCES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+PREFLIGHT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.lookdev_tool', 'preflight.json')
+
+PreflightProblem = collections.namedtuple('PreflightProblem', ['path', 'message', 'usedBy'])
+
+
+class PreflightReport(object):
+    def __init__(self) -> None:
+        self.problems: List[PreflightProblem] = []
+        self.checked = 0
+        self.fromCache = 0
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    def summary(self) -> str:
+        lines = ['{} files checked in {:.2f}s ({} from cache), {} problem(s)'.format(
+            self.checked, self.elapsed, self.fromCache, len(self.problems))]
+
+        for problem in self.problems:
+            usedBy = ' (used by {})'.format(problem.usedBy) if problem.usedBy else ''
+            lines.append('    {}: {}{}'.format(problem.path, problem.message, usedBy))
+
+        return '\n'.join(lines)
+
+
+def collectResources(hdriPath: Optional[str] = None) -> List[str]:
+    """Returns the files the tool reads directly: grounds, palettes, color checker, HDRIs and preferences
+
+    Parameters:
+        hdriPath: The HDRI folder, the bundled one if None.
+    """
+    paths = []
+    for folder, extensions in (('grounds', ('ma',)), ('camera', ('ma', 'tx')), ('preferences', ('json',))):
+        folderPath = os.path.join(RESOURCES_PATH, folder)
+        paths.extend(os.path.join(folderPath, name) for name in sorted(os.listdir(folderPath))
+                     if name.split('.')[-1] in extensions)
+
+    hdriPath = hdriPath or os.path.join(RESOURCES_PATH, 'hdri')
+    if os.path.isdir(hdriPath):
+        paths.extend(os.path.join(hdriPath, name) for name in sorted(os.listdir(hdriPath))
+                     if isHdri(name))
+
+    return paths
+
+
+def _renderer(path: str) -> Optional[str]:
+    """Returns the renderer a resource is made for from its name, ground_1_arnold.ma is made for arnold"""
+    baseName = os.path.splitext(os.path.basename(path))[0]
+    for renderer in ma_reader.RENDERER_NODE_TYPES:
+        if baseName.endswith('_{}'.format(renderer)):
+            return renderer
+
+    return None
+
+
+class Preflight(object):
+    """Checks existence, size and readability of files with a thread pool.
+
+    The results of existing files are cached by size and mtime, .ma files also cache the textures and references
+    they point to, so a second run only stats the files.
+    """
+    def __init__(self, cachePath: Optional[str] = PREFLIGHT_CACHE_PATH, workers: int = 8) -> None:
+        self.cachePath = cachePath
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._cache = self._readCache()
+
+    def _readCache(self) -> Dict[str, dict]:
+        if not self.cachePath:
+            return {}
+
+        try:
+            with open(self.cachePath, 'r') as rFile:
+                return json.load(rFile)
+        except (IOError, ValueError):
+            return {}
+
+    def _writeCache(self) -> None:
+        if not self.cachePath:
+            return
+
+        os.makedirs(os.path.dirname(self.cachePath), exist_ok=True)
+        tmpPath = self.cachePath + '.tmp'
+        with open(tmpPath, 'w') as wFile:
+            json.dump(self._cache, wFile)
+        os.replace(tmpPath, self.cachePath)
+
+    def _checkFile(self, path: str) -> Tuple[List[str], List[str], bool]:
+        """Returns the file's problems, the files it depends on and whether the result came from the cache"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return ['missing'], [], False
+
+        with self._lock:
+            entry = self._cache.get(path)
+
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            return entry['problems'], entry['dependencies'], True
+
+        problems = []
+        dependencies = []
+        if stat.st_size == 0:
+            problems.append('empty file')
+
+        try:
+            with open(path, 'rb') as rFile:
+                rFile.read(1)
+        except OSError as error:
+            problems.append('not readable: {}'.format(error.strerror))
+
+        if not problems and path.endswith('.ma'):
+            summary = ma_reader.readMayaAscii(path)
+            problems.extend(summary.problems(_renderer(path)))
+
+            folder = os.path.dirname(path)
+            for dependency in sorted(summary.texturePaths) + summary.references:
+                # paths saved on Windows (F:/...) are absolute too
+                isAbsolute = os.path.isabs(dependency) or ntpath.isabs(dependency)
+                dependencies.append(dependency if isAbsolute else os.path.join(folder, dependency))
+
+        with self._lock:
+            self._cache[path] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'problems': problems,
+                                 'dependencies': dependencies}
+
+        return problems, dependencies, False
+
+    def run(self, paths: Iterable[str]) -> PreflightReport:
+        """Checks paths and every file they depend on
+
+        Parameters:
+            paths: The files to check.
+        """
+        startTime = time.perf_counter()
+        report = PreflightReport()
+        usedBy = {}
+        seen = set()
+
+        with futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {}
+            for path in paths:
+                if path not in seen:
+                    seen.add(path)
+                    pending[executor.submit(self._checkFile, path)] = path
+
+            while pending:
+                done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    problems, dependencies, fromCache = future.result()
+
+                    report.checked += 1
+                    report.fromCache += fromCache
+                    for message in problems:
+                        report.problems.append(PreflightProblem(path, message, usedBy.get(path)))
+
+                    # textures and references found in .ma files are checked as well
+                    for dependency in dependencies:
+                        if dependency not in seen:
+                            seen.add(dependency)
+                            usedBy[dependency] = os.path.basename(path)
+                            pending[executor.submit(self._checkFile, dependency)] = dependency
+
+        self._writeCache()
+        report.problems.sort(key=lambda problem: (problem.path, problem.message))
+        report.elapsed = time.perf_counter() - startTime
+        return report
+
+
+def runPreflight(hdriPath: Optional[str] = None, useCache: bool = True) -> PreflightReport:
+    """Checks every file the tool reads
+
+    Parameters:
+        hdriPath: The HDRI folder, the bundled one if None.
+        useCache: Reuses the results of files which did not change.
+    """
+    preflight = Preflight(cachePath=PREFLIGHT_CACHE_PATH if useCache else None)
+    return preflight.run(collectResources(hdriPath))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Checks the files read by the lookdev tool.')
+    parser.add_argument('--hdri-dir', dest='hdriPath')
+    parser.add_argument('--no-cache', dest='useCache', action='store_false')
+    arguments = parser.parse_args(argv)
+
+    report = runPreflight(arguments.hdriPath, arguments.useCache)
+    print(report.summary())
+    return 0 if report.ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""Look regression suite: canonical lookdev scenes rendered at low resolution and compared with golden renders.
+
+Each case is built by the renderer's own core functions (camera, three points lights, dome, ground and a shader ball)
+in a mayapy process and rendered with Maya's command line renderer, so a change to arnold_core or vray_core that
+alters the look shows up as a failed case. The cases run in parallel and the render time of each one is checked
+against its golden's.
+
+The stub backend draws the cases with NumPy, it runs the whole harness on a machine without Maya.
+
+Usage:
+    python regression_suite.py run|update --golden DIR --hdri NAME [--backend stub|maya] [--workers N] [--case NAME]
+                                          [--json]
+
+The golden renders are shared: DIR is a folder under version control or on the studio share, never a per-user one.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import tempfile
+import subprocess
+import collections
+from concurrent import futures
+from typing import List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from lookdev_tool import image_compare
+from lookdev_tool import perf_history
+from lookdev_tool.Utils.maya_executables import mayaExecutable
+
+REGRESSION_LOGGER = logging.getLogger(__name__)
+REGRESSION_LOGGER.setLevel(10)
+
+PACKAGE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+RegressionCase = collections.namedtuple('RegressionCase', ['name', 'renderer', 'hdri', 'ground', 'lights',
+                                                           'domeRotation', 'width', 'height'])
+Tolerance = collections.namedtuple('Tolerance', ['minPsnr', 'minSsim', 'maxDifference'])
+CaseResult = collections.namedtuple('CaseResult', ['name', 'passed', 'psnr', 'ssim', 'maxDifference', 'seconds',
+                                                   'goldenSeconds', 'slower', 'error'])
+
+# a few canonical lookdev setups per renderer, rendered at thumbnail resolution: (name, ground, lights, domeRotation)
+CANONICAL_SETUPS = (
+    ('studio', 0, True, 0.0),
+    ('domeOnly', 2, False, 90.0),
+    ('bathtub', 1, True, 200.0),
+)
+
+
+def canonicalCases(hdri: str) -> List[RegressionCase]:
+    """Returns the canonical cases of both renderers lit by an HDRI of the tool's HDRI folder
+
+    The repository ships no HDRI, the studio's reference HDRI is given by the caller and must be the same for every
+    run compared with the same goldens.
+    """
+    return [RegressionCase('{}_{}'.format(renderer, name), renderer, hdri, ground, lights, domeRotation, 160, 90)
+            for renderer in ('arnold', 'vray')
+            for name, ground, lights, domeRotation in CANONICAL_SETUPS]
+
+
+DEFAULT_TOLERANCE = Tolerance(minPsnr=40.0, minSsim=0.98, maxDifference=0.25)
+
+# slowdowns under this many seconds are the jitter of short renders, never reported
+MIN_SLOWDOWN = 0.5
+
+
+def _requireNumpy() -> None:
+    if np is None:
+        raise RuntimeError('NumPy is required by the regression suite')
+
+
+class StubBackend(object):
+    """Draws a case with NumPy: sky, ground band and a lambert ball, the look depends on every case field
+
+    Parameters of the stub stand for a change of the cores: gain scales the whole frame, noise adds per-render noise.
+    """
+    name = 'stub'
+
+    def __init__(self, gain: float = 1.0, noise: float = 0.002, delay: float = 0.0) -> None:
+        self.gain = gain
+        self.noise = noise
+        self.delay = delay
+
+    def render(self, case: RegressionCase):
+        _requireNumpy()
+        time.sleep(self.delay)
+
+        seed = int(hashlib.sha1('{}|{}'.format(case.renderer, case.hdri).encode('utf-8')).hexdigest()[:8], 16)
+        sky = np.random.default_rng(seed).random(3) * 0.6 + 0.2
+        height, width = case.height, case.width
+        rows, columns = np.mgrid[0:height, 0:width] / np.array((height, width), dtype=np.float64)[:, None, None]
+
+        image = np.empty((height, width, 4), dtype=np.float32)
+        image[..., :3] = sky * (1.2 - rows[..., None])
+        groundRows = rows > 0.65
+        image[groundRows, :3] = (0.18, 0.35, 0.5)[case.ground]
+        image[..., 3] = 1.0
+
+        # the ball, lit by the dome from its rotation and by the key light
+        x, y = (columns - 0.5) * width / height / 0.3, (rows - 0.5) / 0.3
+        inside = x * x + y * y < 1.0
+        normals = np.stack((x[inside], -y[inside], np.sqrt(1.0 - x[inside] ** 2 - y[inside] ** 2)), axis=-1)
+        angle = np.radians(case.domeRotation)
+        lighting = np.clip(normals @ np.array((np.sin(angle), 0.5, np.cos(angle))), 0.0, None) * 0.6 + 0.1
+        if case.lights:
+            lighting += np.clip(normals @ np.array((-0.6, 0.6, 0.5)), 0.0, None) * 0.5
+        image[inside, :3] = lighting[:, None] * sky * 0.8
+
+        image[..., :3] *= self.gain
+        if self.noise:
+            image[..., :3] += np.random.default_rng().normal(0.0, self.noise, (height, width, 3))
+
+        return image
+
+
+class MayaBackend(object):
+    """Builds each case in a mayapy process and renders it with the case's renderer, needs Maya.
+
+    The runner itself must run in mayapy, the renders are read with MImage.
+    """
+    name = 'maya'
+
+    def render(self, case: RegressionCase):
+        folder = tempfile.mkdtemp(prefix='lookdev_regression_')
+        try:
+            scenePath = os.path.join(folder, '{}.ma'.format(case.name))
+            script = ('import sys; sys.path.insert(0, {!r}); from lookdev_tool import regression_suite; '
+                      'regression_suite.buildCase(regression_suite.RegressionCase(**{!r}), {!r})').format(
+                os.path.dirname(PACKAGE_PATH), dict(case._asdict()), scenePath)
+            command = [mayaExecutable('mayapy'), '-c', script]
+            process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+            if process.returncode != 0:
+                raise RuntimeError('{} scene build failed:\n{}'.format(case.name, process.stdout))
+
+            command = [mayaExecutable('Render'), '-r', case.renderer, '-x', str(case.width), '-y', str(case.height),
+                       '-cam', 'Main_Cam', '-of', 'exr', '-rd', folder, '-im', case.name, scenePath]
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+            for root, _, names in os.walk(folder):
+                for name in names:
+                    if name.startswith(case.name) and name.endswith('.exr'):
+                        return image_compare.readFrame(os.path.join(root, name))
+
+            raise RuntimeError('{} render failed: {}'.format(case.name, ' '.join(command)))
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+def buildCase(case: RegressionCase, scenePath: str) -> None:
+    """Builds a case's scene with the renderer's core functions and saves it, runs inside mayapy"""
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    from maya import cmds
+    from lookdev_tool import lookdev_core
+    from lookdev_tool import rig_template
+
+    # a dome on a missing texture renders without error, its golden would be a broken scene
+    hdriPath = lookdev_core.hdriPath(case.hdri)
+    if not os.path.isfile(hdriPath):
+        raise RuntimeError('{}: HDRI {} not found'.format(case.name, hdriPath))
+
+    cmds.loadPlugin(rig_template.RENDERER_PLUGINS[case.renderer], quiet=True)
+    core = rig_template.coreModule(case.renderer)
+    resources = os.path.join(PACKAGE_PATH, 'resources')
+    colorCheckerPath = os.path.join(resources, 'camera', 'ColorPalette_{}.ma'.format(case.renderer))
+
+    core.createCam(colorCheckerPath)
+    if case.lights:
+        core.setThreePointsLights()
+
+    lightDome = core.LightDome()
+    lightDome.setLightDome(case.hdri)
+    lightDome.rotateDome(case.domeRotation)
+
+    groundPaths = [os.path.join(resources, 'grounds', 'ground_{}_{}.ma'.format(index, case.renderer))
+                   for index in (1, 2, 3)]
+    core.GroundClass(*groundPaths, colorCheckerPath).setGround(case.ground)
+
+    # the canonical asset: a shader ball with the default shader
+    ball = cmds.polySphere(name='regressionBall', radius=2.0, subdivisionsX=64, subdivisionsY=64)[0]
+    cmds.setAttr('{}.translateY'.format(ball), 2.0)
+
+    cmds.file(rename=scenePath)
+    cmds.file(save=True, type='mayaAscii', force=True)
+
+    maya.standalone.uninitialize()
+
+
+def goldenPaths(goldenDir: str, backend, case: RegressionCase):
+    """Returns the golden render (.npy) and its metadata (.json) of a case"""
+    folder = os.path.join(goldenDir, backend.name)
+    return os.path.join(folder, '{}.npy'.format(case.name)), os.path.join(folder, '{}.json'.format(case.name))
+
+
+def _timedRender(backend, case: RegressionCase):
+    startTime = time.perf_counter()
+    image = backend.render(case)
+    elapsed = time.perf_counter() - startTime
+    REGRESSION_LOGGER.debug('{} rendered in {:.3f}s'.format(case.name, elapsed),
+                            extra={'operation': 'regressionRender', 'elapsed': elapsed})
+    return image, elapsed
+
+
+def updateGolden(backend, case: RegressionCase, goldenDir: str) -> float:
+    """Renders a case and stores it as its golden, returns the render time"""
+    image, elapsed = _timedRender(backend, case)
+    imagePath, metadataPath = goldenPaths(goldenDir, backend, case)
+    os.makedirs(os.path.dirname(imagePath), exist_ok=True)
+
+    np.save(imagePath, image.astype(np.float32))
+    with open(metadataPath, 'w') as wFile:
+        json.dump({'seconds': elapsed, 'created': time.time(), 'case': case._asdict()}, wFile, indent=4)
+
+    return elapsed
+
+
+def runCase(backend, case: RegressionCase, goldenDir: str,
+            tolerance: Tolerance = DEFAULT_TOLERANCE) -> CaseResult:
+    """Renders a case and compares it with its golden
+
+    The case fails if its render differs beyond tolerance. A render slower than its golden's by more than
+    perf_history.REGRESSION_THRESHOLD is reported, it doesn't fail the case.
+    """
+    imagePath, metadataPath = goldenPaths(goldenDir, backend, case)
+    if not os.path.isfile(imagePath):
+        return CaseResult(case.name, False, None, None, None, None, None, False, 'no golden render')
+
+    try:
+        image, elapsed = _timedRender(backend, case)
+        metrics, _ = image_compare.compareFrames(np.load(imagePath), image, name=case.name)
+    except Exception as error:
+        return CaseResult(case.name, False, None, None, None, None, None, False, str(error))
+
+    with open(metadataPath, 'r') as rFile:
+        goldenSeconds = json.load(rFile)['seconds']
+
+    passed = (metrics.psnr >= tolerance.minPsnr and metrics.ssim >= tolerance.minSsim and
+              metrics.maxDifference <= tolerance.maxDifference)
+    slower = (elapsed > goldenSeconds * (1.0 + perf_history.REGRESSION_THRESHOLD) and
+              elapsed - goldenSeconds > MIN_SLOWDOWN)
+
+    return CaseResult(case.name, passed, metrics.psnr, metrics.ssim, metrics.maxDifference, elapsed, goldenSeconds,
+                      slower, None)
+
+
+def runSuite(backend, goldenDir: str, cases: Sequence[RegressionCase], tolerance: Tolerance = DEFAULT_TOLERANCE,
+             workers: int = 4, update: bool = False) -> List[CaseResult]:
+    """Runs the cases in parallel
+
+    Parameters:
+        backend: StubBackend or MayaBackend.
+        goldenDir: The golden renders' folder, one sub folder per backend.
+        cases: The cases to run, see canonicalCases.
+        tolerance: The differences accepted.
+        workers: The number of cases run at the same time.
+        update: Renders the goldens instead of comparing with them.
+
+    Returns:
+        The results in the cases' order, empty when updating.
+    """
+    _requireNumpy()
+
+    with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        if update:
+            for case, elapsed in zip(cases, executor.map(lambda case: updateGolden(backend, case, goldenDir), cases)):
+                REGRESSION_LOGGER.info('{} golden updated, {:.3f}s'.format(case.name, elapsed))
+            return []
+
+        return list(executor.map(lambda case: runCase(backend, case, goldenDir, tolerance), cases))
+
+
+def formatResults(results: Sequence[CaseResult]) -> str:
+    lines = []
+    for result in results:
+        if result.error:
+            lines.append('{}: FAILED, {}'.format(result.name, result.error))
+            continue
+
+        lines.append('{}: {}, PSNR {:.2f} dB, SSIM {:.4f}, max difference {:.4f}, {:.3f}s (golden {:.3f}s){}'.format(
+            result.name, 'ok' if result.passed else 'FAILED', result.psnr, result.ssim, result.maxDifference,
+            result.seconds, result.goldenSeconds, ' SLOWER' if result.slower else ''))
+
+    failed = sum(not result.passed for result in results)
+    lines.append('{} cases, {} failed'.format(len(results), failed))
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Renders the lookdev regression cases and compares them with their '
+                                                 'golden renders.')
+    parser.add_argument('command', choices=('run', 'update'))
+    parser.add_argument('--backend', choices=('stub', 'maya'), default='stub')
+    parser.add_argument('--golden', required=True, help='The shared golden renders\' folder')
+    parser.add_argument('--hdri', required=True, help='HDRI of the cases, in the tool\'s HDRI folder')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--case', action='append', dest='caseNames', help='Runs this case only, can be repeated')
+    parser.add_argument('--json', dest='asJson', action='store_true')
+    arguments = parser.parse_args(argv)
+
+    if arguments.backend == 'maya':
+        import maya.standalone
+        maya.standalone.initialize(name='python')
+        backend = MayaBackend()
+    else:
+        backend = StubBackend()
+
+    cases = [case for case in canonicalCases(arguments.hdri) if not arguments.caseNames or case.name in arguments.caseNames]
+    results = runSuite(backend, arguments.golden, cases, workers=arguments.workers,
+                       update=arguments.command == 'update')
+
+    if arguments.asJson:
+        print(json.dumps([result._asdict() for result in results], indent=4))
+    elif results:
+        print(formatResults(results))
+
+    return 0 if all(result.passed for result in results) else 1
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
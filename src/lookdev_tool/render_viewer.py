@@ -0,0 +1,206 @@
+"""Render viewer panel of the tool's dialog, shows the frames written in the shared frame buffer.
+
+Only the tiles updated since the last poll are converted for display, in a display image reused from frame to frame.
+A finished frame is kept in a bounded history for flipping between the latest renders.
+"""
+import os
+import collections
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from PySide2 import QtCore, QtWidgets, QtGui
+
+from lookdev_tool import frame_buffer
+
+
+class FrameView(QtWidgets.QWidget):
+    """Paints an RGBA uint8 array scaled to the widget, without converting it to a pixmap"""
+    def __init__(self) -> None:
+        super(FrameView, self).__init__()
+        self._array = None
+        self._image = None
+        self.setMinimumHeight(120)
+
+    def setArray(self, array) -> None:
+        """Shows array, which stays shared with the caller, updateTiles repaints the parts it changed"""
+        self._array = array
+        self._image = None
+        if array is not None:
+            height, width = array.shape[:2]
+            self._image = QtGui.QImage(array.data, width, height, width * 4, QtGui.QImage.Format_RGBA8888)
+        self.update()
+
+    def _targetRect(self) -> QtCore.QRectF:
+        """Returns where the frame is painted, fitted in the widget"""
+        if self._image is None:
+            return QtCore.QRectF()
+
+        scale = min(self.width() / self._image.width(), self.height() / self._image.height())
+        width, height = self._image.width() * scale, self._image.height() * scale
+        return QtCore.QRectF((self.width() - width) * 0.5, (self.height() - height) * 0.5, width, height)
+
+    def updateTiles(self, tiles) -> None:
+        """Repaints the widget areas of the updated tiles"""
+        target = self._targetRect()
+        if self._image is None or target.isEmpty():
+            return
+
+        scale = target.width() / self._image.width()
+        for tile in tiles:
+            self.update(QtCore.QRectF(target.x() + tile.x * scale, target.y() + tile.y * scale, tile.width * scale,
+                                      tile.height * scale).toAlignedRect().adjusted(-1, -1, 1, 1))
+
+    def paintEvent(self, event: QtGui.QPaintEvent) -> None:
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtGui.QColor(30, 30, 30))
+        if self._image is not None:
+            painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+            painter.drawImage(self._targetRect(), self._image)
+        painter.end()
+
+
+class RenderViewer(QtWidgets.QWidget):
+    """Shows the frame buffer as it is rendered and the last finished frames"""
+    def __init__(self, bufferPath: str, historySize: int = 8, pollInterval: int = 100) -> None:
+        """
+        Parameters:
+            bufferPath: The frame buffer's file, shared with the render process.
+            historySize: The number of finished frames kept for flipping.
+            pollInterval: Time between two looks at the frame buffer, in milliseconds.
+        """
+        super(RenderViewer, self).__init__()
+
+        self.bufferPath = bufferPath
+        self.history = collections.deque(maxlen=historySize)
+        self._frameBuffer = None
+        self._frameId = 0
+        self._generation = 0
+        self._archivedFrame = 0
+        self._display = None
+
+        self.frameView = FrameView()
+        self.historySlider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
+        self.historySlider.setRange(0, 0)
+        self.historySlider.setToolTip('Flip between the last renders, the live frame is at the right end')
+        self.frameLabel = QtWidgets.QLabel('No render')
+        self.pollTimer = QtCore.QTimer(self)
+        self.pollTimer.setInterval(pollInterval)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.frameView)
+        bottomLayout = QtWidgets.QHBoxLayout()
+        bottomLayout.addWidget(self.frameLabel)
+        bottomLayout.addWidget(self.historySlider)
+        layout.addLayout(bottomLayout)
+
+        self.pollTimer.timeout.connect(self.poll)
+        self.historySlider.valueChanged.connect(self.onHistorySliderValueChanged)
+
+    @property
+    def showsLive(self) -> bool:
+        return self.historySlider.value() == len(self.history)
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        self.pollTimer.start()
+        self.poll()
+        super(RenderViewer, self).showEvent(event)
+
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        self.pollTimer.stop()
+        super(RenderViewer, self).hideEvent(event)
+
+    def close(self) -> bool:
+        self.pollTimer.stop()
+        if self._frameBuffer:
+            self._frameBuffer.close()
+            self._frameBuffer = None
+        return super(RenderViewer, self).close()
+
+    def _mapBuffer(self) -> bool:
+        """Maps the frame buffer, again if the render process replaced it"""
+        if self._frameBuffer and not self._frameBuffer.isStale():
+            return True
+
+        if self._frameBuffer:
+            self._frameBuffer.close()
+            self._frameBuffer = None
+
+        if not os.path.isfile(self.bufferPath):
+            return False
+
+        try:
+            self._frameBuffer = frame_buffer.FrameBuffer(self.bufferPath)
+        except (OSError, RuntimeError, ValueError):
+            return False
+
+        self._frameId = 0
+        return True
+
+    def poll(self) -> None:
+        """Converts the tiles written since the last poll and archives the finished frame"""
+        if not self._mapBuffer():
+            return
+
+        frameBuffer = self._frameBuffer
+        header = frameBuffer.header()
+        if not header.frameId:
+            return
+
+        if header.frameId != self._frameId:
+            # new frame, the display image is reused if the resolution did not change
+            if self._display is None or self._display.shape[:2] != (header.height, header.width):
+                self._display = np.zeros((header.height, header.width, 4), dtype=np.uint8)
+            else:
+                self._display.fill(0)
+
+            self._frameId = header.frameId
+            self._generation = header.startGeneration
+            if self.showsLive:
+                self.frameView.setArray(self._display)
+
+        tiles = frameBuffer.updates(self._generation)
+        if tiles is None:
+            tiles = [frame_buffer.Tile(0, 0, header.width, header.height)]
+
+        for tile in tiles:
+            region = (slice(tile.y, tile.y + tile.height), slice(tile.x, tile.x + tile.width))
+            frame_buffer.toDisplay(frameBuffer.pixels[region], out=self._display[region])
+
+        self._generation = header.generation
+        if tiles and self.showsLive:
+            self.frameView.updateTiles(tiles)
+
+        if self.showsLive:
+            self.frameLabel.setText('{} (rendering)'.format(header.name) if header.completedFrame != header.frameId
+                                    else header.name)
+
+        if header.completedFrame == header.frameId and self._archivedFrame != header.frameId:
+            self._archive(header.name)
+
+    def _archive(self, name: str) -> None:
+        """Keeps a copy of the finished frame, the oldest one is dropped past the history's size"""
+        live = self.showsLive
+        dropped = len(self.history) == self.history.maxlen
+        self._archivedFrame = self._frameId
+        self.history.append((name, self._display.copy()))
+
+        # the slider keeps showing the same frame, the live one or the archived one looked at
+        value = len(self.history) if live else max(self.historySlider.value() - dropped, 0)
+        self.historySlider.blockSignals(True)
+        self.historySlider.setRange(0, len(self.history))
+        self.historySlider.setValue(value)
+        self.historySlider.blockSignals(False)
+
+    def onHistorySliderValueChanged(self, value: int) -> None:
+        if self.showsLive:
+            self.frameView.setArray(self._display)
+            self.poll()
+            return
+
+        name, array = self.history[value]
+        self.frameLabel.setText('{} ({}/{})'.format(name, value + 1, len(self.history)))
+        self.frameView.setArray(array)
@@ -1,11 +1,17 @@
 import os
-from PySide2 import QtCore
 
-QtCore.QDir.addSearchPath('icons', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icons/'))
-QtCore.QDir.addSearchPath('grounds', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grounds/'))
-QtCore.QDir.addSearchPath('camera', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'camera/'))
-QtCore.QDir.addSearchPath('hdri', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hdri/'))
-QtCore.QDir.addSearchPath('preferences', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preferences/'))
+try:
+    from PySide2 import QtCore
+except ImportError:
+    # headless use (offline checks run without Qt), no Qt search path to register
+    QtCore = None
+
+if QtCore:
+    QtCore.QDir.addSearchPath('icons', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icons/'))
+    QtCore.QDir.addSearchPath('grounds', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grounds/'))
+    QtCore.QDir.addSearchPath('camera', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'camera/'))
+    QtCore.QDir.addSearchPath('hdri', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hdri/'))
+    QtCore.QDir.addSearchPath('preferences', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preferences/'))
 
 a = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'camera/')
 
@@ -0,0 +1,155 @@
+import os
+import math
+import time
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+from maya import cmds
+
+from lookdev_tool import constants
+from lookdev_tool import lookdev_core
+
+REVIEW_GRID_LOGGER = logging.getLogger(__name__)
+REVIEW_GRID_LOGGER.setLevel(10)
+
+REVIEW_GRID_GROUP = 'ReviewGrid_Grp'
+REVIEW_GRID_ASSETS_ATTR = 'reviewAssets'
+
+
+def _assetNamespace(path: str) -> str:
+    """Returns the namespace of an asset, its file's base name made a valid Maya name"""
+    baseName = os.path.splitext(os.path.basename(path))[0]
+    return ''.join(char if char.isalnum() else '_' for char in baseName)
+
+
+def _referenceRoots(referenceNode: str) -> List[str]:
+    """Returns the top level transforms of a reference"""
+    nodes = cmds.referenceQuery(referenceNode, nodes=True, dagPath=True) or []
+    return [node for node in cmds.ls(nodes, type='transform', long=True) or [] if node.count('|') == 1]
+
+
+def gridLayout(footprints: Sequence[Tuple[float, float]], spacing: float) -> List[Tuple[float, float]]:
+    """Returns the center of each footprint on a grid centered on the origin
+
+    The grid is as square as possible, each column is as wide as its widest footprint and each row as deep as its
+    deepest one, so small assets are not spread as far apart as the biggest one.
+
+    Parameters:
+        footprints: (width along X, depth along Z) of each asset.
+        spacing: The gap between two cells.
+    """
+    if not footprints:
+        return []
+
+    columns = int(math.ceil(math.sqrt(len(footprints))))
+    rows = int(math.ceil(len(footprints) / float(columns)))
+
+    columnWidths = [0.0] * columns
+    rowDepths = [0.0] * rows
+    for index, (width, depth) in enumerate(footprints):
+        row, column = divmod(index, columns)
+        columnWidths[column] = max(columnWidths[column], width)
+        rowDepths[row] = max(rowDepths[row], depth)
+
+    def cellCenters(sizes):
+        centers = []
+        position = -(sum(sizes) + spacing * (len(sizes) - 1)) / 2.0
+        for size in sizes:
+            centers.append(position + size / 2.0)
+            position += size + spacing
+        return centers
+
+    columnCenters = cellCenters(columnWidths)
+    rowCenters = cellCenters(rowDepths)
+
+    return [(columnCenters[index % columns], rowCenters[index // columns]) for index in range(len(footprints))]
+
+
+def createReviewGrid(paths: Sequence[str], pageSize: int = constants.REVIEW_GRID_PAGE_SIZE) -> Dict[int, List[str]]:
+    """References assets side by side on the ground, deletes the grid if it is already in scene
+
+    The assets share the tool's camera, lights and dome. Each asset is moved in an offset group standing on the ground
+    at the center of its cell, cells are spaced from the assets' bounds. Libraries bigger than pageSize are split in
+    pages laid out at the same place, page N is only visible on frame N so rendering frames 1 to N renders the whole
+    library in a single batch render.
+
+    Parameters:
+        paths: The assets' scene files.
+        pageSize: The highest number of assets shown on a frame.
+
+    Returns:
+        {frame: asset offset groups}.
+    """
+    if cmds.objExists(REVIEW_GRID_GROUP):
+        removeReviewGrid()
+        return {}
+
+    if not paths:
+        return {}
+
+    startTime = time.perf_counter()
+    grid = cmds.createNode('transform', name=REVIEW_GRID_GROUP, skipSelect=True)
+    lookdev_core.registerNodes(grid)
+
+    # the source paths are kept on the grid to remove the references with it
+    cmds.addAttr(grid, longName=REVIEW_GRID_ASSETS_ATTR, dataType='stringArray')
+    cmds.setAttr('{}.{}'.format(grid, REVIEW_GRID_ASSETS_ATTR), len(paths), *paths, type='stringArray')
+
+    pages = {}
+    for pageIndex in range(0, len(paths), pageSize):
+        frame = pageIndex // pageSize + 1
+        page = cmds.createNode('transform', name='ReviewGrid_Page{}_Grp'.format(frame), parent=grid, skipSelect=True)
+
+        offsets = []
+        footprints = []
+        for path in paths[pageIndex:pageIndex + pageSize]:
+            namespace = _assetNamespace(path)
+            referenceNode = lookdev_core.referenceFile(path, namespace=namespace)
+            roots = _referenceRoots(referenceNode)
+
+            offset = cmds.createNode('transform', name='{}_Offset_Grp'.format(namespace), parent=page, skipSelect=True)
+            if roots:
+                cmds.parent(roots, offset)
+
+            bounds = cmds.exactWorldBoundingBox(offset)
+            # stand the asset on the ground and center it on its cell
+            cmds.setAttr('{}.translate'.format(offset), -(bounds[0] + bounds[3]) / 2.0, -bounds[1],
+                         -(bounds[2] + bounds[5]) / 2.0, type='double3')
+
+            offsets.append(offset)
+            footprints.append((bounds[3] - bounds[0], bounds[5] - bounds[2]))
+
+        spacing = constants.REVIEW_GRID_SPACING * max(max(footprint) for footprint in footprints)
+        for offset, (x, z) in zip(offsets, gridLayout(footprints, spacing)):
+            translate = cmds.getAttr('{}.translate'.format(offset))[0]
+            cmds.setAttr('{}.translate'.format(offset), translate[0] + x, translate[1], translate[2] + z,
+                         type='double3')
+
+        pages[frame] = offsets
+
+    # one page per frame
+    if len(pages) > 1:
+        for frame in pages:
+            page = 'ReviewGrid_Page{}_Grp'.format(frame)
+            for keyFrame in range(1, len(pages) + 1):
+                cmds.setKeyframe(page, attribute='visibility', time=keyFrame, value=keyFrame == frame,
+                                 outTangentType='step')
+
+    cmds.select(clear=True)
+    REVIEW_GRID_LOGGER.debug('{} assets laid out on {} frame(s) in {:.3f}s'.format(
+        len(paths), len(pages), time.perf_counter() - startTime))
+
+    return pages
+
+
+def removeReviewGrid() -> None:
+    """Removes the assets' references and the grid's groups"""
+    if not cmds.objExists(REVIEW_GRID_GROUP):
+        return
+
+    for path in cmds.getAttr('{}.{}'.format(REVIEW_GRID_GROUP, REVIEW_GRID_ASSETS_ATTR)) or []:
+        # reference may already have been removed by hand
+        if lookdev_core.referencedPath(path):
+            lookdev_core.removeReference(path)
+
+    cmds.delete(REVIEW_GRID_GROUP)
@@ -0,0 +1,151 @@
+import re
+import time
+import logging
+import collections
+from typing import List
+
+from maya import cmds
+
+from lookdev_tool import constants
+
+RIG_SWITCHER_LOGGER = logging.getLogger(__name__)
+RIG_SWITCHER_LOGGER.setLevel(10)
+
+# tool's groups built for one renderer, the dome transform is found from its shape
+RIG_ROOTS = ('Cam_Main_Grp', 'Lights_Grp', 'MultiView_Grp')
+DOME_SHAPE = 'lightDome'
+
+_GROUND_RE = re.compile(r'^ground_(\d+)_(\w+?)_ALL_Grp$')
+
+# what the active rig is made of, used to build the same rig for another renderer
+RigState = collections.namedtuple('RigState', ['camera', 'lights', 'dome', 'groundIndex'])
+
+
+def rigNamespace(renderer: str) -> str:
+    return '{}{}'.format(constants.RIG_NAMESPACE_PREFIX, renderer)
+
+
+def _rigRoots() -> List[str]:
+    """Returns the active rig's top nodes"""
+    roots = [root for root in RIG_ROOTS if cmds.objExists(root)]
+    if cmds.objExists(DOME_SHAPE):
+        roots.extend(cmds.listRelatives(DOME_SHAPE, parent=True) or [])
+
+    return roots
+
+
+def _grounds() -> List[str]:
+    return [ground for ground in cmds.ls('ground_*_ALL_Grp', type='transform') or [] if _GROUND_RE.match(ground)]
+
+
+def rigState() -> RigState:
+    """Returns what the active rig is made of"""
+    groundIndex = None
+    for ground in _grounds():
+        if cmds.getAttr('{}.visibility'.format(ground)):
+            groundIndex = int(_GROUND_RE.match(ground).group(1)) - 1
+
+    return RigState(
+        camera=cmds.objExists('Cam_Main_Grp'),
+        lights=cmds.objExists('Lights_Grp'),
+        dome=cmds.objExists(DOME_SHAPE),
+        groundIndex=groundIndex,
+    )
+
+
+def stashRig(renderer: str) -> int:
+    """Moves the active rig in the renderer's namespace and hides it
+
+    The nodes are only renamed, nothing is deleted, so the rig comes back as it was with activateRig. Referenced nodes
+    (grounds, color palette) cannot be renamed, their names already hold their renderer, they are only hidden.
+
+    Parameters:
+        renderer: The renderer the active rig is built for.
+
+    Returns:
+        The number of nodes stashed.
+    """
+    startTime = time.perf_counter()
+    namespace = rigNamespace(renderer)
+    roots = _rigRoots()
+
+    for ground in _grounds():
+        if _GROUND_RE.match(ground).group(2) == renderer:
+            cmds.setAttr('{}.visibility'.format(ground), False)
+
+    if not roots:
+        return 0
+
+    if not cmds.namespace(exists=namespace):
+        cmds.namespace(add=namespace)
+
+    nodes = cmds.listRelatives(roots, allDescendents=True, fullPath=True) or []
+    nodes = [node for node in nodes + roots if not cmds.referenceQuery(node, isNodeReferenced=True)]
+
+    # hidden cameras would still be rendered by a batch render
+    for camera in cmds.ls(nodes, type='camera') or []:
+        cmds.setAttr('{}.renderable'.format(camera), False)
+
+    # renamed through their uuids, the long names change as soon as a parent is renamed
+    for uuid in cmds.ls(nodes, uuid=True) or []:
+        node = cmds.ls(uuid, long=True)[0]
+        cmds.rename(node, '{}:{}'.format(namespace, node.rsplit('|', 1)[-1]), ignoreShape=True)
+
+    for root in cmds.ls(cmds.namespaceInfo(namespace, listOnlyDependencyNodes=True, dagPath=True) or [],
+                        assemblies=True) or []:
+        cmds.setAttr('{}.visibility'.format(root), False)
+
+    RIG_SWITCHER_LOGGER.debug('{} rig stashed ({} nodes) in {:.3f}s'.format(
+        renderer, len(nodes), time.perf_counter() - startTime))
+
+    return len(nodes)
+
+
+def activateRig(renderer: str) -> bool:
+    """Brings back the renderer's stashed rig and makes the renderer current
+
+    Parameters:
+        renderer: The renderer to activate, arnold or vray.
+
+    Returns:
+        False if the renderer has no stashed rig.
+    """
+    if cmds.getAttr('defaultRenderGlobals.currentRenderer') != renderer:
+        cmds.setAttr('defaultRenderGlobals.currentRenderer', renderer, type='string')
+
+    for ground in _grounds():
+        if _GROUND_RE.match(ground).group(2) == renderer:
+            cmds.setAttr('{}.visibility'.format(ground), True)
+
+    namespace = rigNamespace(renderer)
+    if not cmds.namespace(exists=namespace):
+        return False
+
+    startTime = time.perf_counter()
+    roots = cmds.ls(cmds.namespaceInfo(namespace, listOnlyDependencyNodes=True, dagPath=True) or [],
+                    assemblies=True, long=True) or []
+
+    uuids = cmds.ls(roots, uuid=True) or []
+    cmds.namespace(moveNamespace=(namespace, ':'), force=True)
+    cmds.namespace(removeNamespace=namespace)
+
+    for uuid in uuids:
+        root = cmds.ls(uuid, long=True)[0]
+        cmds.setAttr('{}.visibility'.format(root), True)
+
+        for camera in cmds.listRelatives(root, allDescendents=True, type='camera', fullPath=True) or []:
+            cmds.setAttr('{}.renderable'.format(camera), True)
+
+    elapsed = time.perf_counter() - startTime
+    RIG_SWITCHER_LOGGER.debug('{} rig activated in {:.3f}s'.format(renderer, elapsed),
+                              extra={'operation': 'rigActivate', 'elapsed': elapsed})
+    return True
+
+
+def removeStashedRigs() -> None:
+    """Deletes every stashed rig, their nodes are owned by the tool"""
+    for namespace in cmds.namespaceInfo(':', listOnlyNamespaces=True) or []:
+        namespace = namespace.lstrip(':')
+        if namespace.startswith(constants.RIG_NAMESPACE_PREFIX):
+            cmds.namespace(removeNamespace=namespace, deleteNamespaceContent=True)
+
@@ -0,0 +1,273 @@
+"""Prebuilt rig templates: camera, three points lights with their ramp and dome, one scene per renderer.
+
+A template is built once in a mayapy batch process by the renderer's own functions, then brought in later sessions
+with a single import. The color palette and the grounds stay references, they are added after the import.
+
+Benchmark usage, Maya must be initialized before the tool's modules are imported:
+    mayapy -c "import maya.standalone; maya.standalone.initialize(); from lookdev_tool import rig_template;
+               rig_template.main()" arnold|vray [--runs N] [--hdri NAME]
+"""
+import os
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Optional
+
+from maya import cmds
+
+from lookdev_tool import constants
+from lookdev_tool import lookdev_core
+from lookdev_tool import jobs
+from lookdev_tool.Utils.maya_executables import mayaExecutable
+
+RIG_TEMPLATE_LOGGER = logging.getLogger(__name__)
+RIG_TEMPLATE_LOGGER.setLevel(10)
+
+PACKAGE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# files defining the rig, the template is rebuilt when one of them changes
+DEFINITION_FILES = ('constants.py', 'lookdev_core.py', 'rig_template.py')
+
+RENDERER_PLUGINS = {'arnold': 'mtoa', 'vray': 'vrayformaya'}
+
+
+def coreModule(renderer: str):
+    """Returns the core module of a renderer of RENDERER_PLUGINS, its plugin must be loaded"""
+    if renderer == 'vray':
+        from lookdev_tool import vray_core
+        return vray_core
+
+    from lookdev_tool import arnold_core
+    return arnold_core
+
+
+def templateKey(renderer: str, resourcePaths: List[str]) -> str:
+    """Returns the hash of everything the renderer's template is built from
+
+    Parameters:
+        renderer: arnold or vray.
+        resourcePaths: Files read to build the rig.
+    """
+    key = hashlib.sha1(renderer.encode('utf-8'))
+    for name in DEFINITION_FILES + ('{}_core.py'.format(renderer),):
+        with open(os.path.join(PACKAGE_PATH, name), 'rb') as rFile:
+            key.update(rFile.read())
+
+    for path in resourcePaths:
+        stat = os.stat(path)
+        key.update('{}|{}|{}'.format(path, stat.st_size, stat.st_mtime).encode('utf-8'))
+
+    return key.hexdigest()
+
+
+def templatePath(renderer: str, colorCheckerPath: str) -> str:
+    """Returns where the renderer's template is cached"""
+    key = templateKey(renderer, [colorCheckerPath])
+    return os.path.join(constants.RIG_TEMPLATE_PATH, key, 'rig_{}.ma'.format(renderer))
+
+
+def readyTemplatePath(renderer: str, colorCheckerPath: str) -> Optional[str]:
+    """Returns the template's path if it has already been built"""
+    path = templatePath(renderer, colorCheckerPath)
+    return path if os.path.isfile(path) else None
+
+
+def generateTemplate(renderer: str, colorCheckerPath: str, hdriName: str) -> jobs.Job:
+    """Builds the renderer's template in a background mayapy process
+
+    Parameters:
+        renderer: arnold or vray.
+        colorCheckerPath: The color palette referenced by the camera.
+        hdriName: The HDRI read by the template's dome, replaced by the current one once imported.
+    """
+    targetPath = templatePath(renderer, colorCheckerPath)
+    script = ('import sys; sys.path.insert(0, {!r}); import maya.standalone; maya.standalone.initialize(name="python"); '
+              'from lookdev_tool import rig_template; rig_template.buildTemplate({!r}, {!r}, {!r}, {!r}, {!r})').format(
+        os.path.dirname(PACKAGE_PATH), renderer, targetPath, colorCheckerPath, constants.LIGHT_DOME_PATH, hdriName)
+
+    def run(job):
+        startTime = time.perf_counter()
+        process = subprocess.run([mayaExecutable('mayapy'), '-c', script], stdout=subprocess.PIPE,
+                                 stderr=subprocess.STDOUT, universal_newlines=True)
+        if process.returncode != 0:
+            RIG_TEMPLATE_LOGGER.error('{} template build failed:\n{}'.format(renderer, process.stdout))
+            raise RuntimeError('{} template build failed'.format(renderer))
+
+        elapsed = time.perf_counter() - startTime
+        RIG_TEMPLATE_LOGGER.debug('{} template built in {:.3f}s'.format(renderer, elapsed),
+                                  extra={'operation': 'rigTemplateBuild', 'elapsed': elapsed})
+        return targetPath
+
+    return jobs.getJobManager().submit('Build {} rig template'.format(renderer), run)
+
+
+def buildTemplate(renderer: str, targetPath: str, colorCheckerPath: str, hdriPath: str, hdriName: str) -> None:
+    """Builds the rig node by node and saves it as the template, runs inside mayapy"""
+    cmds.loadPlugin(RENDERER_PLUGINS[renderer], quiet=True)
+    core = coreModule(renderer)
+    constants.LIGHT_DOME_PATH = hdriPath
+
+    core.createCam(colorCheckerPath)
+    core.setThreePointsLights()
+    core.LightDome().setLightDome(hdriName)
+
+    # the palette is referenced again by each session, only the tool's own nodes are kept
+    lookdev_core.removeReference(colorCheckerPath)
+    cmds.delete(constants.OWNERSHIP_SET_NAME)
+
+    templateDir = os.path.dirname(os.path.dirname(targetPath))
+    os.makedirs(templateDir, exist_ok=True)
+    tmpDir = tempfile.mkdtemp(dir=templateDir)
+    tmpPath = os.path.join(tmpDir, os.path.basename(targetPath))
+    cmds.file(rename=tmpPath)
+    cmds.file(save=True, type='mayaAscii', force=True)
+
+    os.makedirs(os.path.dirname(targetPath), exist_ok=True)
+    os.replace(tmpPath, targetPath)
+    shutil.rmtree(tmpDir, ignore_errors=True)
+
+
+def _checkNoRig(renderEngine) -> None:
+    """Raises if a part of the rig is already in scene, neither build replaces nor completes an existing rig"""
+    existing = [node for node in ('Cam_Main_Grp', 'Lights_Grp', renderEngine.LightDome.LIGHT_DOME_NAME)
+                if cmds.objExists(node)]
+    if existing:
+        raise RuntimeError('{} already in scene'.format(', '.join(existing)))
+
+
+def importTemplate(renderEngine, path: str, colorCheckerPath: str, hdriName: str) -> List[str]:
+    """Brings the rig from its template in one import and applies the session's overrides
+
+    Parameters:
+        renderEngine: The render engine's core module.
+        path: The template's path.
+        colorCheckerPath: The color palette referenced by the camera.
+        hdriName: The HDRI read by the dome.
+
+    Returns:
+        The imported nodes.
+    """
+    _checkNoRig(renderEngine)
+
+    newNodes = cmds.file(path, i=True, type='mayaAscii', returnNewNodes=True, ignoreVersion=True) or []
+
+    # the tool owns the imported nodes, as if they had been created one by one
+    lookdev_core.registerNodes(*(cmds.ls(newNodes, assemblies=True) + cmds.ls(newNodes, type=('file', 'ramp', 'place2dTexture'))))
+    for ramp in cmds.ls(newNodes, type='ramp'):
+        lookdev_core.adoptRamp(constants.LIGHT_RAMP_DEFINITION, ramp)
+
+    # overrides: the session's HDRI and color palette
+    lightDome = renderEngine.LightDome()
+    for fileNode in cmds.ls(newNodes, type='file'):
+        pooledNode = lookdev_core.acquireFileTexture(fileNode, lightDome.texturePath(hdriName), fileNode=fileNode)
+        if pooledNode == fileNode:
+            continue
+
+        # the HDRI is already read by a pooled node, the imported one is dropped
+        for destination in cmds.listConnections('{}.outColor'.format(fileNode), source=False, plugs=True) or []:
+            cmds.connectAttr('{}.outColor'.format(pooledNode), destination, force=True)
+        cmds.delete(fileNode)
+
+    # the camera has already been moved, the palette keeps its offset under it like in createCam
+    lookdev_core.referenceFile(colorCheckerPath)
+    cmds.parent('ColorPalette_{}_ALL_Grp'.format(renderEngine.RENDERER), 'Main_Cam_Transform', relative=True)
+
+    cmds.select(clear=True)
+    return newNodes
+
+
+def buildRig(renderEngine, colorCheckerPath: str, hdriName: str) -> bool:
+    """Builds the camera, lights and dome from the template, node by node if it is not built yet
+
+    The template is then generated in the background for the next time. Both builds raise a RuntimeError if a part
+    of the rig is already in scene, createCam, setThreePointsLights and setLightDome would delete it otherwise.
+
+    Returns:
+        True if the template has been used.
+    """
+    _checkNoRig(renderEngine)
+
+    startTime = time.perf_counter()
+    path = readyTemplatePath(renderEngine.RENDERER, colorCheckerPath)
+
+    if path:
+        importTemplate(renderEngine, path, colorCheckerPath, hdriName)
+    else:
+        buildNodeByNode(renderEngine, colorCheckerPath, hdriName)
+        generateTemplate(renderEngine.RENDERER, colorCheckerPath, hdriName)
+
+    elapsed = time.perf_counter() - startTime
+    RIG_TEMPLATE_LOGGER.debug('{} rig built {} in {:.3f}s'.format(
+        renderEngine.RENDERER, 'from template' if path else 'node by node', elapsed),
+        extra={'operation': 'rigBuild', 'elapsed': elapsed})
+    return bool(path)
+
+
+def buildNodeByNode(renderEngine, colorCheckerPath: str, hdriName: str) -> None:
+    """Builds the rig with the renderer's functions, which toggle each part: the scene must hold none of it"""
+    _checkNoRig(renderEngine)
+
+    renderEngine.createCam(colorCheckerPath)
+    renderEngine.setThreePointsLights()
+    renderEngine.LightDome().setLightDome(hdriName)
+
+
+def benchmark(renderEngine, colorCheckerPath: str, hdriName: str, runs: int = 5) -> Dict[str, float]:
+    """Times the node by node build against the template import, the scene is cleared after each build
+
+    The template must have been built.
+
+    Returns:
+        {'nodeByNode': average seconds, 'template': average seconds}.
+    """
+    path = readyTemplatePath(renderEngine.RENDERER, colorCheckerPath)
+    if not path:
+        raise RuntimeError('{} template not built'.format(renderEngine.RENDERER))
+
+    timings = {}
+    for name, build in (('nodeByNode', lambda: buildNodeByNode(renderEngine, colorCheckerPath, hdriName)),
+                        ('template', lambda: importTemplate(renderEngine, path, colorCheckerPath, hdriName))):
+        elapsed = 0.0
+        for _ in range(runs):
+            startTime = time.perf_counter()
+            build()
+            elapsed += time.perf_counter() - startTime
+            renderEngine.clearScene()
+
+        timings[name] = elapsed / runs
+
+    RIG_TEMPLATE_LOGGER.debug('{} rig: node by node {:.3f}s, template {:.3f}s'.format(
+        renderEngine.RENDERER, timings['nodeByNode'], timings['template']))
+    return timings
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Times the lookdev rig built node by node against its template '
+                                                 'import, runs inside an initialized mayapy.')
+    parser.add_argument('renderer', choices=sorted(RENDERER_PLUGINS))
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--hdri', help='HDRI read by the dome, the first one of the HDRI folder if not given')
+    arguments = parser.parse_args(argv)
+
+    cmds.loadPlugin(RENDERER_PLUGINS[arguments.renderer], quiet=True)
+    core = coreModule(arguments.renderer)
+    colorCheckerPath = os.path.join(PACKAGE_PATH, 'resources', 'camera',
+                                    'ColorPalette_{}.ma'.format(arguments.renderer))
+    hdriName = arguments.hdri or sorted(name for name in os.listdir(constants.LIGHT_DOME_PATH)
+                                        if lookdev_core.isHdri(name))[0]
+
+    if not readyTemplatePath(arguments.renderer, colorCheckerPath):
+        buildTemplate(arguments.renderer, templatePath(arguments.renderer, colorCheckerPath), colorCheckerPath,
+                      constants.LIGHT_DOME_PATH, hdriName)
+        cmds.file(new=True, force=True)
+
+    timings = benchmark(core, colorCheckerPath, hdriName, arguments.runs)
+    print('{} rig over {} runs: node by node {:.3f}s, template {:.3f}s, {:.1f}x faster'.format(
+        arguments.renderer, arguments.runs, timings['nodeByNode'], timings['template'],
+        timings['nodeByNode'] / max(timings['template'], 1e-6)))
+
+    return 0
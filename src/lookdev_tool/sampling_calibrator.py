@@ -0,0 +1,252 @@
+import os
+import glob
+import json
+import time
+import ctypes
+import shutil
+import logging
+import tempfile
+import subprocess
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from lookdev_tool.Utils.maya_executables import mayaExecutable
+
+SAMPLING_CALIBRATOR_LOGGER = logging.getLogger(__name__)
+SAMPLING_CALIBRATOR_LOGGER.setLevel(10)
+
+# crops measured in the test render, (x, y, width, height) as fractions of the frame
+CALIBRATION_CROPS = (
+    (0.375, 0.375, 0.25, 0.25),
+    (0.25, 0.55, 0.2, 0.2),
+    (0.55, 0.55, 0.2, 0.2),
+)
+
+
+def _requireNumpy() -> None:
+    if np is None:
+        raise RuntimeError('NumPy is required to calibrate the sampling')
+
+
+def differenceNoise(image, reference) -> float:
+    """Returns the standard deviation of an image's sampling noise, measured against a reference render
+
+    Both images are renders of the same frame, the textures and the edges cancel out in their difference and only
+    the sampling noise is left. The reference's own noise is part of the measure, which makes it slightly
+    pessimistic. The color channels are measured apart, averaging them first would divide their independent noise
+    by the square root of their number.
+
+    Parameters:
+        image: (height, width) or (height, width, channels) float array.
+        reference: Array of the same shape, rendered with more samples.
+
+    Returns:
+        The noisiest color channel's sigma.
+    """
+    _requireNumpy()
+
+    difference = np.asarray(image, dtype=np.float64) - np.asarray(reference, dtype=np.float64)
+    if difference.ndim == 2:
+        return float(difference.std())
+
+    return max(float(difference[..., channel].std()) for channel in range(min(difference.shape[2], 3)))
+
+
+def cropNoise(image, reference, crops: Sequence[Tuple[float, float, float, float]] = CALIBRATION_CROPS) -> float:
+    """Returns the highest noise measured in the crops of an image against its reference"""
+    _requireNumpy()
+
+    height, width = image.shape[:2]
+    noises = []
+    for x, y, cropWidth, cropHeight in crops:
+        left, top = int(x * width), int(y * height)
+        right, bottom = max(left + 1, int((x + cropWidth) * width)), max(top + 1, int((y + cropHeight) * height))
+        noises.append(differenceNoise(image[top:bottom, left:right], reference[top:bottom, left:right]))
+
+    return max(noises)
+
+
+class StubRenderer(object):
+    """Renders a gradient with gaussian noise, used to test the calibration without a renderer"""
+    def __init__(self, sigmaForSettings: Callable[[Dict[str, float]], float], width: int = 160, height: int = 90,
+                 seed: int = 0, textured: bool = False) -> None:
+        """
+        Parameters:
+            sigmaForSettings: Returns the noise's sigma of a sampling level.
+            width: The image width.
+            height: The image height.
+            seed: The noise's random seed.
+            textured: Adds a fine checker over the gradient, the sharp edges of a textured asset.
+        """
+        _requireNumpy()
+
+        self.sigmaForSettings = sigmaForSettings
+        self.width = width
+        self.height = height
+        self.textured = textured
+        self._random = np.random.default_rng(seed)
+        self.renders = 0
+
+    def render(self, settings: Dict[str, float]):
+        self.renders += 1
+        gradient = np.linspace(0.0, 1.0, self.width)[np.newaxis, :].repeat(self.height, axis=0)
+        image = np.dstack([gradient, gradient * 0.5, 1.0 - gradient])
+        if self.textured:
+            rows, columns = np.indices((self.height, self.width))
+            image = image * (0.5 + 0.5 * ((rows // 3 + columns // 3) % 2))[..., np.newaxis]
+        return image + self._random.normal(0.0, self.sigmaForSettings(settings), image.shape)
+
+
+class MayaRenderer(object):
+    """Renders small test frames of the current scene with Maya's command line renderer
+
+    The scene is exported once, each sampling level is set with a pre-render MEL command.
+    """
+    def __init__(self, renderer: str, camera: str = 'Main_Cam', width: int = 320, height: int = 180,
+                 reader: Optional[Callable[[str], object]] = None) -> None:
+        """Exports the scene, on the main thread
+
+        Parameters:
+            renderer: The renderer's name for Render -r, arnold or vray.
+            camera: The rendered camera.
+            width: The test frame width.
+            height: The test frame height.
+            reader: Returns a rendered image's pixels from its path, readImage by default. Renders run on a worker
+                read through jobs.MainThreadBridge.call since MImage is only used on the main thread.
+        """
+        from maya import cmds
+
+        self.renderer = renderer
+        self.camera = camera
+        self.width = width
+        self.height = height
+        self.reader = reader or readImage
+        self._folder = tempfile.mkdtemp(prefix='lookdev_calibration_')
+        self._scenePath = os.path.join(self._folder, 'calibration.ma')
+        self.renders = 0
+
+        cmds.file(self._scenePath, exportAll=True, preserveReferences=True, type='mayaAscii', force=True)
+
+    def render(self, settings: Dict[str, float]):
+        self.renders += 1
+        imageName = 'level{}'.format(self.renders)
+        preRender = ';'.join('setAttr "{}" {}'.format(attribute, value) for attribute, value in settings.items())
+
+        command = [mayaExecutable('Render'), '-r', self.renderer, '-x', str(self.width), '-y', str(self.height),
+                   '-cam', self.camera, '-of', 'png', '-rd', self._folder, '-im', imageName,
+                   '-preRender', preRender, self._scenePath]
+        process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        if process.returncode != 0:
+            raise RuntimeError('Calibration render of {} failed:\n{}'.format(settings, process.stdout[-2000:]))
+
+        imagePaths = glob.glob(os.path.join(self._folder, '{}*.png'.format(imageName)))
+        if not imagePaths:
+            raise RuntimeError('Calibration render failed: {}'.format(' '.join(command)))
+
+        return self.reader(imagePaths[0])
+
+    def close(self) -> None:
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+
+def readImage(path: str):
+    """Reads an image with Maya's MImage, returns a (height, width, 4) float array in [0, 1]"""
+    import maya.api.OpenMaya as om
+
+    image = om.MImage()
+    image.readFromFile(path)
+    width, height = image.getSize()
+
+    buffer = (ctypes.c_ubyte * (width * height * 4)).from_address(int(image.pixels()))
+    return np.ndarray(shape=(height, width, 4), buffer=buffer, dtype=np.uint8).astype(np.float64) / 255.0
+
+
+def calibrate(renderer, levels: Sequence[Dict[str, float]], target: Optional[float] = None, job=None) -> dict:
+    """Returns the cheapest sampling level meeting the noise target
+
+    The most expensive level is rendered first as the reference, the other levels are then rendered from the
+    cheapest and their noise measured against it. The calibration stops at the first level whose noisiest crop is
+    under target, the most expensive level is returned if none meets it.
+
+    Parameters:
+        renderer: Object with a render(settings) method returning an image array, StubRenderer or MayaRenderer.
+        levels: Sampling levels sorted by cost, {attribute: value}.
+        target: The highest noise sigma accepted, in [0, 1] pixel values, constants.SAMPLING_NOISE_TARGET if None.
+        job: The jobs.Job running the calibration, its progress is reported and its cancellation checked.
+
+    Returns:
+        {'settings': chosen level, 'noise': its noise, None for the reference, 'target': target,
+        'measures': [(noise, seconds), ...]}.
+    """
+    _requireNumpy()
+
+    if target is None:
+        from lookdev_tool import constants
+        target = constants.SAMPLING_NOISE_TARGET
+
+    startTime = time.perf_counter()
+    reference = renderer.render(levels[-1])
+    SAMPLING_CALIBRATOR_LOGGER.debug('{}: reference in {:.2f}s'.format(levels[-1], time.perf_counter() - startTime))
+
+    measures: List[Tuple[float, float]] = []
+    chosen, noise = levels[-1], None
+    for index, settings in enumerate(levels[:-1], 1):
+        if job:
+            job.reportProgress(index / len(levels), 'Sampling level {}/{}'.format(index, len(levels) - 1))
+            job.checkCancelled()
+
+        startTime = time.perf_counter()
+        levelNoise = cropNoise(renderer.render(settings), reference)
+        measures.append((levelNoise, time.perf_counter() - startTime))
+
+        SAMPLING_CALIBRATOR_LOGGER.debug('{}: noise {:.5f} in {:.2f}s'.format(settings, *measures[-1]))
+
+        if levelNoise <= target:
+            chosen, noise = settings, levelNoise
+            break
+
+    return {'settings': chosen, 'noise': noise, 'target': target, 'measures': measures}
+
+
+def calibrationPath(asset: str, renderer: str) -> str:
+    from lookdev_tool import constants
+
+    return os.path.join(constants.SAMPLING_CALIBRATION_PATH, '{}_{}.json'.format(asset, renderer))
+
+
+def saveCalibration(asset: str, renderer: str, calibration: dict) -> None:
+    """Stores the calibration of an asset for a renderer"""
+    os.makedirs(os.path.dirname(calibrationPath(asset, renderer)), exist_ok=True)
+    with open(calibrationPath(asset, renderer), 'w') as wFile:
+        json.dump(calibration, wFile, indent=4)
+
+
+def loadCalibration(asset: str, renderer: str) -> Optional[dict]:
+    """Returns the stored calibration of an asset, None if it has never been calibrated"""
+    try:
+        with open(calibrationPath(asset, renderer), 'r') as rFile:
+            return json.load(rFile)
+    except (IOError, ValueError):
+        return None
+
+
+def applyCalibration(asset: str, renderer: str) -> bool:
+    """Sets the calibrated sampling of an asset on the render settings
+
+    Returns:
+        False if the asset has never been calibrated.
+    """
+    from lookdev_tool import lookdev_core
+
+    calibration = loadCalibration(asset, renderer)
+    if not calibration:
+        return False
+
+    for attribute, value in calibration['settings'].items():
+        lookdev_core.setAttr(attribute, value)
+
+    return True
@@ -1,23 +1,36 @@
 import maya.mel as mel
-import os
 import json
+import time
 import logging
 
 from maya import cmds
 
 from lookdev_tool import lookdev_core
 from lookdev_tool import constants
+from lookdev_tool import ground_lod
 
 VRAY_CORE_LOGGER = logging.getLogger(__name__)
 VRAY_CORE_LOGGER.setLevel(10)
 
+RENDERER = 'vray'
+PLUGIN = 'vrayformaya.mll'
+SAMPLING_LEVELS = constants.VRAY_SAMPLING_LEVELS
+
+
+def pluginLoaded():
+    """
+    True if vRay is loaded, the rig cannot be built without it
+    """
+    return bool(cmds.pluginInfo(PLUGIN, query=True, loaded=True))
+
 
 class GroundClass(object):
-    def __init__(self, path1, path2, path3, colorCheckerPath):
+    def __init__(self, path1, path2, path3, colorCheckerPath, lod=ground_lod.LOD_FULL):
         self.path1 = path1
         self.path2 = path2
         self.path3 = path3
         self.colorCheckerPath = colorCheckerPath
+        self.lod = lod
 
     def setGround(self, index):
         """
@@ -26,53 +39,88 @@ class GroundClass(object):
 
         """
         VRAY_CORE_LOGGER.debug('self.path1: {}, self.path2: {}, self.path3: {}'.format(self.path1, self.path2, self.path3))
+        startTime = time.perf_counter()
 
         # import ground 1
         if index == 0:
             if cmds.objExists('ground_1_vray_ALL_Grp'):
-                cmds.file(self.path1, removeReference=True)
+                lookdev_core.removeReference(self.path1)
             else:
-                cmds.file(self.path1, reference=True)
+                lookdev_core.referenceFile(self.path1, lookdev_core.groundLodPath(self.path1, self.lod, self._onProxyReady))
 
                 if cmds.objExists('ground_2_vray_ALL_Grp'):
-                    cmds.file(self.path2, removeReference=True)
+                    lookdev_core.removeReference(self.path2)
 
                 if cmds.objExists('ground_3_vray_ALL_Grp'):
-                    cmds.file(self.path3, removeReference=True)
+                    lookdev_core.removeReference(self.path3)
 
         # import ground 2
         if index == 1:
             if cmds.objExists('ground_2_vray_ALL_Grp'):
-                cmds.file(self.path2, removeReference=True)
+                lookdev_core.removeReference(self.path2)
             else:
-                cmds.file(self.path2, reference=True)
+                lookdev_core.referenceFile(self.path2, lookdev_core.groundLodPath(self.path2, self.lod, self._onProxyReady))
 
                 if cmds.objExists('ground_1_vray_ALL_Grp'):
-                    cmds.file(self.path1, removeReference=True)
+                    lookdev_core.removeReference(self.path1)
 
                 if cmds.objExists('ground_3_vray_ALL_Grp'):
-                    cmds.file(self.path3, removeReference=True)
+                    lookdev_core.removeReference(self.path3)
 
         # import ground 3
         if index == 2:
             if cmds.objExists('ground_3_vray_ALL_Grp'):
-                cmds.file(self.path3, removeReference=True)
+                lookdev_core.removeReference(self.path3)
             else:
-                cmds.file(self.path3, reference=True)
+                lookdev_core.referenceFile(self.path3, lookdev_core.groundLodPath(self.path3, self.lod, self._onProxyReady))
 
                 if cmds.objExists('ground_1_vray_ALL_Grp'):
-                    cmds.file(self.path1, removeReference=True)
+                    lookdev_core.removeReference(self.path1)
 
                 if cmds.objExists('ground_2_vray_ALL_Grp'):
-                    cmds.file(self.path2, removeReference=True)
+                    lookdev_core.removeReference(self.path2)
 
         cmds.select(clear=True)
+        elapsed = time.perf_counter() - startTime
+        VRAY_CORE_LOGGER.debug('ground {} set in {:.3f}s'.format(index, elapsed), extra={'operation': 'groundSwitch', 'elapsed': elapsed})
+
+    def setLod(self, lod):
+        """
+        Load the current ground at another level of detail, the proxy is used while interacting
+        :param lod: ground_lod.LOD_FULL or ground_lod.LOD_PROXY
+        """
+        self.lod = lod
+
+        for path in (self.path1, self.path2, self.path3):
+            if lookdev_core.referencedPath(path):
+                self._loadLod(path)
+
+    def _loadLod(self, path):
+        lodPath = lookdev_core.groundLodPath(path, self.lod, self._onProxyReady)
+
+        startTime = time.perf_counter()
+        lookdev_core.replaceReference(path, lodPath)
+        elapsed = time.perf_counter() - startTime
+        VRAY_CORE_LOGGER.debug('{} loaded at {} lod in {:.3f}s'.format(path, self.lod, elapsed), extra={'operation': 'groundLod', 'elapsed': elapsed})
+
+    def _onProxyReady(self, path):
+        """Swaps the ground for its proxy once generated, if it is still wanted"""
+        if self.lod == ground_lod.LOD_PROXY and lookdev_core.referencedPath(path):
+            self._loadLod(path)
 
 
 class LightDome(object):
 
     LIGHT_DOME_NAME = 'lightDome'
 
+    @staticmethod
+    def texturePath(hdriName):
+        """
+        Returns the texture read by the dome for an HDRI
+        :param hdriName: HDRI's name from QlineEdit
+        """
+        return lookdev_core.hdriPath(hdriName)
+
     def setLightDome(self, hdriName):
         """
         Set light dome and delete it if one is already set
@@ -80,39 +128,62 @@ class LightDome(object):
         """
 
         # query vRay plugin
-        if not cmds.pluginInfo('vrayformaya.mll', query=True, loaded=True):
+        if not pluginLoaded():
             raise RuntimeError('vRay plugin not loaded')
 
-        if not cmds.objExists(self.LIGHT_DOME_NAME):
-            lightDome = cmds.createNode('VRayLightDomeShape', name=self.LIGHT_DOME_NAME, skipSelect=True)
-            lightDomeFile = lookdev_core.createFileText('dome1')
-            cmds.setAttr('{}.{}'.format(lightDome, 'useDomeTex'), 1)
-            cmds.setAttr('{}.{}'.format(lightDomeFile, 'fileTextureName'), '{}'.format(os.path.join(constants.LIGHT_DOME_PATH, hdriName)), type='string')
-            cmds.setAttr('{}.{}'.format(lightDome, 'invisible'), 1)
-            cmds.connectAttr('{}.{}'.format(lightDomeFile, 'outColor'), '{}.{}'.format(lightDome, 'domeTex'))
-
-        else:
-            lightDelOne = cmds.listConnections('dome1', source=True)
-            lightDelTwo = cmds.listConnections(lightDelOne[-1], source=True)
-
-            cmds.delete(lightDelTwo[1:])
-            cmds.delete(lightDelOne[-1])
+        texturePath = self.texturePath(hdriName)
+        startTime = time.perf_counter()
+        try:
+            if not cmds.objExists(self.LIGHT_DOME_NAME):
+                lightDome = cmds.createNode('VRayLightDomeShape', name=self.LIGHT_DOME_NAME, skipSelect=True)
+                lightDomeFile = lookdev_core.acquireFileTexture('dome1', texturePath)
+                cmds.setAttr('{}.{}'.format(lightDome, 'useDomeTex'), 1)
+                cmds.setAttr('{}.{}'.format(lightDome, 'invisible'), 1)
+                cmds.connectAttr('{}.{}'.format(lightDomeFile, 'outColor'), '{}.{}'.format(lightDome, 'domeTex'))
+
+                lookdev_core.registerNodes(cmds.listRelatives(lightDome, parent=True)[0])
+                return
+
+            domeTex = '{}.domeTex'.format(self.LIGHT_DOME_NAME)
+            currentFile = (cmds.listConnections(domeTex, source=True, destination=False) or [None])[0]
+
+            if currentFile and lookdev_core.fileTextureSource(currentFile) == texturePath:
+                # same HDRI, remove the dome, the file node stays in the pool
+                cmds.delete(cmds.listRelatives(self.LIGHT_DOME_NAME, parent=True)[0])
+                return
+
+            # switch HDRI, only the texture path changes
+            lightDomeFile = lookdev_core.acquireFileTexture('dome1', texturePath, fileNode=currentFile)
+            if lightDomeFile != currentFile:
+                cmds.connectAttr('{}.outColor'.format(lightDomeFile), domeTex, force=True)
+        finally:
+            elapsed = time.perf_counter() - startTime
+            VRAY_CORE_LOGGER.debug('dome set to {} in {:.3f}s'.format(hdriName, elapsed), extra={'operation': 'domeSet', 'elapsed': elapsed})
 
     @staticmethod
     def changeDome1Intens(value):
         """
         Changes lightDom intensity
         """
-        cmds.setAttr('lightDome.intensityMult', value)
+        if cmds.objExists(LightDome.LIGHT_DOME_NAME):
+            lookdev_core.setAttr('{}.intensityMult'.format(LightDome.LIGHT_DOME_NAME), value)
 
     @staticmethod
     def rotateDome(value):
         """
-        Changes lightDom rotation
+        Changes lightDom rotation, on the environment placement feeding the dome's texture if there is one, on the
+        dome's transform otherwise
         """
-        domeText = cmds.listConnections('VRayLightDome1', connections=True)
+        if not cmds.objExists(LightDome.LIGHT_DOME_NAME):
+            return
 
-        cmds.setAttr('{}.{}'.format(domeText[1], 'horRotation'), value)
+        for node in cmds.listHistory('{}.domeTex'.format(LightDome.LIGHT_DOME_NAME)) or []:
+            if cmds.attributeQuery('horRotation', node=node, exists=True):
+                lookdev_core.setAttr('{}.horRotation'.format(node), value)
+                return
+
+        lightDomeTransform = cmds.listRelatives(LightDome.LIGHT_DOME_NAME, parent=True)[0]
+        lookdev_core.setAttr('{}.rotateY'.format(lightDomeTransform), value)
 
 
 def createLight(name, intensity, translates, rotates):
@@ -121,7 +192,7 @@ def createLight(name, intensity, translates, rotates):
     :return: None
     """
     # query vRay plugin
-    if not cmds.pluginInfo('vrayformaya.mll', query=True, loaded=True):
+    if not pluginLoaded():
 
         raise RuntimeError('vRay plugin not loaded')
 
@@ -142,20 +213,10 @@ def createLight(name, intensity, translates, rotates):
     # add ramp to the light
     cmds.setAttr('{}.{}'.format(keyLight, 'useRectTex'), 1)
 
-    rampText = cmds.createNode('place2dTexture', name='keyLightText', skipSelect=True)
-    rampKeyL = cmds.createNode('ramp', name='keyLightRamp', skipSelect=True)
-
-    cmds.connectAttr('{}.{}'.format(rampText, 'outUV'), '{}.{}'.format(rampKeyL, 'uv'))
-    cmds.connectAttr('{}.{}'.format(rampText, 'outUvFilterSize'), '{}.{}'.format(rampKeyL, 'uvFilterSize'))
+    # the three lights share the same ramp
+    rampKeyL = lookdev_core.acquireRamp('lightRamp', constants.LIGHT_RAMP_DEFINITION)
     cmds.connectAttr('{}.{}'.format(rampKeyL, 'outColor'), '{}.{}'.format(keyLight, 'rectTex'))
 
-    # set the ramp
-    cmds.setAttr('{}.{}'.format(rampKeyL, 'colorEntryList[0].color'),  1, 1, 1, type='double3')
-    cmds.setAttr('{}.{}'.format(rampKeyL, 'colorEntryList[1].color'), 0, 0, 0, type='double3')
-    cmds.setAttr('{}.{}'.format(rampKeyL, 'colorEntryList[1].position'), 1)
-    cmds.setAttr('{}.{}'.format(rampKeyL, 'type'), 4)
-    cmds.setAttr('{}.{}'.format(rampKeyL, 'interpolation'), 3)
-
 
 def setThreePointsLights():
     """
@@ -179,6 +240,7 @@ def setThreePointsLights():
         cmds.parent('fillLightTransform', lightGroup)
         cmds.parent('keyLightTransform', lightGroup)
         cmds.parent('backLightTransform', lightGroup)
+        lookdev_core.registerNodes(lightGroup)
 
         cmds.select(clear=True)
 
@@ -188,7 +250,7 @@ def rotLights(rotation):
     Set rotations on the light's offset group
     """
     if cmds.objExists('Lights_Grp'):
-        cmds.setAttr('Lights_Grp.rotateY', rotation)
+        lookdev_core.setAttr('Lights_Grp.rotateY', rotation)
 
 
 def changeLightIntensity(light, intensity):
@@ -196,7 +258,7 @@ def changeLightIntensity(light, intensity):
     Changes fill light intensity if it's in scene
     """
     if cmds.objExists('Lights_Grp'):
-        cmds.setAttr('{}.intensity'.format(light), intensity)
+        lookdev_core.setAttr('{}.intensity'.format(light), intensity)
 
 
 def createCam(colorCheckerPath):
@@ -213,7 +275,7 @@ def createCam(colorCheckerPath):
         cmds.rename(cameraTransfo, 'Main_Cam_Transform')
 
         # create color palette
-        cmds.file(colorCheckerPath, reference=True)
+        lookdev_core.referenceFile(colorCheckerPath)
 
         # group cam
         cmds.parent('ColorPalette_vray_ALL_Grp', 'Main_Cam_Transform')
@@ -221,28 +283,36 @@ def createCam(colorCheckerPath):
 
         cmds.createNode('transform', name='Cam_Main_Grp', skipSelect=True)
         cmds.parent(cameraOffset, 'Cam_Main_Grp')
+        lookdev_core.registerNodes('Cam_Main_Grp')
 
         # move cam
-        cmds.xform('Main_Cam_Transform', translation=(0, 4.542, 13.729))
+        cmds.xform('Main_Cam_Transform', translation=constants.CAMERA_TRANSLATION)
 
-        # set physical camera
-        mel.eval('vray addAttributesFromGroup |Cam_Main_Grp|Camera_Offset|Main_Cam_Transform|Main_Cam vray_cameraPhysical 1;')
-        mel.eval('setAttr "Main_Cam.vrayCameraPhysicalExposure" 0;')
+        setupCamera('Main_Cam')
 
     else:
-        cmds.file(colorCheckerPath, removeReference=True)
+        lookdev_core.removeReference(colorCheckerPath)
         cmds.delete('Cam_Main_Grp')
 
     cmds.select(clear=True)
 
 
+def setupCamera(camera):
+    """
+    Set physical camera
+    :param camera: camera shape's name
+    """
+    mel.eval('vray addAttributesFromGroup {} vray_cameraPhysical 1;'.format(cmds.ls(camera, long=True)[0]))
+    cmds.setAttr('{}.vrayCameraPhysicalExposure'.format(camera), 0)
+
+
 def rotateCam(rotateValue):
     """
     Rotate cam's offset group
     :param rotateValue: rotate value from rotateCam's Qline
     """
     if cmds.objExists('Cam_Main_Grp'):
-        cmds.setAttr('{}.{}'.format('Cam_Main_Grp', 'rotateY'), rotateValue)
+        lookdev_core.setAttr('{}.{}'.format('Cam_Main_Grp', 'rotateY'), rotateValue)
 
 
 def disableLight(light, state):
@@ -253,12 +323,13 @@ def disableLight(light, state):
         state: state of the light
     """
     if cmds.objExists('Lights_Grp'):
-        cmds.setAttr('{}.enabled'.format(light), state)
+        lookdev_core.setAttr('{}.enabled'.format(light), state)
 
 
 def storePrefs():
     """
     Creates a json and write coordinates to replace the lights
+    :return: The preferences file's path and its json content, the file is left to the caller to write
     """
     # create dict from lights position, values, intensity and scale
 
@@ -271,48 +342,33 @@ def storePrefs():
         constants.VRAY_LIGHT_VALUES[index].get(light, {})[f'{light}vSize'] = cmds.getAttr(f'{light}.vSize')
         constants.VRAY_LIGHT_VALUES[index].get(light, {})[f'{light}Intens'] = cmds.getAttr(f'{light}.intensityMult')
 
-    with open(constants.VRAY_PREFERENCE_PATH, 'w') as wFile:
-        wFile.write(json.dumps(constants.VRAY_LIGHT_VALUES, indent=4))
+    preferences = json.dumps(constants.VRAY_LIGHT_VALUES, indent=4)
 
-        # Write prefs in Maya
-        cmds.optionVar(stringValue=('lookdev_vray_settings', json.dumps(constants.VRAY_LIGHT_VALUES, indent=4)))
+    # Write prefs in Maya
+    cmds.optionVar(stringValue=('lookdev_vray_settings', preferences))
 
+    # the file is written by the caller, on a worker
+    return constants.VRAY_PREFERENCE_PATH, preferences
 
-def clearScene(colorCheckerPath, ground1Path, ground2Path, ground3Path):
+
+def pauseIpr(state):
     """
-    Clear all tool's nodes in scene
-    :param colorCheckerPath: colorChecker's path
-    :param ground1Path: ground1's path
-    :param ground2Path: ground2's path
-    :param ground3Path: ground3's path
+    Used by lookdev_core.IprBatch, V-Ray's IPR picks the changes up on idle so the edits applied in one batch
+    already reach it as a single update, nothing has to be paused
+    :param state: True to pause, False to resume
     """
-    # cam
-    if cmds.objExists('Cam_Main_Grp'):
-        cmds.file(colorCheckerPath, removeReference=True)
-        cmds.delete('Cam_Main_Grp')
-
-    # ground
-    if cmds.objExists('ground_1_vray_ALL_Grp'):
-        cmds.file(ground1Path, removeReference=True)
+    pass
 
-    if cmds.objExists('ground_2_vray_ALL_Grp'):
-        cmds.file(ground2Path, removeReference=True)
 
-    if cmds.objExists('ground_3_vray_ALL_Grp'):
-        cmds.file(ground3Path, removeReference=True)
-
-    # lights
-    if cmds.objExists('Lights_Grp'):
-        cmds.delete('Lights_Grp')
-
-    # lightDome
-    if cmds.objExists('VRayLightDome1'):
-        # del connected nodes
-        lightDelOne = cmds.listConnections('dome1', source=True)
-        lightDelTwo = cmds.listConnections(lightDelOne[-1], source=True)
-
-        cmds.delete(lightDelTwo[1:])
-        cmds.delete(lightDelOne[-1])
+def clearScene():
+    """
+    Clear all tool's nodes in scene
+    The nodes and references recorded at creation time are removed in one pass, see lookdev_core.clearOwnedNodes
+    """
+    startTime = time.perf_counter()
+    lookdev_core.clearOwnedNodes()
+    elapsed = time.perf_counter() - startTime
+    VRAY_CORE_LOGGER.debug('clearScene: {:.3f}s'.format(elapsed), extra={'operation': 'clearScene', 'elapsed': elapsed})
 
 
 def importPrefs():
@@ -324,11 +380,16 @@ def importPrefs():
         cmds.error("Settings not found")
         return
 
+    startTime = time.perf_counter()
+
     # set the position, scale and intensity
     for index, light in enumerate(['fillLight', 'keyLight', 'backLight']):
-        cmds.xform('{}Transform'.format(light), matrix=(settings[index].get(light, {}).get('{}Coords'.format(light), {})))
-        cmds.setAttr('{}.uSize'.format(light), (settings[index].get(light, {}).get('{}uSize'.format(light), {})))
-        cmds.setAttr('{}.vSize'.format(light), (settings[index].get(light, {}).get('{}vSize'.format(light), {})))
-        cmds.setAttr('{}.intensityMult'.format(light), (settings[index].get(f'{light}', {}).get('{}Intens'.format(light), {})))
+        lookdev_core.batchCall(('xform', light), cmds.xform, '{}Transform'.format(light), matrix=(settings[index].get(light, {}).get('{}Coords'.format(light), {})))
+        lookdev_core.setAttr('{}.uSize'.format(light), (settings[index].get(light, {}).get('{}uSize'.format(light), {})))
+        lookdev_core.setAttr('{}.vSize'.format(light), (settings[index].get(light, {}).get('{}vSize'.format(light), {})))
+        lookdev_core.setAttr('{}.intensityMult'.format(light), (settings[index].get(f'{light}', {}).get('{}Intens'.format(light), {})))
+
+    elapsed = time.perf_counter() - startTime
+    VRAY_CORE_LOGGER.debug('preferences applied in {:.3f}s'.format(elapsed), extra={'operation': 'presetApply', 'elapsed': elapsed})
 
     return settings
@@ -0,0 +1,72 @@
+import os
+import time
+
+from lookdev_tool import asset_cache
+
+
+def _write(path, content):
+    with open(path, 'wb') as wFile:
+        wFile.write(content)
+
+
+def test_localPathCopiesThenServesTheCopy(tmp_path):
+    source = tmp_path / 'ground_1_arnold.ma'
+    _write(source, b'ground')
+    cache = asset_cache.AssetCache(str(tmp_path / 'cache'), maxSize=1024)
+
+    localPath = cache.localPath(str(source), wait=True)
+
+    assert localPath != str(source)
+    assert os.path.basename(localPath) == 'ground_1_arnold.ma'
+    assert cache.localPath(str(source)) == localPath
+
+
+def test_republishedSourceIsVerifiedNotCopied(tmp_path):
+    source = tmp_path / 'studio.exr'
+    _write(source, b'hdri')
+    cache = asset_cache.AssetCache(str(tmp_path / 'cache'), maxSize=1024)
+    localPath = cache.localPath(str(source), wait=True)
+    copyTime = os.stat(localPath).st_mtime
+
+    # same content published again, only the mtime changes
+    newTime = time.time() + 10
+    os.utime(source, (newTime, newTime))
+    assert cache.cachedPath(str(source)) is None
+
+    assert cache.prefetch(str(source)).result() == localPath
+    assert os.stat(localPath).st_mtime == copyTime
+    assert cache.cachedPath(str(source)) == localPath
+
+
+def test_changedSourceIsCopiedAgain(tmp_path):
+    source = tmp_path / 'studio.exr'
+    _write(source, b'hdri')
+    cache = asset_cache.AssetCache(str(tmp_path / 'cache'), maxSize=1024)
+    localPath = cache.localPath(str(source), wait=True)
+
+    _write(source, b'new hdri')
+
+    assert not cache.verify(str(source))
+    assert cache.localPath(str(source), wait=True) != localPath
+
+
+def test_pinnedCopiesAreNotEvicted(tmp_path):
+    cache = asset_cache.AssetCache(str(tmp_path / 'cache'), maxSize=10)
+    paths = []
+    for index in range(3):
+        source = tmp_path / 'hdri{}.exr'.format(index)
+        _write(source, '{:08d}'.format(index).encode())
+        paths.append(cache.localPath(str(source), wait=True))
+        if index == 0:
+            cache.pin(paths[0])
+
+    assert os.path.isfile(paths[0])
+    assert not os.path.isfile(paths[1])
+    assert os.path.isfile(paths[2])
+
+    cache.unpin(paths[0])
+    source = tmp_path / 'hdri3.exr'
+    _write(source, b'00000003')
+    cache.localPath(str(source), wait=True)
+
+    assert not os.path.isfile(paths[0])
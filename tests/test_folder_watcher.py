@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from lookdev_tool import folder_watcher
+
+
+def _touch(path):
+    with open(path, 'w') as wFile:
+        wFile.write('hdri')
+
+
+def _waitForChanges(watcher, count, timeout=5.0):
+    changes = []
+    endTime = time.time() + timeout
+    while len(changes) < count and time.time() < endTime:
+        changes.extend(watcher.drain())
+        time.sleep(0.02)
+    return changes
+
+
+@pytest.fixture(params=['inotify', 'polling'])
+def watcherMode(request, monkeypatch):
+    if request.param == 'polling':
+        # as on a network share
+        monkeypatch.setattr(folder_watcher, 'isNetworkFilesystem', lambda path: True)
+    return request.param
+
+
+def test_knownNamesAreNotReported(tmp_path, watcherMode):
+    _touch(tmp_path / 'studio.exr')
+    watcher = folder_watcher.FolderWatcher(str(tmp_path), lambda name: name.endswith('.exr'), names=['studio.exr'],
+                                           pollInterval=0.05)
+    watcher.start()
+    try:
+        time.sleep(0.2)
+        assert watcher.drain() == []
+
+        _touch(tmp_path / 'sunset.exr')
+        _touch(tmp_path / 'notes.txt')
+        changes = _waitForChanges(watcher, 1)
+    finally:
+        watcher.stop()
+
+    assert changes == [folder_watcher.FolderChange('added', 'sunset.exr', None)]
+
+
+def test_unlistedFolderReportsEveryFile(tmp_path, watcherMode):
+    _touch(tmp_path / 'studio.exr')
+    _touch(tmp_path / 'sunset.exr')
+    watcher = folder_watcher.FolderWatcher(str(tmp_path), lambda name: name.endswith('.exr'), pollInterval=0.05)
+    watcher.start()
+    try:
+        changes = _waitForChanges(watcher, 2)
+    finally:
+        watcher.stop()
+
+    assert sorted(change.name for change in changes) == ['studio.exr', 'sunset.exr']
+    assert watcher.names == {'studio.exr', 'sunset.exr'}
+
+
+def test_localFolderIsNotNetwork(tmp_path):
+    assert not folder_watcher.isNetworkFilesystem(str(tmp_path))
@@ -0,0 +1,75 @@
+import os
+
+from lookdev_tool import ground_thumbnails
+
+
+class CountingRenderer(ground_thumbnails.StubRenderer):
+    def __init__(self) -> None:
+        super(CountingRenderer, self).__init__()
+        self.rendered = []
+
+    def render(self, sourcePath, targetPath, size):
+        self.rendered.append(sourcePath)
+        super(CountingRenderer, self).render(sourcePath, targetPath, size)
+
+
+class FailingRenderer(object):
+    def render(self, sourcePath, targetPath, size):
+        raise RuntimeError('render failed')
+
+
+def _grounds(tmp_path, count=3):
+    paths = []
+    for index in range(count):
+        path = tmp_path / 'ground_{}.ma'.format(index)
+        path.write_text('// ground {}\n'.format(index))
+        paths.append(str(path))
+    return paths
+
+
+def test_generateThumbnailsRendersEachGround(tmp_path):
+    grounds = _grounds(tmp_path)
+    renderer = CountingRenderer()
+
+    thumbnails = ground_thumbnails.generateThumbnails(str(tmp_path / 'thumbnails'), grounds, 16, renderer)
+
+    assert sorted(renderer.rendered) == sorted(grounds)
+    for ground in grounds:
+        assert os.path.isfile(thumbnails[ground])
+        with open(thumbnails[ground], 'rb') as rFile:
+            assert rFile.read(8) == b'\x89PNG\r\n\x1a\n'
+
+
+def test_generateThumbnailsKeepsCachedThumbnails(tmp_path):
+    grounds = _grounds(tmp_path)
+    thumbnailDir = str(tmp_path / 'thumbnails')
+    first = ground_thumbnails.generateThumbnails(thumbnailDir, grounds, 16, CountingRenderer())
+
+    renderer = CountingRenderer()
+    second = ground_thumbnails.generateThumbnails(thumbnailDir, grounds, 16, renderer)
+
+    assert renderer.rendered == []
+    assert second == first
+
+
+def test_generateThumbnailsRendersChangedGroundAgain(tmp_path):
+    grounds = _grounds(tmp_path)
+    thumbnailDir = str(tmp_path / 'thumbnails')
+    ground_thumbnails.generateThumbnails(thumbnailDir, grounds, 16, CountingRenderer())
+
+    with open(grounds[1], 'a') as aFile:
+        aFile.write('// changed\n')
+    renderer = CountingRenderer()
+    ground_thumbnails.generateThumbnails(thumbnailDir, grounds, 16, renderer)
+
+    assert renderer.rendered == [grounds[1]]
+
+
+def test_generateThumbnailsReportsFailedRenders(tmp_path):
+    grounds = _grounds(tmp_path, 1)
+    thumbnailDir = tmp_path / 'thumbnails'
+
+    thumbnails = ground_thumbnails.generateThumbnails(str(thumbnailDir), grounds, 16, FailingRenderer())
+
+    assert thumbnails == {grounds[0]: None}
+    assert os.listdir(str(thumbnailDir)) == []
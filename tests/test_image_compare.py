@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from lookdev_tool import image_compare
+
+
+def _writeSequence(folder, frames):
+    folder.mkdir()
+    for index, frame in enumerate(frames):
+        np.save(str(folder / 'frame.{:04d}.npy'.format(index)), frame)
+    return str(folder)
+
+
+def test_jsonIdenticalFramesHaveNullPsnr(tmp_path, capsys):
+    frames = [np.full((16, 16, 3), 0.5), np.linspace(0.0, 1.0, 16 * 16 * 3).reshape(16, 16, 3)]
+    sequenceA = _writeSequence(tmp_path / 'a', frames)
+    sequenceB = _writeSequence(tmp_path / 'b', frames)
+
+    assert image_compare.main([sequenceA, sequenceB, '--json']) == 0
+
+    output = json.loads(capsys.readouterr().out)
+    assert output['summary']['minPsnr'] is None
+    assert [frame['psnr'] for frame in output['frames']] == [None, None]
+
+
+def test_heatMapsAreWritten(tmp_path):
+    frameA = np.zeros((8, 8, 3))
+    frameB = np.full((8, 8, 3), 0.1)
+    sequenceA = _writeSequence(tmp_path / 'a', [frameA])
+    sequenceB = _writeSequence(tmp_path / 'b', [frameB])
+    maps = tmp_path / 'maps'
+
+    report = image_compare.compareSequences(image_compare.listSequence(sequenceA).items(),
+                                            image_compare.listSequence(sequenceB), mapsFolder=str(maps))
+
+    assert len(report.frames) == 1
+    assert (maps / 'frame.0000.png').read_bytes().startswith(b'\x89PNG')
@@ -0,0 +1,40 @@
+import io
+
+from lookdev_tool import ma_reader
+
+
+def _statements(text):
+    return list(ma_reader.iterStatements(io.StringIO(text)))
+
+
+def test_commentLinesBetweenStatementsAreDropped():
+    text = ('requires maya "2022";\n'
+            '// comment "x\n'
+            'createNode transform -n "A_ALL_Grp";\n')
+
+    assert _statements(text) == ['requires maya "2022"', 'createNode transform -n "A_ALL_Grp"']
+
+
+def test_commentInsideStatementIsDropped():
+    text = ('createNode transform\n'
+            '// comment; with "a quote\n'
+            '    -n "A_ALL_Grp"; // trailing "comment\n'
+            'setAttr ".v" no;\n')
+
+    statements = _statements(text)
+    assert [ma_reader.tokenize(statement) for statement in statements] == [
+        ['createNode', 'transform', '-n', 'A_ALL_Grp'], ['setAttr', '.v', 'no']]
+
+
+def test_stringsKeepSlashesAndSemicolons():
+    text = 'setAttr ".ftn" -type "string" "//server/hdri;1.exr";\n'
+
+    assert ma_reader.tokenize(_statements(text)[0]) == ['setAttr', '.ftn', '-type', 'string', '//server/hdri;1.exr']
+
+
+def test_longStatementsAreTruncated():
+    text = 'setAttr ".vt" {}\n;\ncreateNode mesh -n "shape";\n'.format(' 0' * 10000)
+    statements = list(ma_reader.iterStatements(io.StringIO(text), maxLength=64))
+
+    assert len(statements[0]) <= 64
+    assert statements[1] == 'createNode mesh -n "shape"'
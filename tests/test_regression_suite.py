@@ -0,0 +1,54 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from lookdev_tool import regression_suite
+
+CASES = regression_suite.canonicalCases('studio.exr')[:3]
+
+
+def test_runSuitePassesAgainstItsOwnGoldens(tmp_path):
+    backend = regression_suite.StubBackend()
+    assert regression_suite.runSuite(backend, str(tmp_path), CASES, update=True) == []
+
+    results = regression_suite.runSuite(backend, str(tmp_path), CASES)
+
+    assert [result.name for result in results] == [case.name for case in CASES]
+    assert all(result.passed and result.error is None for result in results)
+
+
+def test_runSuiteFailsOnLookChange(tmp_path):
+    regression_suite.runSuite(regression_suite.StubBackend(), str(tmp_path), CASES, update=True)
+
+    results = regression_suite.runSuite(regression_suite.StubBackend(gain=1.2), str(tmp_path), CASES)
+
+    assert not any(result.passed for result in results)
+    assert 'FAILED' in regression_suite.formatResults(results)
+
+
+def test_runSuiteReportsMissingGoldens(tmp_path):
+    results = regression_suite.runSuite(regression_suite.StubBackend(), str(tmp_path), CASES[:1])
+
+    assert results[0].error == 'no golden render'
+    assert not results[0].passed
+
+
+def test_slowRenderIsReportedWithoutFailing(tmp_path):
+    regression_suite.runSuite(regression_suite.StubBackend(), str(tmp_path), CASES[:1], update=True)
+
+    result = regression_suite.runCase(regression_suite.StubBackend(delay=regression_suite.MIN_SLOWDOWN * 2),
+                                      CASES[0], str(tmp_path))
+
+    assert result.passed
+    assert result.slower
+
+
+def test_mainRequiresTheHdri(tmp_path):
+    with pytest.raises(SystemExit):
+        regression_suite.main(['run', '--golden', str(tmp_path)])
+
+
+def test_mainUpdatesAndRunsWithTheStubBackend(tmp_path):
+    arguments = ['--golden', str(tmp_path), '--hdri', 'studio.exr', '--case', CASES[0].name]
+    assert regression_suite.main(['update'] + arguments) == 0
+    assert regression_suite.main(['run'] + arguments) == 0
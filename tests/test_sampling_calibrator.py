@@ -0,0 +1,55 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from lookdev_tool import sampling_calibrator
+
+# noise sigma of each sampling level, halved at every level
+LEVELS = [{'samples': samples} for samples in (1, 2, 3, 4, 5)]
+
+
+def _sigma(settings):
+    return 0.08 / 2 ** (settings['samples'] - 1)
+
+
+def test_differenceNoiseMeasuresEachChannel():
+    renderer = sampling_calibrator.StubRenderer(lambda settings: 0.05, width=320, height=180)
+    reference = sampling_calibrator.StubRenderer(lambda settings: 0.0, width=320, height=180).render({})
+    noise = sampling_calibrator.differenceNoise(renderer.render({}), reference)
+
+    assert noise == pytest.approx(0.05, rel=0.1)
+
+
+@pytest.mark.parametrize('textured', [False, True])
+def test_differenceNoiseIgnoresSceneDetail(textured):
+    renderer = sampling_calibrator.StubRenderer(lambda settings: 0.0, textured=textured)
+
+    assert sampling_calibrator.differenceNoise(renderer.render({}), renderer.render({})) == pytest.approx(0.0)
+
+
+def test_calibrateStopsAtFirstLevelUnderTarget():
+    renderer = sampling_calibrator.StubRenderer(_sigma)
+    calibration = sampling_calibrator.calibrate(renderer, LEVELS, target=0.012)
+
+    # sigmas 0.08, 0.04, 0.02, 0.01 against a 0.005 reference: the fourth level is the first under 0.012
+    assert calibration['settings'] == {'samples': 4}
+    assert renderer.renders == 5
+    assert calibration['noise'] <= 0.012
+    assert len(calibration['measures']) == 4
+
+
+def test_calibrateIgnoresTexturedAsset():
+    # the checker's edges are far above the target, only the sampling noise may be measured
+    renderer = sampling_calibrator.StubRenderer(_sigma, textured=True)
+    calibration = sampling_calibrator.calibrate(renderer, LEVELS, target=0.012)
+
+    assert calibration['settings'] == {'samples': 4}
+
+
+def test_calibrateFallsBackOnMostExpensiveLevel():
+    renderer = sampling_calibrator.StubRenderer(_sigma)
+    calibration = sampling_calibrator.calibrate(renderer, LEVELS, target=0.0001)
+
+    assert calibration['settings'] == LEVELS[-1]
+    assert calibration['noise'] is None
+    assert renderer.renders == len(LEVELS)